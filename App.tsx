@@ -30,8 +30,11 @@ import { AuthView } from './src/views/AuthView';
 
 
 import { ViewState, Doc } from './src/types';
-import { initDB, db } from './src/db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { initDB } from './src/db';
+import { installRetrievalIndex } from './src/services/RetrievalIndex';
+import { installPortfolioAggregates } from './src/services/PortfolioAggregates';
+import { installQuickSearchIndex } from './src/services/QuickSearchIndex';
+import { installLiveStore } from './src/services/LiveStore';
 
 export default function App() {
   const [sidebarOpen, setSidebarOpen] = useState(false);
@@ -39,6 +42,10 @@ export default function App() {
   // Initialize DB
   useEffect(() => {
     initDB();
+    installRetrievalIndex();
+    installPortfolioAggregates();
+    installQuickSearchIndex();
+    installLiveStore();
   }, []);
 
   // Initial state check from hash, default to dashboard
@@ -64,12 +71,6 @@ export default function App() {
   const [selectedLoanId, setSelectedLoanId] = useState<string | undefined>(undefined);
   const [selectedQueryId, setSelectedQueryId] = useState<number | undefined>(undefined);
 
-  // Replace useState with useLiveQuery for vaultDocs
-  const vaultDocs = useLiveQuery(
-    () => db.docs.toArray(),
-    []
-  );
-
   // Sync state to hash
   useEffect(() => {
     window.location.hash = currentView;
@@ -155,7 +156,6 @@ export default function App() {
         {currentView === 'vault' && (
           <DocumentVaultView
             setView={setCurrentView}
-            docs={vaultDocs || []}
             onSelectDoc={(id) => setSelectedDocId(id)}
           />
         )}
@@ -1,8 +1,11 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Search, X, FileText, CreditCard, ArrowRight, Command } from 'lucide-react';
-import { useLiveQuery } from 'dexie-react-hooks';
-import { db } from '../db';
 import { ViewState } from '../types';
+import { quickSearch, QuickSearchResults } from '../services/QuickSearchIndex';
+
+// Wait for a pause in typing before looking up
+const SEARCH_DEBOUNCE_MS = 120;
+const NO_RESULTS: QuickSearchResults = { loans: [], docs: [] };
 
 interface GlobalSearchProps {
     setView: (view: ViewState) => void;
@@ -13,6 +16,7 @@ interface GlobalSearchProps {
 export const GlobalSearch = ({ setView, onSelectLoan, onSelectDoc }: GlobalSearchProps) => {
     const [isOpen, setIsOpen] = useState(false);
     const [query, setQuery] = useState('');
+    const [results, setResults] = useState<QuickSearchResults>(NO_RESULTS);
     const inputRef = useRef<HTMLInputElement>(null);
 
     // Keyboard shortcut listener
@@ -38,23 +42,26 @@ export const GlobalSearch = ({ setView, onSelectLoan, onSelectDoc }: GlobalSearc
         }
     }, [isOpen]);
 
-    // Fetch and filter data
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
-
-    const filteredLoans = query
-        ? loans.filter(l =>
-            l.id.toLowerCase().includes(query.toLowerCase()) ||
-            l.counterparty.toLowerCase().includes(query.toLowerCase())
-        ).slice(0, 5)
-        : [];
-
-    const filteredDocs = query
-        ? docs.filter(d =>
-            d.name.toLowerCase().includes(query.toLowerCase()) ||
-            d.type.toLowerCase().includes(query.toLowerCase())
-        ).slice(0, 5)
-        : [];
+    // Ranked lookup in the search index once typing pauses; a stale lookup never overwrites a newer one
+    useEffect(() => {
+        if (!query.trim()) {
+            setResults(NO_RESULTS);
+            return;
+        }
+        let current = true;
+        const timer = setTimeout(() => {
+            quickSearch(query)
+                .then(found => { if (current) setResults(found); })
+                .catch(error => console.error('Search failed:', error));
+        }, SEARCH_DEBOUNCE_MS);
+        return () => {
+            current = false;
+            clearTimeout(timer);
+        };
+    }, [query]);
+
+    const filteredLoans = query ? results.loans : [];
+    const filteredDocs = query ? results.docs : [];
 
     const hasResults = filteredLoans.length > 0 || filteredDocs.length > 0;
 
@@ -3,17 +3,19 @@ import { Loan } from '../types';
 
 interface RiskHeatmapProps {
     loans?: Loan[];
+    counts?: Record<string, number>; // Loans per risk level, e.g. PortfolioAggregates' riskCounts; used instead of loans
 }
 
-export const RiskHeatmap = ({ loans = [] }: RiskHeatmapProps) => {
+export const RiskHeatmap = ({ loans = [], counts }: RiskHeatmapProps) => {
+    const countOf = (risk: Loan['risk']) => counts ? counts[risk] ?? 0 : loans.filter(l => l.risk === risk).length;
     const riskCounts = {
-        'Low': loans.filter(l => l.risk === 'Low').length,
-        'Medium': loans.filter(l => l.risk === 'Medium').length,
-        'High': loans.filter(l => l.risk === 'High').length,
-        'Critical': loans.filter(l => l.risk === 'Critical').length
+        'Low': countOf('Low'),
+        'Medium': countOf('Medium'),
+        'High': countOf('High'),
+        'Critical': countOf('Critical')
     };
 
-    const total = loans.length || 1; // avoid divide by zero
+    const total = (counts ? Object.values(counts).reduce((sum, count) => sum + count, 0) : loans.length) || 1; // avoid divide by zero
 
     const getPercentage = (count: number) => ((count / total) * 100).toFixed(0);
 
@@ -13,7 +13,7 @@ import {
 } from 'lucide-react';
 import { ViewState } from '../types';
 import { ConfirmationModal } from './ConfirmationModal';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 import { db } from '../db';
 
 
@@ -28,7 +28,7 @@ export const Sidebar = ({ isOpen, setIsOpen, currentView, setView }: SidebarProp
     const [isCollapsed, setIsCollapsed] = useState(false);
     const [showSignOutConfirm, setShowSignOutConfirm] = useState(false);
 
-    const user = useLiveQuery(() => db.users.toArray())?.[0];
+    const user = useTableQuery(db.users, users => users[0]);
     const displayName = user?.name || 'New User';
     const displayTitle = user?.title || 'Set up your profile';
     const displayAvatar = user?.avatar || `https://ui-avatars.com/api/?name=U&background=333&color=666`;
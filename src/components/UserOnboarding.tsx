@@ -1,12 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { User, db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 import { toast } from 'sonner';
 import { User as UserIcon, Briefcase, Mail, CheckCircle, ArrowRight, ShieldCheck } from 'lucide-react';
 
 export const UserOnboarding = () => {
-    const users = useLiveQuery(() => db.users.toArray());
+    const userCount = useTableQuery(db.users, users => users.length);
     const [isOpen, setIsOpen] = useState(false);
 
     // Form State
@@ -17,12 +17,12 @@ export const UserOnboarding = () => {
     const [step, setStep] = useState(1);
 
     useEffect(() => {
-        if (users !== undefined && users.length === 0) {
+        if (userCount === 0) {
             setIsOpen(true);
         } else {
             setIsOpen(false);
         }
-    }, [users]);
+    }, [userCount]);
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
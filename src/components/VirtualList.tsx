@@ -0,0 +1,158 @@
+import React, { useEffect, useRef, useState } from 'react';
+import { useLiveQuery } from 'dexie-react-hooks';
+import { countQuery, FeedCursors, FeedSource, fetchFeedPage, fetchPage, PageQuery } from '../services/PagedQuery';
+
+// Windowed rendering for the list views: only the rows in (and just around)
+// the viewport are mounted, and only the pages they fall on are read from
+// IndexedDB (see services/PagedQuery.ts).
+
+export const PAGE_SIZE = 50;
+
+export interface PagedRows<T> {
+    total: number;
+    loaded: boolean; // False until the first count is in
+    rowAt: (index: number) => T | undefined; // Undefined while its page loads
+    setRange: (start: number, end: number) => void; // Rows [start, end) are on screen
+}
+
+/**
+ * Live, paged access to a query. Only the pages covering the range last
+ * passed to setRange are read, and they're re-read when the table changes.
+ */
+export function usePagedQuery<T>(query: PageQuery<T>, deps: unknown[], pageSize = PAGE_SIZE): PagedRows<T> {
+    const windowRef = useRef<{ generation: number; offset: number; rows: T[]; end: number }>();
+
+    // A new query starts from the top, and never shows the old query's rows
+    const queryDeps = useRef(deps);
+    const generation = useRef(0);
+    if (deps.length !== queryDeps.current.length || deps.some((dep, i) => !Object.is(dep, queryDeps.current[i]))) {
+        queryDeps.current = deps;
+        generation.current++;
+        windowRef.current = undefined;
+    }
+    const queryGeneration = generation.current;
+
+    // The range belongs to the query it was set for; a new query reads from its first page
+    const [pageRange, setPageRange] = useState({ generation: queryGeneration, first: 0, last: 0 });
+    const pages = pageRange.generation === queryGeneration ? pageRange : { first: 0, last: 0 };
+
+    const count = useLiveQuery(() => countQuery(query), deps);
+    const loaded = useLiveQuery(async () => {
+        const offset = pages.first * pageSize;
+        const limit = (pages.last - pages.first + 1) * pageSize;
+        const rows = await fetchPage(query, offset, limit);
+        return { generation: queryGeneration, offset, rows, end: rows.length < limit ? offset + rows.length : Infinity };
+    }, [...deps, pages.first, pages.last]);
+
+    // Keep showing the previous window of this query while the next one loads
+    if (loaded && loaded.generation === queryGeneration) windowRef.current = loaded;
+
+    const current = windowRef.current;
+    // A short page means the index lists fewer rows than the count (e.g. rows missing the sort key)
+    const total = Math.min(count ?? 0, current?.end ?? Infinity);
+
+    return {
+        total,
+        loaded: count !== undefined,
+        rowAt: index => current && index >= current.offset ? current.rows[index - current.offset] : undefined,
+        setRange: (start, end) => {
+            const first = Math.floor(start / pageSize);
+            const last = Math.max(first, Math.floor(Math.max(end - 1, 0) / pageSize));
+            setPageRange(prev => prev.generation === queryGeneration && prev.first === first && prev.last === last
+                ? prev
+                : { generation: queryGeneration, first, last });
+        },
+    };
+}
+
+export interface PagedFeed<Item> {
+    items: Item[];
+    loaded: boolean;
+    hasMore: boolean;
+    loadMore: () => void;
+}
+
+/**
+ * Several tables merged into one newest-first feed, read a page at a time
+ * with keyset cursors. Every loaded page stays live. Pass sources and time as
+ * module constants or memoize them: a new value restarts the feed from its
+ * first page.
+ */
+export function usePagedFeed<Item>(sources: FeedSource<any, Item>[], time: (item: Item) => number, pageSize = PAGE_SIZE): PagedFeed<Item> {
+    // Keyed on the inputs like usePagedQuery's range, so new inputs start from one page
+    const [pages, setPages] = useState({ sources, time, count: 1 });
+    const pageCount = pages.sources === sources && pages.time === time ? pages.count : 1;
+    const feed = useLiveQuery(async () => {
+        const items: Item[] = [];
+        // Each page starts where the one before it ends, so inserts shift pages rather than drop rows
+        let cursors: FeedCursors | undefined = sources.map(() => undefined);
+        for (let page = 0; page < pageCount && cursors; page++) {
+            const result = await fetchFeedPage(sources, cursors, pageSize, time);
+            items.push(...result.items);
+            cursors = result.next;
+        }
+        return { items, hasMore: !!cursors };
+    }, [sources, time, pageSize, pageCount]);
+
+    return {
+        items: feed?.items ?? [],
+        loaded: feed !== undefined,
+        hasMore: feed?.hasMore ?? false,
+        loadMore: () => setPages(prev => ({ sources, time, count: (prev.sources === sources && prev.time === time ? prev.count : 1) + 1 })),
+    };
+}
+
+interface VirtualListProps<T> {
+    rows: PagedRows<T>;
+    rowHeight: number; // Every row renders at exactly this height
+    renderRow: (row: T | undefined, index: number) => React.ReactNode;
+    overscan?: number;
+    className?: string; // Must give the list a height; it scrolls itself
+    id?: string;
+}
+
+/**
+ * Scrollable list that mounts only the visible rows of a usePagedQuery result
+ */
+export function VirtualList<T>({ rows, rowHeight, renderRow, overscan = 10, className = '', id }: VirtualListProps<T>) {
+    const scrollRef = useRef<HTMLDivElement>(null);
+    const [scrollTop, setScrollTop] = useState(0);
+    const [viewportHeight, setViewportHeight] = useState(0);
+
+    useEffect(() => {
+        const element = scrollRef.current;
+        if (!element) return;
+        const observer = new ResizeObserver(() => setViewportHeight(element.clientHeight));
+        observer.observe(element);
+        setViewportHeight(element.clientHeight);
+        return () => observer.disconnect();
+    }, []);
+
+    const start = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+    const end = Math.min(rows.total, Math.ceil((scrollTop + viewportHeight) / rowHeight) + overscan);
+
+    const { setRange } = rows;
+    useEffect(() => {
+        setRange(start, end);
+    }, [start, end]);
+
+    const visible: React.ReactNode[] = [];
+    for (let index = start; index < end; index++) {
+        visible.push(<React.Fragment key={index}>{renderRow(rows.rowAt(index), index)}</React.Fragment>);
+    }
+
+    return (
+        <div
+            id={id}
+            ref={scrollRef}
+            onScroll={e => setScrollTop(e.currentTarget.scrollTop)}
+            className={`overflow-y-auto custom-scrollbar ${className}`}
+        >
+            <div style={{ height: rows.total * rowHeight, position: 'relative' }}>
+                <div style={{ position: 'absolute', top: start * rowHeight, left: 0, right: 0 }}>
+                    {visible}
+                </div>
+            </div>
+        </div>
+    );
+}
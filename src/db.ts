@@ -1,5 +1,7 @@
 import Dexie, { Table } from 'dexie';
 import { Doc, Alert, Loan, Query } from './types';
+import { normalizeLoanFields, parseDateTs } from './utils/loanFields';
+import { hashContent } from './utils/hash';
 
 export interface User {
   id?: number;
@@ -46,6 +48,63 @@ export interface Notification {
   link?: string;
 }
 
+// Cached analysis output for a document, keyed by the SHA-256 of its bytes
+// (see services/AnalysisCache.ts). 'answer' entries hold Smart Query answers
+// keyed by the hash of model and prompt (see services/ResponseCache.ts).
+// 'ocr' entries hold one scanned page's text, keyed by the hash of its
+// rendered pixels (see services/DocumentProcessor.ts).
+export interface AnalysisCacheEntry {
+  key: string; // `${hash}:${kind}:${version}`
+  hash: string;
+  kind: 'text' | 'findings' | 'review' | 'chunk' | 'answer' | 'ocr';
+  version: string; // Extractor, analyzer or prompt version the value was produced with
+  value: any;
+  size: number; // Approximate bytes, for the LRU size bound
+  lastUsed: number;
+}
+
+// Inverted index over loans and document text for Smart Query context
+// retrieval (see services/RetrievalIndex.ts). A record is one loan, one
+// document's metadata or one passage of a document's extracted text.
+export interface SearchRecord {
+  ref: string; // 'loan:<id>', 'doc:<id>' or 'doc:<id>#<passage>'
+  owner: string; // 'loan:<id>' or 'doc:<id>', the row the record was built from
+  kind: 'loan' | 'doc' | 'passage';
+  text: string; // Context line handed to the model
+  length: number; // Indexed terms, for BM25 length normalisation
+}
+
+export interface SearchPosting {
+  term: string;
+  ref: string;
+  tf: number;
+  length: number; // Copy of the record's length so scoring never loads records
+}
+
+// An uploaded file's bytes, stored once per content hash and referenced from
+// Doc.contentHash; read only to preview or analyze (see services/BlobStore.ts)
+export interface BlobEntry {
+  hash: string; // SHA-256 of data
+  data: Blob;
+  size: number;
+  type: string;
+}
+
+// Searchable terms of one loan or document for GlobalSearch, with a weight
+// per term (see services/QuickSearchIndex.ts)
+export interface QuickSearchRecord {
+  ref: string; // 'loan:<id>' or 'doc:<id>'
+  terms: string[];
+  weights: number[]; // Parallel to terms
+}
+
+// One counter of the materialized portfolio summary (see services/PortfolioAggregates.ts),
+// or of the retrieval index's BM25 statistics: 'records', 'length' and 'df:<term>'
+export interface AggregateCounter {
+  key: string; // e.g. 'loans', 'exposureMinor', 'risk:Critical', 'typeExposure:Term Loan B'
+  value: number;
+}
+
 export class AppDatabase extends Dexie {
   users!: Table<User>;
   docs!: Table<Doc, number>; // Primary key is number (auto-incremented)
@@ -54,6 +113,13 @@ export class AppDatabase extends Dexie {
   alerts!: Table<Alert, number>;
   queries!: Table<Query, number>;
   notifications!: Table<Notification, number>;
+  analysisCache!: Table<AnalysisCacheEntry, string>;
+  searchRecords!: Table<SearchRecord, string>;
+  searchPostings!: Table<SearchPosting, [string, string]>;
+  searchStats!: Table<AggregateCounter, string>;
+  aggregates!: Table<AggregateCounter, string>;
+  blobs!: Table<BlobEntry, string>;
+  quickSearch!: Table<QuickSearchRecord, string>;
 
   constructor() {
     super('LMA_DocPulse_DB');
@@ -66,11 +132,123 @@ export class AppDatabase extends Dexie {
       queries: '++id, timestamp',
       notifications: '++id, type, read, timestamp'
     });
+    this.version(5).stores({
+      // [lastUsed+size] lets eviction walk entries oldest first from the index alone
+      analysisCache: 'key, hash, [lastUsed+size]'
+    });
+    this.version(6).stores({
+      // Built from the loans and docs tables, so there is nothing to migrate;
+      // RetrievalIndex backfills on startup
+      searchRecords: 'ref, owner, length',
+      searchPostings: '[term+ref], ref'
+    });
+    this.version(7).stores({
+      // Numeric amount and dates for indexed sums, sorting and range scans
+      loans: 'id, counterparty, risk, status, type, amountMinor, deadlineTs, dateTs'
+    }).upgrade(tx =>
+      tx.table('loans').toCollection().modify((loan: Loan) => {
+        Object.assign(loan, normalizeLoanFields(loan));
+      })
+    );
+
+    this.version(8).stores({
+      // Filled from loans and docs by PortfolioAggregates on startup
+      aggregates: 'key'
+    });
+
+    this.version(9).stores({
+      // contentHash is indexed so a blob can be dropped once no doc references it
+      docs: '++id, name, type, status, date, contentHash',
+      blobs: 'hash'
+    }).upgrade(async tx => {
+      // Move inline binaries out of docs, one at a time to keep memory flat
+      const docs = tx.table('docs');
+      const blobs = tx.table('blobs');
+      const keys = await docs.filter(doc => !!doc.fileData).primaryKeys();
+      for (const key of keys) {
+        const doc = await docs.get(key);
+        const data: Blob = doc.fileData;
+        // waitFor keeps the upgrade transaction alive across the non-IndexedDB hashing
+        const hash = doc.contentHash ?? await Dexie.waitFor(hashContent(data));
+        await blobs.put({ hash, data, size: data.size, type: data.type });
+        delete doc.fileData;
+        doc.contentHash = hash;
+        await docs.put(doc);
+      }
+    });
+
+    this.version(10).stores({
+      // multiEntry terms: a prefix lookup is one range scan. Built from loans
+      // and docs by QuickSearchIndex on startup
+      quickSearch: 'ref, *terms'
+    });
+
+    this.version(11).stores({
+      // Queries read N and the average length from searchStats, so the
+      // length index is no longer needed. RetrievalIndex rebuilds on startup
+      searchRecords: 'ref, owner',
+      searchStats: 'key'
+    });
+
+    this.version(12).stores({
+      // Numeric times for the notifications feed, which pages each table in
+      // the order it merges them
+      docs: '++id, name, type, status, date, contentHash, dateTs',
+      alerts: '++id, type, createdAt'
+    }).upgrade(async tx => {
+      const upgradedAt = Date.now();
+      await tx.table('docs').toCollection().modify((doc: Doc) => {
+        doc.dateTs = parseDateTs(doc.date) ?? upgradedAt;
+      });
+      // Free-text times ('now') have no date; keep those alerts in insertion order
+      const alerts = tx.table('alerts');
+      const lastId: number = (await alerts.orderBy(':id').lastKey()) ?? 0;
+      await alerts.toCollection().modify((alert: Alert) => {
+        alert.createdAt = parseDateTs(alert.time) ?? upgradedAt - (lastId - (alert.id ?? 0));
+      });
+    });
+
+    this.version(13).stores({}).upgrade(tx =>
+      // Sort columns are now always set, so loans with an unparseable amount
+      // or date are back in the amountMinor and dateTs indexes
+      tx.table('loans').toCollection().modify((loan: Loan) => {
+        Object.assign(loan, normalizeLoanFields(loan));
+      })
+    );
+
+    // Keep the derived columns in step with the display strings on every write
+    this.loans.hook('creating', (_key, loan) => {
+      Object.assign(loan, normalizeLoanFields(loan));
+    });
+    this.loans.hook('updating', (mods, _key, loan) => {
+      const changes = mods as Partial<Loan>;
+      if ('amount' in changes || 'deadline' in changes || 'date' in changes) {
+        return normalizeLoanFields({ ...loan, ...changes });
+      }
+      return undefined;
+    });
+    this.docs.hook('creating', (_key, doc) => {
+      doc.dateTs = parseDateTs(doc.date) ?? Date.now();
+    });
+    this.docs.hook('updating', (mods, _key, doc) => {
+      const changes = mods as Partial<Doc>;
+      if ('date' in changes) return { dateTs: parseDateTs(changes.date) ?? doc.dateTs ?? Date.now() };
+      return undefined;
+    });
+    this.alerts.hook('creating', (_key, alert) => {
+      if (alert.createdAt === undefined) alert.createdAt = parseDateTs(alert.time) ?? Date.now();
+    });
   }
 }
 
 export const db = new AppDatabase();
 
+// Verification tooling (verification/seed_data.py) sets this flag from a
+// Playwright init script so it can bulk-seed through the Dexie instance
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_DB__) {
+  (window as any).__docpulseDb = db;
+}
+
 // No mock data seeding - application starts completely empty
 // All data comes from user uploads and interactions
 
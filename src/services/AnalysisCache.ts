@@ -0,0 +1,107 @@
+import { db, AnalysisCacheEntry } from '../db';
+export { hashContent } from '../utils/hash';
+
+// Content-addressed cache for document analysis. Entries are keyed by the
+// SHA-256 of the document's bytes plus the version of whatever produced the
+// value (text extractor, regex analyzer or LLM prompt), so a duplicate upload
+// or a re-analysis resolves from IndexedDB, while bumping a version quietly
+// invalidates the old entries. The table is bounded by total size and evicts
+// least recently used entries first.
+
+export type AnalysisCacheKind = AnalysisCacheEntry['kind'];
+
+export const MAX_CACHE_BYTES = 64 * 1024 * 1024;
+
+const cacheKey = (hash: string, kind: AnalysisCacheKind, version: string) => `${hash}:${kind}:${version}`;
+
+const approximateSize = (value: unknown) =>
+    (typeof value === 'string' ? value.length : JSON.stringify(value)?.length ?? 0) * 2;
+
+export async function getCached<T>(hash: string, kind: AnalysisCacheKind, version: string): Promise<T | undefined> {
+    try {
+        const key = cacheKey(hash, kind, version);
+        const entry = await db.analysisCache.get(key);
+        if (!entry) return undefined;
+        await db.analysisCache.update(key, { lastUsed: Date.now() });
+        return entry.value as T;
+    } catch (error) {
+        // A cache failure should only ever cost a recomputation
+        console.warn('Analysis cache read failed:', error);
+        return undefined;
+    }
+}
+
+export async function putCached<T>(hash: string, kind: AnalysisCacheKind, version: string, value: T): Promise<void> {
+    try {
+        await db.analysisCache.put({
+            key: cacheKey(hash, kind, version),
+            hash,
+            kind,
+            version,
+            value,
+            size: approximateSize(value),
+            lastUsed: Date.now(),
+        });
+        scheduleEviction();
+    } catch (error) {
+        console.warn('Analysis cache write failed:', error);
+    }
+}
+
+export async function deleteCached(hash: string, kind: AnalysisCacheKind, version: string): Promise<void> {
+    try {
+        await db.analysisCache.delete(cacheKey(hash, kind, version));
+    } catch (error) {
+        console.warn('Analysis cache delete failed:', error);
+    }
+}
+
+/**
+ * Return the cached value, or compute, store and return it
+ */
+export async function withCache<T>(hash: string, kind: AnalysisCacheKind, version: string, compute: () => Promise<T>): Promise<T> {
+    const cached = await getCached<T>(hash, kind, version);
+    if (cached !== undefined) return cached;
+    const value = await compute();
+    await putCached(hash, kind, version, value);
+    return value;
+}
+
+let eviction: Promise<unknown> | null = null;
+
+function scheduleEviction() {
+    if (!eviction) {
+        eviction = evict()
+            .catch(error => console.warn('Analysis cache eviction failed:', error))
+            .finally(() => { eviction = null; });
+    }
+}
+
+/**
+ * Delete least recently used entries until the cache fits in maxBytes.
+ * Walks the [lastUsed+size] index, so no cached values are loaded.
+ */
+export async function evict(maxBytes = MAX_CACHE_BYTES): Promise<number> {
+    const entries: { key: string; size: number }[] = [];
+    let total = 0;
+    await db.analysisCache.orderBy('[lastUsed+size]').eachKey((indexKey, cursor) => {
+        const size = (indexKey as [number, number])[1];
+        entries.push({ key: cursor.primaryKey as string, size });
+        total += size;
+    });
+
+    const stale: string[] = [];
+    for (const entry of entries) {
+        if (total <= maxBytes) break;
+        stale.push(entry.key);
+        total -= entry.size;
+    }
+    if (stale.length > 0) {
+        await db.analysisCache.bulkDelete(stale);
+    }
+    return stale.length;
+}
+
+export async function clearAnalysisCache(): Promise<void> {
+    await db.analysisCache.clear();
+}
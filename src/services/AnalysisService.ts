@@ -0,0 +1,218 @@
+import { analyzeDocument, ANALYZER_VERSION, DocumentExtractionResult } from './DocumentAnalyzer';
+import { getCached, hashContent, putCached } from './AnalysisCache';
+import { DocumentProcessor } from './DocumentProcessor';
+
+// Messages exchanged with analysis.worker.ts
+export type AnalysisWorkerRequest =
+    | { type: 'analyze'; id: number; data: ArrayBuffer }
+    | { type: 'rescan'; id: number; pages: { page: number; text: string }[] } // OCR text for a finished job's scanned pages
+    | { type: 'release'; id: number } // The job's scanned pages won't be rescanned
+    | { type: 'cancel'; id: number };
+
+export type AnalysisWorkerResponse =
+    | { type: 'page'; id: number; page: number; numPages: number; partial: DocumentExtractionResult }
+    | { type: 'done'; id: number; result: DocumentExtractionResult; scannedPages: number[] }
+    | { type: 'cancelled'; id: number }
+    | { type: 'error'; id: number; message: string };
+
+export interface AnalysisProgress {
+    page: number;
+    numPages: number;
+    partial: DocumentExtractionResult; // Findings from the pages parsed so far
+    ocr?: { done: number; total: number }; // Scanned pages recognized so far, once OCR has started
+}
+
+export interface AnalyzeOptions {
+    onProgress?: (progress: AnalysisProgress) => void;
+    signal?: AbortSignal;
+}
+
+interface WorkerAnalysis {
+    id: number;
+    result: DocumentExtractionResult;
+    scannedPages: number[]; // 1-based pages without a text layer
+}
+
+interface PendingAnalysis {
+    resolve: (analysis: WorkerAnalysis) => void;
+    reject: (error: Error) => void;
+    onProgress?: (progress: AnalysisProgress) => void;
+}
+
+/**
+ * Runs document analysis in a dedicated Web Worker. The file's bytes are
+ * transferred to the worker rather than copied, findings stream back page by
+ * page, and an analysis can be cancelled through an AbortSignal. Documents
+ * with scanned pages are then OCRed (see DocumentProcessor) and rescanned.
+ */
+export class AnalysisService {
+    private static instance: AnalysisService;
+    private worker: Worker | null = null;
+    private pending = new Map<number, PendingAnalysis>();
+    private nextId = 1;
+
+    private constructor() { }
+
+    public static getInstance(): AnalysisService {
+        if (!AnalysisService.instance) {
+            AnalysisService.instance = new AnalysisService();
+        }
+        return AnalysisService.instance;
+    }
+
+    private getWorker(): Worker {
+        if (!this.worker) {
+            this.worker = new Worker(new URL('./analysis.worker.ts', import.meta.url), { type: 'module' });
+            this.worker.onmessage = (event: MessageEvent<AnalysisWorkerResponse>) => this.handleMessage(event.data);
+            this.worker.onerror = (event) => this.failAll(new Error(event.message || 'Analysis worker failed'));
+        }
+        return this.worker;
+    }
+
+    private handleMessage(message: AnalysisWorkerResponse) {
+        const job = this.pending.get(message.id);
+        if (!job) return;
+
+        switch (message.type) {
+            case 'page':
+                job.onProgress?.({ page: message.page, numPages: message.numPages, partial: message.partial });
+                return;
+            case 'done':
+                job.resolve({ id: message.id, result: message.result, scannedPages: message.scannedPages });
+                break;
+            case 'cancelled':
+                job.reject(new DOMException('Analysis cancelled', 'AbortError'));
+                break;
+            case 'error':
+                job.reject(new Error(message.message));
+                break;
+        }
+        this.pending.delete(message.id);
+    }
+
+    private failAll(error: Error) {
+        this.pending.forEach(job => job.reject(error));
+        this.pending.clear();
+        this.worker?.terminate();
+        this.worker = null;
+    }
+
+    /**
+     * Analyze a PDF off the main thread. Documents analyzed before resolve from
+     * the analysis cache by content hash. Rejects with an AbortError when the
+     * signal fires; falls back to the main thread where workers are unavailable
+     * (without OCR, which needs workers too).
+     */
+    public async analyze(fileData: Blob, { onProgress, signal }: AnalyzeOptions = {}): Promise<DocumentExtractionResult> {
+        if (signal?.aborted) {
+            throw new DOMException('Analysis cancelled', 'AbortError');
+        }
+
+        const data = await fileData.arrayBuffer();
+        const hash = await hashContent(data);
+        const cached = await getCached<DocumentExtractionResult>(hash, 'findings', ANALYZER_VERSION);
+        if (cached) return cached;
+
+        let result: DocumentExtractionResult;
+        if (typeof Worker === 'undefined') {
+            result = await analyzeDocument(fileData);
+        } else {
+            const analysis = await this.analyzeInWorker(data, onProgress, signal);
+            result = analysis.result;
+            if (analysis.scannedPages.length > 0) {
+                const rescanned = await this.analyzeWithOcr(fileData, analysis, onProgress, signal);
+                // Text layer findings alone aren't cached, so the next analysis retries OCR
+                if (!rescanned) return result;
+                result = rescanned;
+            }
+        }
+        await putCached(hash, 'findings', ANALYZER_VERSION, result);
+        return result;
+    }
+
+    /**
+     * OCR the pages that had no text layer and have the worker rescan the
+     * document with their text. The text layer findings stay the partial
+     * result while OCR runs. Resolves to null when OCR fails.
+     */
+    private async analyzeWithOcr(
+        fileData: Blob,
+        { id, result: textLayerResult, scannedPages }: WorkerAnalysis,
+        onProgress?: (progress: AnalysisProgress) => void,
+        signal?: AbortSignal,
+    ): Promise<DocumentExtractionResult | null> {
+        try {
+            const pages = await DocumentProcessor.getInstance().recognize(fileData, scannedPages, {
+                signal,
+                onProgress: ({ numPages, ocrPages, ocrDone }) => {
+                    onProgress?.({ page: numPages, numPages, partial: textLayerResult, ocr: { done: ocrDone, total: ocrPages } });
+                },
+            });
+            const rescanned = await this.postJob(id, { type: 'rescan', id, pages: pages.map(({ page, text }) => ({ page, text })) }, undefined, signal);
+            return rescanned.result;
+        } catch (error) {
+            // The worker drops the page texts on a rescan; this covers failures before one
+            this.worker?.postMessage({ type: 'release', id } satisfies AnalysisWorkerRequest);
+            if (isAbortError(error)) throw error;
+            console.warn('OCR failed; using the text layer findings', error);
+            return null;
+        }
+    }
+
+    private analyzeInWorker(
+        data: ArrayBuffer,
+        onProgress?: (progress: AnalysisProgress) => void,
+        signal?: AbortSignal,
+    ): Promise<WorkerAnalysis> {
+        const id = this.nextId++;
+        return this.postJob(id, { type: 'analyze', id, data }, onProgress, signal, [data]);
+    }
+
+    /**
+     * Send a request to the worker and settle with the job's result
+     */
+    private postJob(
+        id: number,
+        request: AnalysisWorkerRequest,
+        onProgress?: (progress: AnalysisProgress) => void,
+        signal?: AbortSignal,
+        transfer: Transferable[] = [],
+    ): Promise<WorkerAnalysis> {
+        if (signal?.aborted) {
+            return Promise.reject(new DOMException('Analysis cancelled', 'AbortError'));
+        }
+        const worker = this.getWorker();
+
+        return new Promise<WorkerAnalysis>((resolve, reject) => {
+            const onAbort = () => {
+                const job = this.pending.get(id);
+                if (!job) return;
+                // Settle straight away; the worker stops at its next page boundary
+                this.pending.delete(id);
+                worker.postMessage({ type: 'cancel', id } satisfies AnalysisWorkerRequest);
+                job.reject(new DOMException('Analysis cancelled', 'AbortError'));
+            };
+            const cleanup = () => signal?.removeEventListener('abort', onAbort);
+
+            this.pending.set(id, {
+                resolve: (analysis) => { cleanup(); resolve(analysis); },
+                reject: (error) => { cleanup(); reject(error); },
+                onProgress,
+            });
+            signal?.addEventListener('abort', onAbort);
+
+            worker.postMessage(request, transfer);
+        });
+    }
+}
+
+export const isAbortError = (error: unknown) =>
+    error instanceof DOMException && error.name === 'AbortError';
+
+// Lets verification/benchmark_analyzer.py time the worker path next to the in-page scan
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_ANALYZER__) {
+    (window as any).__docpulseAnalyzer = {
+        ...(window as any).__docpulseAnalyzer,
+        analyzeInWorker: (fileData: Blob, options?: AnalyzeOptions) => AnalysisService.getInstance().analyze(fileData, options),
+    };
+}
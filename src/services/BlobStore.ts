@@ -0,0 +1,33 @@
+import { db } from '../db';
+
+// Content-addressed storage for uploaded files. The docs table keeps only
+// metadata and the file's SHA-256 (Doc.contentHash); the bytes live in the
+// blobs table, stored once however many docs share them, and are read only
+// when a document is previewed, downloaded or analyzed.
+
+/**
+ * Store a file's bytes under its hash, unless they're already stored.
+ * Call inside the transaction that adds the referencing doc.
+ */
+export async function putBlob(hash: string, data: Blob): Promise<void> {
+    if (await db.blobs.where('hash').equals(hash).count() > 0) return;
+    // A plain Blob rather than the File, which not every browser persists reliably
+    await db.blobs.add({ hash, data: data.slice(0, data.size, data.type), size: data.size, type: data.type });
+}
+
+export async function getBlob(hash: string): Promise<Blob | undefined> {
+    return (await db.blobs.get(hash))?.data;
+}
+
+/**
+ * Delete a doc, and its stored file once no other doc references it
+ */
+export async function deleteDocWithBlob(id: number): Promise<void> {
+    await db.transaction('rw', db.docs, db.blobs, async () => {
+        const doc = await db.docs.get(id);
+        await db.docs.delete(id);
+        if (doc?.contentHash && await db.docs.where('contentHash').equals(doc.contentHash).count() === 0) {
+            await db.blobs.delete(doc.contentHash);
+        }
+    });
+}
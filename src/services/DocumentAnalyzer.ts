@@ -1,8 +1,13 @@
 import * as pdfjsLib from 'pdfjs-dist';
+import { PatternScanner, ScanHit, ScanRule } from './PatternScanner';
 
 // Configure worker
 pdfjsLib.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjsLib.version}/build/pdf.worker.min.mjs`;
 
+// Bump when extraction or scan rules change what analyzeText returns, so
+// cached findings (services/AnalysisCache.ts) are recomputed
+export const ANALYZER_VERSION = '2';
+
 export interface ExtractedEventOfDefault {
     type: string;
     status: 'Active' | 'Potential' | 'Resolved';
@@ -68,26 +73,132 @@ const DATE_PATTERNS = [
 // Clause reference pattern
 const CLAUSE_REF_PATTERN = /(?:clause|section|article)\s+(\d+(?:\.\d+)?)/gi;
 
+// Plain substrings the section heuristics look for, matched case-insensitively
+const DEVIATION_KEYWORDS = ['non-standard', 'deviation', 'modified'];
+const RISK_KEYWORDS = ['libor', 'sofr', 'unlimited', 'liability', 'waiver', 'right', 'governing law', 'jurisdiction'];
+
+const escapeRegExp = (value: string) => value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+
+// Every pattern table above, compiled into one single-pass scanner
+const SCAN_RULES: ScanRule[] = [
+    ...EVENT_OF_DEFAULT_PATTERNS.map(({ pattern, type }) => ({ id: type, kind: 'event' as const, pattern })),
+    ...COVENANT_PATTERNS.map(({ pattern, name }) => ({ id: name, kind: 'covenant' as const, pattern })),
+    ...DATE_PATTERNS.map(({ pattern, type }) => ({ id: type, kind: 'date' as const, pattern })),
+    ...ENTITY_PATTERNS.map((pattern, index) => ({ id: `entity-${index}`, kind: 'entity' as const, pattern })),
+    { id: 'clause', kind: 'clause' as const, pattern: CLAUSE_REF_PATTERN },
+    ...[...DEVIATION_KEYWORDS, ...RISK_KEYWORDS].map(keyword => ({
+        id: keyword,
+        kind: 'keyword' as const,
+        pattern: new RegExp(escapeRegExp(keyword), 'i'),
+    })),
+];
+
+const scanner = new PatternScanner(SCAN_RULES);
+
 /**
- * Extract text content from a PDF file
+ * Hits from one scan, indexed the way the section extractors read them
  */
-export async function extractTextFromPdf(fileData: Blob): Promise<string> {
-    try {
-        const arrayBuffer = await fileData.arrayBuffer();
-        const pdf = await pdfjsLib.getDocument({ data: arrayBuffer }).promise;
+export interface TextScan {
+    hits: ScanHit[];
+    firstById: Map<string, ScanHit>;
+    clauses: ScanHit[];
+    keywords: Set<string>;
+}
+
+/**
+ * Index scan hits for the section extractors
+ */
+function indexHits(hits: ScanHit[]): TextScan {
+    const firstById = new Map<string, ScanHit>();
+    const clauses: ScanHit[] = [];
+    const keywords = new Set<string>();
+
+    for (const hit of hits) {
+        if (!firstById.has(hit.id)) firstById.set(hit.id, hit);
+        if (hit.kind === 'clause') clauses.push(hit);
+        if (hit.kind === 'keyword') keywords.add(hit.id);
+    }
+
+    return { hits, firstById, clauses, keywords };
+}
+
+/**
+ * Scan the text once and index the hits
+ */
+export function scanText(text: string): TextScan {
+    return indexHits(scanner.scan(text));
+}
+
+/**
+ * Clause reference for a mention at `anchor`: the closest one starting before
+ * it within `before` characters, else the first one after it within `after`
+ */
+function clauseRefNear(scan: TextScan, anchor: number, before: number, after: number, textLength: number): string | undefined {
+    const from = Math.max(0, anchor - before);
+    const to = Math.min(textLength, anchor + after);
+
+    // Clause hits are in offset order, so binary search for the first one after the anchor
+    let lo = 0;
+    let hi = scan.clauses.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (scan.clauses[mid].start <= anchor) lo = mid + 1;
+        else hi = mid;
+    }
+    const preceding = scan.clauses[lo - 1];
+    if (preceding && preceding.start >= from) return `Clause ${preceding.groups[0]}`;
+    const following = scan.clauses[lo];
+    if (following && following.end <= to) return `Clause ${following.groups[0]}`;
+    return undefined;
+}
+
+// A page with fewer characters than this in its text layer (a scan with a
+// stamped page number, say) is treated as an image and needs OCR
+const MIN_TEXT_LAYER_CHARS = 20;
 
-        let fullText = '';
+/**
+ * Whether a page's text layer holds real text
+ */
+export const hasTextLayer = (pageText: string) =>
+    pageText.replace(/\s+/g, '').length >= MIN_TEXT_LAYER_CHARS;
 
+export interface PdfPageText {
+    page: number;
+    numPages: number;
+    text: string;
+}
+
+/**
+ * Yield the text layer of each page as soon as pdf.js has parsed it
+ */
+export async function* extractPdfPages(data: ArrayBuffer): AsyncGenerator<PdfPageText> {
+    const pdf = await pdfjsLib.getDocument({ data }).promise;
+    try {
         for (let i = 1; i <= pdf.numPages; i++) {
             const page = await pdf.getPage(i);
             const textContent = await page.getTextContent();
-            const pageText = textContent.items
+            const text = textContent.items
                 .map((item: any) => item.str)
                 .join(' ');
-            fullText += pageText + '\n';
+            page.cleanup();
+            yield { page: i, numPages: pdf.numPages, text };
+        }
+    } finally {
+        await pdf.destroy();
+    }
+}
+
+/**
+ * Extract text content from a PDF file
+ */
+export async function extractTextFromPdf(fileData: Blob): Promise<string> {
+    try {
+        const pages: string[] = [];
+        for await (const { text } of extractPdfPages(await fileData.arrayBuffer())) {
+            pages.push(text);
         }
 
-        return fullText;
+        return pages.length > 0 ? pages.join('\n') + '\n' : '';
     } catch (error) {
         console.error('Error extracting PDF text:', error);
         return '';
@@ -95,30 +206,23 @@ export async function extractTextFromPdf(fileData: Blob): Promise<string> {
 }
 
 /**
- * Analyze extracted text for events of default
+ * Derive events of default from the scan
  */
-function extractEventsOfDefault(text: string): ExtractedEventOfDefault[] {
+function extractEventsOfDefault(scan: TextScan, textLength: number): ExtractedEventOfDefault[] {
     const events: ExtractedEventOfDefault[] = [];
-    const foundTypes = new Set<string>();
-
-    for (const { pattern, type, riskLevel } of EVENT_OF_DEFAULT_PATTERNS) {
-        const matches = text.match(pattern);
-        if (matches && !foundTypes.has(type)) {
-            foundTypes.add(type);
-
-            // Try to find associated clause reference
-            const contextStart = Math.max(0, text.indexOf(matches[0]) - 100);
-            const contextEnd = Math.min(text.length, text.indexOf(matches[0]) + 200);
-            const context = text.slice(contextStart, contextEnd);
 
-            const clauseMatch = context.match(CLAUSE_REF_PATTERN);
+    for (const { type, riskLevel } of EVENT_OF_DEFAULT_PATTERNS) {
+        const hit = scan.firstById.get(type);
+        if (hit) {
+            // Look for the associated clause reference around the mention
+            const clauseRef = clauseRefNear(scan, hit.start, 100, 200, textLength);
 
             events.push({
                 type,
                 status: 'Potential', // Default to potential since we're just detecting mentions
                 riskLevel,
                 summary: `Detected mention of ${type.toLowerCase()} clause in document`,
-                clauseRef: clauseMatch ? `Clause ${clauseMatch[1]}` : undefined,
+                clauseRef,
             });
         }
     }
@@ -127,30 +231,22 @@ function extractEventsOfDefault(text: string): ExtractedEventOfDefault[] {
 }
 
 /**
- * Analyze extracted text for financial covenants
+ * Derive financial covenants from the scan
  */
-function extractFinancialCovenants(text: string): ExtractedCovenant[] {
+function extractFinancialCovenants(scan: TextScan, textLength: number): ExtractedCovenant[] {
     const covenants: ExtractedCovenant[] = [];
 
-    for (const { pattern, name } of COVENANT_PATTERNS) {
-        const match = text.match(pattern);
-        if (match && match[1]) {
-            // Try to find associated clause reference
-            const contextStart = Math.max(0, text.indexOf(match[0]) - 100);
-            const contextEnd = Math.min(text.length, text.indexOf(match[0]) + 100);
-            const context = text.slice(contextStart, contextEnd);
-
-            const clauseMatch = context.match(CLAUSE_REF_PATTERN);
-
-            // Determine if it's standard or deviation (simplified logic)
-            const isDeviation = text.toLowerCase().includes('non-standard') ||
-                text.toLowerCase().includes('deviation') ||
-                text.toLowerCase().includes('modified');
+    // Determine if it's standard or deviation (simplified logic)
+    const isDeviation = DEVIATION_KEYWORDS.some(keyword => scan.keywords.has(keyword));
 
+    for (const { name } of COVENANT_PATTERNS) {
+        const hit = scan.firstById.get(name);
+        if (hit && hit.groups[0]) {
             covenants.push({
                 termName: name,
-                value: match[1] + (name.includes('Ratio') || name.includes('Cover') ? 'x' : ''),
-                clauseRef: clauseMatch ? `Clause ${clauseMatch[1]}` : undefined,
+                value: hit.groups[0] + (name.includes('Ratio') || name.includes('Cover') ? 'x' : ''),
+                // Look for the associated clause reference around the covenant
+                clauseRef: clauseRefNear(scan, hit.start, 100, 100, textLength),
                 status: isDeviation ? 'DEVIATION' : 'LMA STANDARD',
             });
         }
@@ -160,36 +256,40 @@ function extractFinancialCovenants(text: string): ExtractedCovenant[] {
 }
 
 /**
- * Extract entities (company names, parties) from text
+ * Derive entities (company names, parties) from the scan
  */
-function extractEntities(text: string): string[] {
+function extractEntities(scan: TextScan): string[] {
     const entities: string[] = [];
     const seen = new Set<string>();
 
-    for (const pattern of ENTITY_PATTERNS) {
-        let match;
-        while ((match = pattern.exec(text)) !== null) {
-            const entity = match[1].trim().replace(/[,.]$/, '');
+    ENTITY_PATTERNS.forEach((_, index) => {
+        const id = `entity-${index}`;
+        // A global regex resumes after each match, so skip hits nested inside the previous one
+        let lastEnd = -1;
+        for (const hit of scan.hits) {
+            if (hit.id !== id || hit.start < lastEnd) continue;
+            lastEnd = hit.end;
+            const entity = (hit.groups[0] ?? '').trim().replace(/[,.]$/, '');
             if (entity.length > 3 && entity.length < 100 && !seen.has(entity.toLowerCase())) {
                 seen.add(entity.toLowerCase());
                 entities.push(entity);
             }
         }
-    }
+    });
 
     return entities.slice(0, 5); // Limit to 5 entities
 }
 
 /**
- * Extract critical dates from text
+ * Derive critical dates from the scan
  */
-function extractCriticalDates(text: string): { type: string; date: string }[] {
+function extractCriticalDates(scan: TextScan): { type: string; date: string }[] {
     const dates: { type: string; date: string }[] = [];
 
-    for (const { pattern, type } of DATE_PATTERNS) {
-        const match = text.match(pattern);
-        if (match && match[1]) {
-            dates.push({ type, date: match[1] });
+    for (const { type } of DATE_PATTERNS) {
+        const hit = scan.firstById.get(type);
+        if (hit && hit.groups[0]) {
+            dates.push({ type, date: hit.groups[0] });
         }
     }
 
@@ -197,25 +297,26 @@ function extractCriticalDates(text: string): { type: string; date: string }[] {
 }
 
 /**
- * Identify risk flags in the document
+ * Identify risk flags from the keywords found in the scan. Missing-clause
+ * flags are only raised once the whole document has been scanned.
  */
-function extractRiskFlags(text: string): string[] {
+function extractRiskFlags(scan: TextScan, complete = true): string[] {
     const flags: string[] = [];
-    const lowerText = text.toLowerCase();
+    const has = (keyword: string) => scan.keywords.has(keyword);
 
-    if (lowerText.includes('libor') && !lowerText.includes('sofr')) {
+    if (has('libor') && !has('sofr')) {
         flags.push('LIBOR reference without SOFR fallback');
     }
-    if (lowerText.includes('unlimited') && lowerText.includes('liability')) {
+    if (has('unlimited') && has('liability')) {
         flags.push('Unlimited liability clause detected');
     }
-    if (lowerText.includes('waiver') && lowerText.includes('right')) {
+    if (has('waiver') && has('right')) {
         flags.push('Rights waiver clause detected');
     }
-    if (!lowerText.includes('governing law')) {
+    if (complete && !has('governing law')) {
         flags.push('Missing governing law clause');
     }
-    if (!lowerText.includes('jurisdiction')) {
+    if (complete && !has('jurisdiction')) {
         flags.push('Missing jurisdiction clause');
     }
 
@@ -223,11 +324,9 @@ function extractRiskFlags(text: string): string[] {
 }
 
 /**
- * Main function to analyze a document and extract all relevant data
+ * Analyze already extracted text in a single scan
  */
-export async function analyzeDocument(fileData: Blob): Promise<DocumentExtractionResult> {
-    const text = await extractTextFromPdf(fileData);
-
+export function analyzeText(text: string): DocumentExtractionResult {
     if (!text || text.trim().length < 100) {
         // Return empty result if no meaningful text extracted
         return {
@@ -239,11 +338,116 @@ export async function analyzeDocument(fileData: Blob): Promise<DocumentExtractio
         };
     }
 
+    const scan = scanText(text);
+
     return {
-        entities: extractEntities(text),
-        eventsOfDefault: extractEventsOfDefault(text),
-        financialCovenants: extractFinancialCovenants(text),
-        criticalDates: extractCriticalDates(text),
-        riskFlags: extractRiskFlags(text),
+        entities: extractEntities(scan),
+        eventsOfDefault: extractEventsOfDefault(scan, text.length),
+        financialCovenants: extractFinancialCovenants(scan, text.length),
+        criticalDates: extractCriticalDates(scan),
+        riskFlags: extractRiskFlags(scan),
     };
 }
+
+// Hits ending this close to the end of the text seen so far may still grow or
+// change once the next page arrives, so they are rescanned with it
+const INCREMENTAL_TAIL = 1000;
+
+/**
+ * Page-by-page analysis that scans each page's text once as it arrives.
+ * partial() derives the findings from the pages seen so far; finish() returns
+ * exactly what analyzeText would for the whole document.
+ */
+export class IncrementalAnalysis {
+    private pages: string[] = [];
+    private length = 0;
+    private hits: ScanHit[] = [];
+    // Text from scanFrom on; only this unsettled tail is rescanned with the next page
+    private tail = '';
+    private scanFrom = 0;
+
+    addPage(pageText: string) {
+        const text = pageText + '\n';
+        this.pages.push(text);
+        this.length += text.length;
+        this.tail += text;
+
+        const fresh = scanner.scan(this.tail);
+        const settledEnd = this.tail.length - INCREMENTAL_TAIL;
+        let nextFrom = Math.max(0, settledEnd);
+        for (const hit of fresh) {
+            if (hit.end > settledEnd) nextFrom = Math.min(nextFrom, hit.start);
+        }
+        for (const hit of fresh) {
+            if (hit.start >= nextFrom) break;
+            hit.start += this.scanFrom;
+            hit.end += this.scanFrom;
+            this.hits.push(hit);
+        }
+        this.tail = this.tail.slice(nextFrom);
+        this.scanFrom += nextFrom;
+    }
+
+    partial(): DocumentExtractionResult {
+        const scan = indexHits(this.hits);
+        return {
+            entities: extractEntities(scan),
+            eventsOfDefault: extractEventsOfDefault(scan, this.length),
+            financialCovenants: extractFinancialCovenants(scan, this.length),
+            criticalDates: extractCriticalDates(scan),
+            riskFlags: extractRiskFlags(scan, false),
+        };
+    }
+
+    finish(): DocumentExtractionResult {
+        return analyzeText(this.pages.join(''));
+    }
+}
+
+export interface ScanBenchmarkResult {
+    chars: number;
+    iterations: number;
+    hits: number;
+    medianMs: number;
+    minMs: number;
+    mbPerSecond: number;
+}
+
+/**
+ * Measure analyzeText throughput on the given text
+ */
+export function benchmarkAnalyzer(text: string, iterations = 5): ScanBenchmarkResult {
+    const timings: number[] = [];
+    const hits = scanText(text).hits.length; // Also warms up the regex JIT
+
+    for (let i = 0; i < iterations; i++) {
+        const start = performance.now();
+        analyzeText(text);
+        timings.push(performance.now() - start);
+    }
+    timings.sort((a, b) => a - b);
+    const medianMs = timings[Math.floor(timings.length / 2)];
+
+    return {
+        chars: text.length,
+        iterations,
+        hits,
+        medianMs,
+        minMs: timings[0],
+        mbPerSecond: medianMs > 0 ? (text.length / (1024 * 1024)) / (medianMs / 1000) : Infinity,
+    };
+}
+
+/**
+ * Main function to analyze a document and extract all relevant data
+ */
+export async function analyzeDocument(fileData: Blob): Promise<DocumentExtractionResult> {
+    const text = await extractTextFromPdf(fileData);
+    return analyzeText(text);
+}
+
+// Verification tooling (verification/benchmark_analyzer.py) sets this flag from
+// a Playwright init script to benchmark the analyzer on generated documents
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_ANALYZER__) {
+    (window as any).__docpulseAnalyzer = { extractTextFromPdf, analyzeText, benchmarkAnalyzer };
+}
@@ -1,8 +1,57 @@
-import { createWorker } from 'tesseract.js';
-import * as pdfjsWrapper from 'react-pdf';
+import { createScheduler, createWorker, Scheduler } from 'tesseract.js';
+import { pdfjs } from 'react-pdf';
+import { analyzeText, hasTextLayer } from './DocumentAnalyzer';
+import { withCache } from './AnalysisCache';
+import { hashContent } from '../utils/hash';
 
-// Note: In a real production app, we would configure the worker path more robustly
-// For this demo, we will use the default CDN worker or a mocked extraction if it fails.
+// Text extraction with OCR for scanned pages.
+//
+// Every page's pdf.js text layer is read first, which is fast. Only pages
+// without one (scanned agreements, signed annexes) are rendered to a canvas
+// and recognized by a pool of Tesseract workers behind a scheduler, so a
+// scanned document is OCRed across cores. OCR results are cached per page in
+// the analysis cache, keyed by the hash of the rendered pixels, so the same
+// scan in another upload or a re-analysis isn't recognized twice.
+
+// Same CDN worker as DocumentDetailView
+if (!pdfjs.GlobalWorkerOptions.workerSrc) {
+    pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`;
+}
+
+// Bump when rendering or recognition settings change (invalidates cached OCR)
+export const OCR_VERSION = '1';
+
+// Tesseract is most accurate around 200-300 DPI; PDF units are 1/72 inch
+const OCR_DPI = 200;
+// Each worker holds its own copy of the language model, so the pool stays small
+const MAX_OCR_WORKERS = 4;
+// The pool is torn down once it has been idle this long
+const OCR_IDLE_TIMEOUT_MS = 60_000;
+
+export interface PageText {
+    page: number;
+    text: string;
+    source: 'text-layer' | 'ocr';
+    confidence: number; // 0-100; 100 for text layers
+}
+
+export interface DocumentText {
+    numPages: number;
+    pages: PageText[];
+    confidence: number; // Mean over the pages
+}
+
+export interface ExtractionProgress {
+    numPages: number;
+    textPages: number; // Pages whose text layer has been read
+    ocrPages: number; // Pages without a text layer (found so far)
+    ocrDone: number; // Of those, pages recognized or read from the cache
+}
+
+export interface ExtractOptions {
+    onProgress?: (progress: ExtractionProgress) => void;
+    signal?: AbortSignal;
+}
 
 export interface ExtractionResult {
     text: string;
@@ -15,9 +64,31 @@ export interface ExtractionResult {
     };
 }
 
+interface OcrResult {
+    text: string;
+    confidence: number;
+}
+
+const AMOUNT_PATTERN = /(?:[$€£]|\b(?:USD|EUR|GBP)\s?)\d[\d,]*(?:\.\d+)?(?:\s?(?:million|billion|bn|m)\b)?/gi;
+
+/**
+ * Fraction of the extraction done, for progress bars
+ */
+export const extractionFraction = ({ numPages, textPages, ocrPages, ocrDone }: ExtractionProgress) =>
+    numPages + ocrPages > 0 ? (textPages + ocrDone) / (numPages + ocrPages) : 0;
+
+/**
+ * The pages' text joined the way extractTextFromPdf joins text layers
+ */
+export const joinPageText = (pages: PageText[]) =>
+    pages.length > 0 ? pages.map(({ text }) => text).join('\n') + '\n' : '';
+
 export class DocumentProcessor {
     private static instance: DocumentProcessor;
-    private worker: any;
+    private scheduler: Scheduler | null = null;
+    private starting: Promise<Scheduler> | null = null;
+    private activeJobs = 0;
+    private idleTimer: ReturnType<typeof setTimeout> | undefined;
 
     private constructor() { }
 
@@ -28,41 +99,203 @@ export class DocumentProcessor {
         return DocumentProcessor.instance;
     }
 
-    public async initialize() {
-        if (!this.worker) {
-            this.worker = await createWorker('eng');
+    /**
+     * Workers in the pool: one per spare core, up to MAX_OCR_WORKERS
+     */
+    public get poolSize(): number {
+        const cores = typeof navigator !== 'undefined' ? navigator.hardwareConcurrency || 2 : 2;
+        return Math.max(1, Math.min(MAX_OCR_WORKERS, cores - 1));
+    }
+
+    /**
+     * Start the OCR worker pool; extractText starts it on demand
+     */
+    public async initialize(): Promise<Scheduler> {
+        clearTimeout(this.idleTimer);
+        if (this.scheduler) return this.scheduler;
+        if (!this.starting) {
+            this.starting = (async () => {
+                const scheduler = createScheduler();
+                try {
+                    const workers = await Promise.all(Array.from({ length: this.poolSize }, () => createWorker('eng')));
+                    workers.forEach(worker => scheduler.addWorker(worker));
+                } catch (error) {
+                    await scheduler.terminate();
+                    throw error;
+                }
+                this.scheduler = scheduler;
+                return scheduler;
+            })().finally(() => { this.starting = null; });
         }
+        return this.starting;
     }
 
-    public async processDocument(file: File): Promise<ExtractionResult> {
-        console.log('Processing document:', file.name);
+    /**
+     * Text of every page: the text layer where there is one, OCR otherwise.
+     * Rejects with an AbortError when the signal fires.
+     */
+    public async extractText(data: Blob | ArrayBuffer, { onProgress, signal }: ExtractOptions = {}): Promise<DocumentText> {
+        const bytes = data instanceof Blob ? await data.arrayBuffer() : data.slice(0);
+        const pdf = await pdfjs.getDocument({ data: bytes }).promise;
+        try {
+            const progress: ExtractionProgress = { numPages: pdf.numPages, textPages: 0, ocrPages: 0, ocrDone: 0 };
+            const pages: PageText[] = [];
+            const scanned: number[] = [];
 
-        // Simulated extraction for demo purposes (since full browser PDF->Image->Tesseract pipeline is heavy)
-        // In a full implementation, we would:
-        // 1. Convert PDF pages to images using pdf.js canvas rendering
-        // 2. Pass images to Tesseract.js worker
-        // 3. Aggregate text and run NLP
+            for (let i = 1; i <= pdf.numPages; i++) {
+                signal?.throwIfAborted();
+                const page = await pdf.getPage(i);
+                const textContent = await page.getTextContent();
+                const text = textContent.items.map((item: any) => item.str ?? '').join(' ');
+                page.cleanup();
 
-        // Mock delay
-        await new Promise(resolve => setTimeout(resolve, 2000));
+                if (hasTextLayer(text)) {
+                    pages[i - 1] = { page: i, text, source: 'text-layer', confidence: 100 };
+                } else {
+                    scanned.push(i);
+                    progress.ocrPages++;
+                }
+                progress.textPages++;
+                onProgress?.({ ...progress });
+            }
+
+            if (scanned.length > 0) {
+                await this.recognizePages(pdf, scanned, pages, progress, onProgress, signal);
+            }
+
+            return {
+                numPages: pdf.numPages,
+                pages,
+                confidence: pages.length > 0 ? pages.reduce((sum, page) => sum + page.confidence, 0) / pages.length : 0,
+            };
+        } finally {
+            await pdf.destroy();
+        }
+    }
+
+    /**
+     * OCR text of the given pages (1-based), e.g. the scanned pages an
+     * analysis found. Rejects with an AbortError when the signal fires.
+     */
+    public async recognize(data: Blob | ArrayBuffer, pageNumbers: number[], { onProgress, signal }: ExtractOptions = {}): Promise<PageText[]> {
+        const bytes = data instanceof Blob ? await data.arrayBuffer() : data.slice(0);
+        const pdf = await pdfjs.getDocument({ data: bytes }).promise;
+        try {
+            const progress: ExtractionProgress = { numPages: pdf.numPages, textPages: pdf.numPages, ocrPages: pageNumbers.length, ocrDone: 0 };
+            const pages: PageText[] = [];
+            onProgress?.({ ...progress });
+            await this.recognizePages(pdf, pageNumbers, pages, progress, onProgress, signal);
+            return pages.filter(Boolean);
+        } finally {
+            await pdf.destroy();
+        }
+    }
+
+    /**
+     * OCR the given pages into `pages`. One page per worker is rendered at a
+     * time, so a long scan never holds more than poolSize canvases.
+     */
+    private async recognizePages(
+        pdf: any,
+        pageNumbers: number[],
+        pages: PageText[],
+        progress: ExtractionProgress,
+        onProgress?: (progress: ExtractionProgress) => void,
+        signal?: AbortSignal,
+    ) {
+        this.activeJobs++;
+        try {
+            const queue = [...pageNumbers];
+            const runner = async () => {
+                try {
+                    for (let next = queue.shift(); next !== undefined; next = queue.shift()) {
+                        signal?.throwIfAborted();
+                        const { text, confidence } = await this.recognizePage(pdf, next);
+                        pages[next - 1] = { page: next, text, source: 'ocr', confidence };
+                        progress.ocrDone++;
+                        onProgress?.({ ...progress });
+                    }
+                } catch (error) {
+                    queue.length = 0; // The other runners stop after their current page
+                    throw error;
+                }
+            };
+            // Let every runner stop before the document is destroyed, then surface the first failure
+            const outcomes = await Promise.allSettled(Array.from({ length: Math.min(this.poolSize, pageNumbers.length) }, runner));
+            const failed = outcomes.find((outcome): outcome is PromiseRejectedResult => outcome.status === 'rejected');
+            if (failed) throw failed.reason;
+        } finally {
+            this.activeJobs--;
+            this.scheduleIdleShutdown();
+        }
+    }
+
+    private async recognizePage(pdf: any, pageNumber: number): Promise<OcrResult> {
+        const page = await pdf.getPage(pageNumber);
+        const viewport = page.getViewport({ scale: OCR_DPI / 72 });
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.ceil(viewport.width);
+        canvas.height = Math.ceil(viewport.height);
+        try {
+            const context = canvas.getContext('2d', { willReadFrequently: true })!;
+            await page.render({ canvasContext: context, canvas, viewport }).promise;
+            const pixels = context.getImageData(0, 0, canvas.width, canvas.height);
+            const hash = await hashContent(pixels.data.buffer as ArrayBuffer);
+
+            return await withCache<OcrResult>(hash, 'ocr', OCR_VERSION, async () => {
+                const scheduler = await this.initialize();
+                const { data } = await scheduler.addJob('recognize', canvas);
+                return { text: data.text, confidence: data.confidence };
+            });
+        } finally {
+            page.cleanup();
+            // Release the bitmap now rather than whenever the canvas is collected
+            canvas.width = 0;
+            canvas.height = 0;
+        }
+    }
+
+    private scheduleIdleShutdown() {
+        clearTimeout(this.idleTimer);
+        this.idleTimer = setTimeout(() => {
+            if (this.activeJobs === 0) this.terminate();
+        }, OCR_IDLE_TIMEOUT_MS);
+    }
+
+    /**
+     * Extract the document's text (with OCR where needed) and its key terms
+     */
+    public async processDocument(file: File, options: ExtractOptions = {}): Promise<ExtractionResult> {
+        const { pages, confidence } = await this.extractText(file, options);
+        const text = joinPageText(pages);
+        const findings = analyzeText(text);
 
-        // Mock intelligent extraction based on filename or random
         return {
-            text: "Mock extracted text...",
-            confidence: 88.5,
+            text,
+            confidence,
             entities: {
-                dates: ['2024-12-31', '2025-03-31'],
-                amounts: ['$5,000,000'],
-                covenants: ['Leverage Ratio < 3.0x', 'Interest Cover > 4.0x'],
-                risks: ['Change of Control', 'Cross Default']
-            }
+                dates: findings.criticalDates.map(({ date }) => date),
+                amounts: Array.from(new Set(text.match(AMOUNT_PATTERN) ?? [])).slice(0, 10),
+                covenants: findings.financialCovenants.map(({ termName, value }) => `${termName} ${value}`),
+                risks: [...findings.eventsOfDefault.map(({ type }) => type), ...findings.riskFlags],
+            },
         };
     }
 
     public async terminate() {
-        if (this.worker) {
-            await this.worker.terminate();
-            this.worker = null;
+        clearTimeout(this.idleTimer);
+        const scheduler = this.scheduler ?? await this.starting?.catch(() => null);
+        this.scheduler = null;
+        if (scheduler) {
+            await scheduler.terminate();
         }
     }
 }
+
+// Lets verification/verify_ocr.py run the OCR pipeline on generated scans
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_ANALYZER__) {
+    (window as any).__docpulseAnalyzer = {
+        ...(window as any).__docpulseAnalyzer,
+        extractWithOcr: (fileData: Blob, options?: ExtractOptions) => DocumentProcessor.getInstance().extractText(fileData, options),
+    };
+}
@@ -0,0 +1,295 @@
+import OpenAI from 'openai';
+
+// Ingest scheduler for batches of uploaded documents.
+//
+// Every file runs through three stages: extract (CPU-bound, pdf.js and OCR), analyze
+// (network-bound, the LLM endpoint) and commit (IndexedDB). Each stage has its
+// own concurrency limit, so the next files are being extracted while earlier
+// ones wait on the network. Every request an analyze step makes takes a token
+// from a shared token bucket first, and 429s, timeouts, connection errors and 5xx responses are
+// retried with exponential backoff (honouring Retry-After when present).
+// Files with a stored result skip the analyze stage entirely.
+
+export type IngestStage =
+    | 'queued'
+    | 'extracting'
+    | 'waiting'     // Extracted, waiting for an analyze slot or a rate-limit token
+    | 'analyzing'
+    | 'retrying'
+    | 'saving'
+    | 'done'
+    | 'failed'
+    | 'cancelled';
+
+export interface IngestUpdate {
+    stage: IngestStage;
+    attempt: number;
+    retryAt?: number; // Epoch ms of the next attempt while retrying
+    progress?: number; // 0-1 through the extracting stage, once the extractor reports it
+    error?: string;
+}
+
+export interface IngestOptions {
+    extractConcurrency: number;
+    analyzeConcurrency: number;
+    requestsPerMinute: number;
+    burst: number; // Requests that may go out back to back before the rate limit applies
+    maxRetries: number;
+    baseBackoffMs: number;
+    maxBackoffMs: number;
+}
+
+export const DEFAULT_INGEST_OPTIONS: IngestOptions = {
+    extractConcurrency: 2,
+    analyzeConcurrency: 4,
+    requestsPerMinute: 60,
+    burst: 4,
+    maxRetries: 4,
+    baseBackoffMs: 1000,
+    maxBackoffMs: 30000,
+};
+
+// Optional overrides, e.g. to match an account's rate limits
+export const getIngestOptions = (): IngestOptions => {
+    const options = { ...DEFAULT_INGEST_OPTIONS };
+    (Object.keys(options) as (keyof IngestOptions)[]).forEach(key => {
+        const value = Number(localStorage.getItem(`ingest_${key}`));
+        if (value > 0) options[key] = value;
+    });
+    return options;
+};
+
+export interface IngestHandlers<E, A> {
+    // Call report() with the fraction extracted so far, e.g. as scanned pages are OCRed
+    extract: (file: File, signal: AbortSignal, report: (progress: number) => void) => Promise<E>;
+    // A stored result for this file, if any; a hit skips the rate limit and the analyze call
+    cached?: (file: File, extracted: E) => Promise<A | undefined>;
+    // Call throttle() before every request to the rate-limited endpoint; pass a
+    // signal to stop waiting for the token when that request is given up
+    analyze: (file: File, extracted: E, signal: AbortSignal, throttle: (signal?: AbortSignal) => Promise<void>) => Promise<A>;
+    // Persist one file's result; called as soon as that file is analyzed
+    commit: (file: File, analysis: A, extracted: E) => Promise<void>;
+}
+
+export class IngestCancelledError extends Error {
+    constructor() {
+        super('Ingest cancelled');
+        this.name = 'IngestCancelledError';
+    }
+}
+
+const abortableSleep = (ms: number, signal: AbortSignal) =>
+    new Promise<void>((resolve, reject) => {
+        if (signal.aborted) return reject(new IngestCancelledError());
+        const timer = setTimeout(() => {
+            signal.removeEventListener('abort', onAbort);
+            resolve();
+        }, ms);
+        const onAbort = () => {
+            clearTimeout(timer);
+            reject(new IngestCancelledError());
+        };
+        signal.addEventListener('abort', onAbort, { once: true });
+    });
+
+/**
+ * Counting semaphore that hands out slots in FIFO order
+ */
+class Slots {
+    private waiting: (() => void)[] = [];
+
+    constructor(private free: number) { }
+
+    async acquire(signal: AbortSignal): Promise<void> {
+        if (signal.aborted) throw new IngestCancelledError();
+        if (this.free > 0) {
+            this.free--;
+            return;
+        }
+        await new Promise<void>((resolve, reject) => {
+            const grant = () => {
+                signal.removeEventListener('abort', onAbort);
+                resolve();
+            };
+            const onAbort = () => {
+                this.waiting = this.waiting.filter(w => w !== grant);
+                reject(new IngestCancelledError());
+            };
+            this.waiting.push(grant);
+            signal.addEventListener('abort', onAbort, { once: true });
+        });
+    }
+
+    release() {
+        const next = this.waiting.shift();
+        if (next) next();
+        else this.free++;
+    }
+}
+
+/**
+ * Token bucket: holds up to `capacity` tokens, refilled continuously at
+ * `perSecond`. take() waits until a token is available.
+ */
+export class TokenBucket {
+    private tokens: number;
+    private updatedAt = Date.now();
+
+    constructor(private capacity: number, private perSecond: number) {
+        this.tokens = capacity;
+    }
+
+    private refill() {
+        const now = Date.now();
+        this.tokens = Math.min(this.capacity, this.tokens + ((now - this.updatedAt) / 1000) * this.perSecond);
+        this.updatedAt = now;
+    }
+
+    async take(signal: AbortSignal): Promise<void> {
+        for (; ;) {
+            if (signal.aborted) throw new IngestCancelledError();
+            this.refill();
+            if (this.tokens >= 1) {
+                this.tokens -= 1;
+                return;
+            }
+            await abortableSleep(((1 - this.tokens) / this.perSecond) * 1000, signal);
+        }
+    }
+
+    // After a 429 the endpoint is already over its limit; spend what's left
+    drain() {
+        this.refill();
+        this.tokens = Math.min(this.tokens, 0);
+    }
+}
+
+/**
+ * Delay before retrying a failed analyze call, or null if it shouldn't be retried
+ */
+function retryDelay(error: unknown, attempt: number, options: IngestOptions): number | null {
+    let retryAfterMs: number | undefined;
+    if (error instanceof OpenAI.APIConnectionError) {
+        // Covers APIConnectionTimeoutError; a user abort is APIUserAbortError and isn't retried
+    } else if (error instanceof OpenAI.APIError && (error.status === 429 || (error.status ?? 0) >= 500)) {
+        const header = error.headers?.get('retry-after');
+        const seconds = header ? Number(header) : NaN;
+        if (!Number.isNaN(seconds)) retryAfterMs = seconds * 1000;
+    } else {
+        return null;
+    }
+
+    // Full jitter keeps parallel retries from landing at the same moment
+    const backoff = Math.random() * Math.min(options.maxBackoffMs, options.baseBackoffMs * 2 ** attempt);
+    return Math.max(retryAfterMs ?? 0, backoff);
+}
+
+const errorMessage = (error: unknown) => (error instanceof Error ? error.message : String(error));
+
+interface IngestJob {
+    id: string;
+    file: File;
+    controller: AbortController;
+    attempt: number; // Analyze retries so far
+}
+
+export class IngestQueue<E, A> {
+    private readonly extractSlots: Slots;
+    private readonly analyzeSlots: Slots;
+    private readonly bucket: TokenBucket;
+    private readonly jobs = new Map<string, IngestJob>();
+
+    constructor(
+        private readonly handlers: IngestHandlers<E, A>,
+        private readonly onUpdate: (id: string, update: IngestUpdate) => void,
+        private readonly options: IngestOptions = DEFAULT_INGEST_OPTIONS,
+    ) {
+        this.extractSlots = new Slots(options.extractConcurrency);
+        this.analyzeSlots = new Slots(options.analyzeConcurrency);
+        this.bucket = new TokenBucket(options.burst, options.requestsPerMinute / 60);
+    }
+
+    /**
+     * Queue a file; resolves with its final stage ('done', 'failed' or 'cancelled')
+     */
+    add(id: string, file: File): Promise<IngestStage> {
+        const job: IngestJob = { id, file, controller: new AbortController(), attempt: 0 };
+        this.jobs.set(id, job);
+        this.onUpdate(id, { stage: 'queued', attempt: 0 });
+        return this.run(job).finally(() => this.jobs.delete(id));
+    }
+
+    cancel(id: string) {
+        this.jobs.get(id)?.controller.abort();
+    }
+
+    cancelAll() {
+        this.jobs.forEach(job => job.controller.abort());
+    }
+
+    private async run(job: IngestJob): Promise<IngestStage> {
+        const { id, file, controller: { signal } } = job;
+        try {
+            await this.extractSlots.acquire(signal);
+            let extracted: E;
+            try {
+                this.onUpdate(id, { stage: 'extracting', attempt: 0 });
+                extracted = await this.handlers.extract(file, signal, progress => {
+                    if (!signal.aborted) this.onUpdate(id, { stage: 'extracting', attempt: 0, progress });
+                });
+            } finally {
+                this.extractSlots.release();
+            }
+
+            let analysis = await this.handlers.cached?.(file, extracted);
+            if (analysis === undefined) {
+                analysis = await this.analyzeWithRetries(job, extracted);
+            }
+
+            if (signal.aborted) throw new IngestCancelledError();
+            this.onUpdate(id, { stage: 'saving', attempt: job.attempt });
+            await this.handlers.commit(file, analysis, extracted);
+            this.onUpdate(id, { stage: 'done', attempt: job.attempt });
+            return 'done';
+        } catch (error) {
+            if (error instanceof IngestCancelledError || signal.aborted) {
+                this.onUpdate(id, { stage: 'cancelled', attempt: job.attempt });
+                return 'cancelled';
+            }
+            console.error(`Ingest failed for ${file.name}:`, error);
+            this.onUpdate(id, { stage: 'failed', attempt: job.attempt, error: errorMessage(error) });
+            return 'failed';
+        }
+    }
+
+    private async analyzeWithRetries(job: IngestJob, extracted: E): Promise<A> {
+        const { id, file, controller: { signal } } = job;
+        this.onUpdate(id, { stage: 'waiting', attempt: job.attempt });
+        await this.analyzeSlots.acquire(signal);
+        try {
+            // Waiting on a token is reported as such, not as part of the request
+            const throttle = async (requestSignal: AbortSignal = signal) => {
+                this.onUpdate(id, { stage: 'waiting', attempt: job.attempt });
+                await this.bucket.take(requestSignal);
+                this.onUpdate(id, { stage: 'analyzing', attempt: job.attempt });
+            };
+            for (; ;) {
+                this.onUpdate(id, { stage: 'analyzing', attempt: job.attempt });
+                try {
+                    return await this.handlers.analyze(file, extracted, signal, throttle);
+                } catch (error) {
+                    if (signal.aborted) throw new IngestCancelledError();
+                    const delay = job.attempt < this.options.maxRetries ? retryDelay(error, job.attempt, this.options) : null;
+                    if (delay === null) throw error;
+                    if (error instanceof OpenAI.APIError && error.status === 429) this.bucket.drain();
+
+                    job.attempt++;
+                    this.onUpdate(id, { stage: 'retrying', attempt: job.attempt, retryAt: Date.now() + delay, error: errorMessage(error) });
+                    await abortableSleep(delay, signal);
+                }
+            }
+        } finally {
+            this.analyzeSlots.release();
+        }
+    }
+}
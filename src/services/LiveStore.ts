@@ -0,0 +1,240 @@
+import { useRef, useSyncExternalStore } from 'react';
+import Dexie, { IndexableType, Table, Transaction } from 'dexie';
+import { db } from '../db';
+
+// Shared live snapshots of whole tables.
+//
+// Views that are mounted together (Sidebar, Dashboard, Compliance...) used to
+// open their own useLiveQuery(() => db.X.toArray()), so every write re-read
+// and re-cloned the whole table once per subscriber. Now each table has at
+// most one snapshot, shared by everything that reads it. It's loaded on first
+// subscribe; after that only the rows a committed transaction touched are
+// re-read. Table hooks collect the changed primary keys per transaction (like
+// the search indexes do), and once it commits those keys are fetched with
+// bulkGet and patched into the snapshot. Rows that didn't change keep their
+// object identity, so useTableQuery only re-renders a component when the
+// slice it selected changed.
+//
+// Hooks only see this tab's writes, so the changed keys are also posted on a
+// BroadcastChannel and patched into the other tabs' snapshots.
+
+type Key = IndexableType;
+type Listener = () => void;
+
+// A snapshot outlives its last subscriber briefly, so switching views doesn't reload it
+const RELEASE_DELAY_MS = 5000;
+const CHANNEL_NAME = 'docpulse-live-store';
+
+interface ChangeMessage {
+    table: string;
+    keys: Key[];
+}
+
+let channel: BroadcastChannel | null = null;
+
+class TableStore<T> {
+    private rows: Map<Key, T> | null = null; // In primary key order
+    private snapshot: T[] | undefined;
+    private lastKey: Key | undefined;
+    private listeners = new Set<Listener>();
+    private changed = new Set<Key>();
+    private pending = new WeakMap<Transaction, Set<Key>>();
+    private chain: Promise<void> = Promise.resolve();
+    private applyScheduled = false;
+    private generation = 0; // Bumped whenever the snapshot is dropped
+    private releaseTimer: ReturnType<typeof setTimeout> | undefined;
+
+    constructor(private table: Table<T, Key>) {
+        const store = this;
+        table.hook('creating', function (_key, _row, trans) {
+            this.onsuccess = key => store.touch(trans, key);
+        });
+        table.hook('updating', (_mods, key, _row, trans) => { store.touch(trans, key); });
+        table.hook('deleting', (key, _row, trans) => { store.touch(trans, key); });
+    }
+
+    subscribe = (listener: Listener) => {
+        clearTimeout(this.releaseTimer);
+        this.listeners.add(listener);
+        if (!this.rows && this.listeners.size === 1) this.load();
+        return () => {
+            this.listeners.delete(listener);
+            if (this.listeners.size === 0) {
+                this.releaseTimer = setTimeout(() => this.release(), RELEASE_DELAY_MS);
+            }
+        };
+    };
+
+    getSnapshot = () => this.snapshot;
+
+    /**
+     * Patch keys changed in another tab
+     */
+    receive(keys: Key[]) {
+        if (this.listeners.size === 0 && !this.rows) return;
+        keys.forEach(key => this.changed.add(key));
+        this.scheduleApply();
+    }
+
+    private touch(trans: Transaction, key: Key) {
+        let keys = this.pending.get(trans);
+        if (!keys) {
+            const created = new Set<Key>();
+            this.pending.set(trans, created);
+            trans.on('complete', () => {
+                channel?.postMessage({ table: this.table.name, keys: Array.from(created) } as ChangeMessage);
+                this.receive(Array.from(created));
+            });
+            keys = created;
+        }
+        keys.add(key);
+    }
+
+    // Loads and patches run one at a time, in order
+    private serialize(task: () => Promise<void>) {
+        this.chain = this.chain.then(task).catch(error => console.warn(`Live store update of ${this.table.name} failed:`, error));
+    }
+
+    private load() {
+        const generation = this.generation;
+        this.serialize(async () => {
+            // Anything that commits from here on is patched in after the load
+            this.changed.clear();
+            const loaded = await this.table.toArray();
+            if (generation !== this.generation) return;
+
+            const keyPath = this.table.schema.primKey.keyPath as string | string[];
+            this.rows = new Map(loaded.map(row => [Dexie.getByKeyPath(row, keyPath) as Key, row]));
+            this.publish();
+        });
+    }
+
+    private scheduleApply() {
+        if (this.applyScheduled) return;
+        this.applyScheduled = true;
+        const generation = this.generation;
+        this.serialize(async () => {
+            this.applyScheduled = false;
+            if (!this.rows || this.changed.size === 0) return;
+            const keys = Array.from(this.changed);
+            this.changed.clear();
+            const found = await this.table.bulkGet(keys);
+            const rows = this.rows;
+            if (!rows || generation !== this.generation) return;
+
+            let modified = false;
+            let unordered = false;
+            keys.forEach((key, i) => {
+                const row = found[i];
+                if (row === undefined) {
+                    modified = rows.delete(key) || modified;
+                    return;
+                }
+                if (!rows.has(key) && this.lastKey !== undefined && indexedDB.cmp(key, this.lastKey) < 0) {
+                    unordered = true;
+                }
+                rows.set(key, row);
+                modified = true;
+            });
+            if (!modified) return;
+            if (unordered) {
+                this.rows = new Map(Array.from(rows).sort(([a], [b]) => indexedDB.cmp(a, b)));
+            }
+            this.publish();
+        });
+    }
+
+    private publish() {
+        this.snapshot = Array.from(this.rows!.values());
+        this.lastKey = undefined;
+        this.rows!.forEach((_row, key) => { this.lastKey = key; });
+        this.listeners.forEach(listener => listener());
+    }
+
+    private release() {
+        if (this.listeners.size > 0) return;
+        this.generation++;
+        this.rows = null;
+        this.snapshot = undefined;
+        this.lastKey = undefined;
+        this.changed.clear();
+    }
+}
+
+const stores = new Map<string, TableStore<any>>();
+
+function storeFor<T>(table: Table<T, any>): TableStore<T> {
+    let store = stores.get(table.name);
+    if (!store) {
+        store = new TableStore<T>(table);
+        stores.set(table.name, store);
+    }
+    return store;
+}
+
+let installed = false;
+
+/**
+ * Hook the tables the app shell reads and start listening for other tabs'
+ * changes. Call once at startup, before the app writes to them.
+ */
+export function installLiveStore() {
+    if (installed) return;
+    installed = true;
+
+    [db.users, db.loans, db.docs, db.alerts, db.chartData].forEach(table => storeFor(table));
+    if (typeof BroadcastChannel !== 'undefined') {
+        channel = new BroadcastChannel(CHANNEL_NAME);
+        channel.onmessage = ({ data }: MessageEvent<ChangeMessage>) => stores.get(data.table)?.receive(data.keys);
+    }
+}
+
+/**
+ * Same elements, or same own properties, compared with Object.is
+ */
+export function shallowEqual(a: unknown, b: unknown): boolean {
+    if (Object.is(a, b)) return true;
+    if (typeof a !== 'object' || typeof b !== 'object' || a === null || b === null) return false;
+    if (Array.isArray(a) !== Array.isArray(b)) return false;
+    const aKeys = Object.keys(a);
+    if (aKeys.length !== Object.keys(b).length) return false;
+    return aKeys.every(key => Object.prototype.hasOwnProperty.call(b, key)
+        && Object.is((a as any)[key], (b as any)[key]));
+}
+
+const sameDeps = (a: unknown[], b: unknown[]) => a.length === b.length && a.every((dep, i) => Object.is(dep, b[i]));
+
+/**
+ * A slice of a table's shared snapshot, undefined while it loads. The
+ * component only re-renders when the selected value changes by isEqual.
+ * select has to be pure; deps are the values it closes over.
+ */
+export function useTableQuery<T, R>(
+    table: Table<T, any>,
+    select: (rows: T[]) => R,
+    deps: unknown[] = [],
+    isEqual: (a: R, b: R) => boolean = shallowEqual
+): R | undefined {
+    const store = storeFor(table);
+    const cache = useRef<{ rows: T[]; deps: unknown[]; value: R }>();
+
+    const getSelected = () => {
+        const rows = store.getSnapshot();
+        if (!rows) return undefined;
+        const cached = cache.current;
+        if (cached && cached.rows === rows && sameDeps(cached.deps, deps)) return cached.value;
+        const next = select(rows);
+        const value = cached && isEqual(cached.value, next) ? cached.value : next;
+        cache.current = { rows, deps, value };
+        return value;
+    };
+
+    return useSyncExternalStore(store.subscribe, getSelected);
+}
+
+/**
+ * Every row of a table, in primary key order; undefined while it loads
+ */
+export function useTableRows<T>(table: Table<T, any>): T[] | undefined {
+    return useTableQuery(table, rows => rows);
+}
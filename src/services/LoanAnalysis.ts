@@ -0,0 +1,293 @@
+import { openai, getLoanAnalysisPrompt, LOAN_ANALYSIS_MODEL, LOAN_ANALYSIS_PROMPT_VERSION } from './openai';
+import { getCached, hashContent, putCached } from './AnalysisCache';
+
+// Map-reduce LLM analysis for agreements of any length.
+//
+// The text is split into chunks on clause boundaries, every chunk is reviewed
+// with getLoanAnalysisPrompt (a few at a time), and the partial reviews are
+// merged in code into the single review shape the app stores on a Loan.
+// Chunk boundaries are content-defined: the text is cut into pieces at the
+// clause headings whose hash is picked, whatever their offset, and short
+// pieces are joined with the ones after them up to MIN_CHUNK_CHARS. An edit
+// changes the chunks from its own piece up to the next piece of at least
+// MIN_CHUNK_CHARS; every other chunk stays byte-identical and its cached
+// review still applies.
+
+export const MIN_CHUNK_CHARS = 12000;
+export const MAX_CHUNK_CHARS = 32000;
+export const CHUNK_CONCURRENCY = 3;
+
+// Roughly one clause heading in this many becomes a chunk boundary
+const BOUNDARY_MODULUS = 4;
+
+// Clause headings and page markers. Headings are found after a sentence end or
+// line break, which keeps cross references ("as set out in Clause 22") out.
+const SECTION_BOUNDARY = /(?:(?<=^|\n|[.;:]\s{1,4})(?:(?:Clause|Section|Article)\s+\d+(?:\.\d+)*|\d+(?:\.\d+)+)\.?\s+[A-Z]|--- Page \d+ ---)/g;
+
+export interface ChunkReview {
+    counterparty?: string;
+    amount?: string;
+    type?: string;
+    risk?: string;
+    status?: string;
+    deadline?: string;
+    reviewData?: any;
+}
+
+export interface ChunkedAnalysisOptions {
+    signal?: AbortSignal;
+    // Awaited before every request, e.g. to take a rate-limit token; gives up when the signal fires
+    throttle?: (signal?: AbortSignal) => Promise<void>;
+    concurrency?: number;
+    onChunk?: (done: number, total: number) => void;
+}
+
+// FNV-1a, only used to pick boundaries
+function fnv1a(text: string): number {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    // FNV's low bits barely change between headings that differ in a digit
+    // ("21.1", "22.1"), so mix before taking the modulus (murmur3 finalizer)
+    hash ^= hash >>> 16;
+    hash = Math.imul(hash, 0x85ebca6b);
+    hash ^= hash >>> 13;
+    hash = Math.imul(hash, 0xc2b2ae35);
+    hash ^= hash >>> 16;
+    return hash >>> 0;
+}
+
+/**
+ * Split an oversized section at sentence ends
+ */
+function splitSection(section: string): string[] {
+    const parts: string[] = [];
+    let rest = section;
+    while (rest.length > MAX_CHUNK_CHARS) {
+        let cut = rest.lastIndexOf('. ', MAX_CHUNK_CHARS - 2);
+        if (cut < MIN_CHUNK_CHARS) cut = MAX_CHUNK_CHARS;
+        else cut += 2;
+        parts.push(rest.slice(0, cut));
+        rest = rest.slice(cut);
+    }
+    parts.push(rest);
+    return parts;
+}
+
+/**
+ * Split agreement text into chunks of at most MAX_CHUNK_CHARS on clause boundaries
+ */
+export function splitIntoChunks(text: string): string[] {
+    // A piece starts at every heading picked by its own hash, so where the
+    // pieces start depends on the headings alone
+    const starts = [0];
+    for (const match of text.matchAll(SECTION_BOUNDARY)) {
+        const index = match.index!;
+        if (index > 0 && fnv1a(text.slice(index, index + 48)) % BOUNDARY_MODULUS === 0) starts.push(index);
+    }
+
+    const chunks: string[] = [];
+    let current = '';
+    for (let i = 0; i < starts.length; i++) {
+        const piece = text.slice(starts[i], starts[i + 1] ?? text.length);
+        if (current && current.length + piece.length > MAX_CHUNK_CHARS) {
+            chunks.push(current);
+            current = '';
+        }
+        if (piece.length > MAX_CHUNK_CHARS) {
+            const parts = splitSection(piece);
+            chunks.push(...parts.slice(0, -1));
+            current = parts[parts.length - 1];
+        } else {
+            current += piece;
+        }
+        if (current.length >= MIN_CHUNK_CHARS) {
+            chunks.push(current);
+            current = '';
+        }
+    }
+    if (current.trim()) chunks.push(current);
+    return chunks.length > 0 ? chunks : [text];
+}
+
+const RISK_ORDER = ['Low', 'Medium', 'High', 'Critical'];
+
+const firstValue = <T>(values: (T | undefined | null)[]): T | undefined =>
+    values.find(value => value !== undefined && value !== null && value !== '' && value !== 'Unknown') ?? undefined;
+
+const normalize = (value: unknown) => String(value ?? '').toLowerCase().replace(/\s+/g, ' ').trim();
+
+/**
+ * Merge chunk reviews (in document order) into one review. Deterministic for
+ * a given list: identity fields come from the first chunk that has them,
+ * covenants and events of default are de-duplicated in order, counts are
+ * summed, scores are averaged weighted by chunk length and the highest risk
+ * wins.
+ */
+export function mergeChunkReviews(reviews: ChunkReview[], weights: number[]): ChunkReview {
+    const data = reviews.map(review => review.reviewData ?? {});
+
+    const weightedScore = (pick: (d: any) => unknown): number | undefined => {
+        let sum = 0;
+        let weight = 0;
+        data.forEach((d, i) => {
+            const raw = pick(d);
+            const value = raw === null || raw === undefined || raw === '' ? NaN : Number(raw);
+            if (Number.isFinite(value)) {
+                sum += value * weights[i];
+                weight += weights[i];
+            }
+        });
+        return weight > 0 ? Math.round(sum / weight) : undefined;
+    };
+
+    const covenants: any[] = [];
+    const seenCovenants = new Set<string>();
+    data.forEach(d => (Array.isArray(d.financialCovenants) ? d.financialCovenants : []).forEach((covenant: any) => {
+        const key = `${normalize(covenant.termName)}|${normalize(covenant.clauseRef)}`;
+        if (!seenCovenants.has(key)) {
+            seenCovenants.add(key);
+            covenants.push(covenant);
+        }
+    }));
+
+    const events: any[] = [];
+    const seenEvents = new Set<string>();
+    data.forEach(d => (Array.isArray(d.eventsOfDefault) ? d.eventsOfDefault : []).forEach((event: any) => {
+        const key = normalize(typeof event === 'string' ? event : event?.type);
+        if (key && !seenEvents.has(key)) {
+            seenEvents.add(key);
+            events.push(event);
+        }
+    }));
+
+    const sumStat = (field: string) => data.reduce((sum, d) => sum + (Number(d.clauseStats?.[field]) || 0), 0);
+
+    let commercialViability: any;
+    const viabilityKeys = Array.from(new Set(data.flatMap(d => Object.keys(d.commercialViability ?? {}))))
+        .filter(key => key !== 'overallScore');
+    if (viabilityKeys.length > 0) {
+        // Narrative from the largest chunk that has one, scores across all chunks
+        const byWeight = data.map((d, i) => ({ d, w: weights[i] })).sort((a, b) => b.w - a.w);
+        commercialViability = {};
+        viabilityKeys.forEach(key => {
+            commercialViability[key] = {
+                text: byWeight.find(({ d }) => d.commercialViability?.[key]?.text)?.d.commercialViability[key].text ?? '',
+                score: weightedScore(d => d.commercialViability?.[key]?.score) ?? 0,
+            };
+        });
+        commercialViability.overallScore = Math.round(
+            viabilityKeys.reduce((sum, key) => sum + commercialViability[key].score, 0) / viabilityKeys.length
+        );
+    }
+
+    const risks = reviews.map(review => RISK_ORDER.indexOf(review.risk ?? '')).filter(index => index >= 0);
+    const risk = risks.length > 0 ? RISK_ORDER[Math.max(...risks)] : undefined;
+    const deviations = sumStat('deviations');
+    // Parts may leave status empty; any part still in review keeps the whole agreement there
+    const approved = reviews.some(review => review.status === 'Approved')
+        && !reviews.some(review => review.status === 'In Review')
+        && deviations === 0;
+
+    const summaries = data.map(d => d.summary).filter(Boolean);
+    const summary = summaries.length > 1
+        ? `${summaries[0]} Reviewed in ${reviews.length} sections: ${covenants.length} covenant(s) and ${events.length} event(s) of default identified.`
+        : summaries[0];
+
+    return {
+        counterparty: firstValue(reviews.map(r => r.counterparty)),
+        amount: firstValue(reviews.map(r => r.amount)),
+        type: firstValue(reviews.map(r => r.type)),
+        risk,
+        status: approved ? 'Approved' : 'In Review',
+        deadline: firstValue(reviews.map(r => r.deadline)),
+        reviewData: {
+            summary,
+            confidenceScore: weightedScore(d => d.confidenceScore),
+            standardizationScore: weightedScore(d => d.standardizationScore),
+            clauseStats: { total: sumStat('total'), standard: sumStat('standard'), deviations },
+            borrowerDetails: {
+                entityName: firstValue(data.map(d => d.borrowerDetails?.entityName)),
+                jurisdiction: firstValue(data.map(d => d.borrowerDetails?.jurisdiction)),
+                registrationNumber: firstValue(data.map(d => d.borrowerDetails?.registrationNumber)),
+                legalAddress: firstValue(data.map(d => d.borrowerDetails?.legalAddress)),
+            },
+            commercialViability,
+            financialCovenants: covenants,
+            eventsOfDefault: events,
+            // Execution blocks sit at the end of an agreement
+            signatures: firstValue(data.map(d => d.signatures).reverse()),
+        },
+    };
+}
+
+async function reviewChunk(filename: string, chunk: string, isPart: boolean, signal: AbortSignal, options: ChunkedAnalysisOptions): Promise<ChunkReview> {
+    // Keyed by the whole prompt, so the filename and the instructions are part of the key
+    const prompt = getLoanAnalysisPrompt(filename, chunk, isPart);
+    const hash = await hashContent(new TextEncoder().encode(prompt).buffer as ArrayBuffer);
+    const cached = await getCached<ChunkReview>(hash, 'chunk', LOAN_ANALYSIS_PROMPT_VERSION);
+    if (cached) return cached;
+
+    signal.throwIfAborted();
+    await options.throttle?.(signal);
+    signal.throwIfAborted();
+    const completion = await openai.chat.completions.create({
+        model: LOAN_ANALYSIS_MODEL,
+        messages: [
+            { role: "user", content: prompt }
+        ],
+        response_format: { type: "json_object" }
+    }, {
+        timeout: 60000,
+        maxRetries: 0,
+        signal
+    });
+
+    const content = completion.choices[0].message.content;
+    const review: ChunkReview = content ? JSON.parse(content) : {};
+    await putCached(hash, 'chunk', LOAN_ANALYSIS_PROMPT_VERSION, review);
+    return review;
+}
+
+/**
+ * Review a whole agreement: chunk, review the chunks with bounded
+ * concurrency (cached per chunk) and merge. Rejects on the first chunk that
+ * fails and aborts the requests still in flight; chunks already reviewed
+ * stay cached for the retry.
+ */
+export async function analyzeLoanDocument(filename: string, text: string, options: ChunkedAnalysisOptions = {}): Promise<ChunkReview> {
+    const chunks = splitIntoChunks(text);
+    const reviews: ChunkReview[] = new Array(chunks.length);
+    const concurrency = Math.max(1, options.concurrency ?? CHUNK_CONCURRENCY);
+
+    // Aborted by the caller's signal or by the first lane that fails
+    const controller = new AbortController();
+    const abort = () => controller.abort(options.signal?.reason);
+    if (options.signal?.aborted) abort();
+    options.signal?.addEventListener('abort', abort, { once: true });
+
+    let next = 0;
+    let done = 0;
+    const lanes = Array.from({ length: Math.min(concurrency, chunks.length) }, async () => {
+        while (next < chunks.length && !controller.signal.aborted) {
+            const index = next++;
+            try {
+                reviews[index] = await reviewChunk(filename, chunks[index], chunks.length > 1, controller.signal, options);
+            } catch (error) {
+                // The other lanes stop instead of spending more rate-limit tokens
+                controller.abort(error);
+                throw error;
+            }
+            options.onChunk?.(++done, chunks.length);
+        }
+    });
+    try {
+        await Promise.all(lanes);
+    } finally {
+        options.signal?.removeEventListener('abort', abort);
+    }
+
+    return chunks.length === 1 ? reviews[0] : mergeChunkReviews(reviews, chunks.map(chunk => chunk.length));
+}
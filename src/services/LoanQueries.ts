@@ -0,0 +1,22 @@
+import { db } from '../db';
+import { Loan } from '../types';
+
+// Indexed queries over the loans table's derived numeric columns
+// (amountMinor, deadlineTs, dateTs; see utils/loanFields.ts).
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/**
+ * Loans with a deadline in [from, to], soonest first
+ */
+export function getLoansDueBetween(from: number, to: number): Promise<Loan[]> {
+    return db.loans.where('deadlineTs').between(from, to, true, true).toArray();
+}
+
+/**
+ * Loans due from the start of today through the next seven days
+ */
+export function getLoansDueThisWeek(now = new Date()): Promise<Loan[]> {
+    const today = new Date(now.getFullYear(), now.getMonth(), now.getDate()).getTime();
+    return getLoansDueBetween(today, today + 7 * DAY_MS - 1);
+}
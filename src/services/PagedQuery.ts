@@ -0,0 +1,168 @@
+import Dexie, { Collection, IndexableType, Table } from 'dexie';
+
+// Paged reads for the list views.
+//
+// A PageQuery names a table, the index that orders it and optionally an
+// equality filter on another index, and pages are read straight off the
+// index: by offset for windowed lists that jump to any scroll position, or
+// after a keyset cursor for feeds that load older entries on demand. Only the
+// rows of the requested page are materialized. Rows without a value for the
+// ordering index aren't in that index and so aren't listed; order by ':id'
+// (the primary key) to list every row.
+
+export interface PageQuery<T> {
+    table: Table<T, any>;
+    orderBy: string; // An indexed field, or ':id' for the primary key
+    reverse?: boolean;
+    // Equality filter on an indexed field; counted from the index alone
+    where?: { index: string; anyOf: IndexableType[] };
+    // In-memory refinement, e.g. text search. Applied while scanning, so paging
+    // a query with a match reads every row up to the page.
+    match?: (row: T) => boolean;
+}
+
+// Position after a row: its ordering key plus its primary key to break ties
+export interface PageCursor {
+    key: IndexableType;
+    primaryKey: IndexableType;
+}
+
+export interface CursorPage<T> {
+    rows: T[];
+    next?: PageCursor; // Unset once the query is exhausted
+}
+
+const primaryKeyPath = (table: Table<any, any>) => table.schema.primKey.keyPath as string;
+
+const orderKeyPath = (query: PageQuery<any>) =>
+    query.orderBy === ':id' ? primaryKeyPath(query.table) : query.orderBy;
+
+function withFilters<T>(collection: Collection<T, any>, query: PageQuery<T>, onWhereIndex: boolean): Collection<T, any> {
+    const { where, match, reverse } = query;
+    let result = reverse ? collection.reverse() : collection;
+    if (where && !onWhereIndex) {
+        const values = where.anyOf;
+        result = result.filter(row => values.includes(Dexie.getByKeyPath(row, where.index)));
+    }
+    return match ? result.filter(match) : result;
+}
+
+/**
+ * The query's rows in order, not yet paged
+ */
+export function toCollection<T>(query: PageQuery<T>): Collection<T, any> {
+    const { table, orderBy, where } = query;
+    // Filtering and ordering on the same index is a single key range
+    if (where && where.index === orderBy) {
+        return withFilters(table.where(where.index).anyOf(where.anyOf), query, true);
+    }
+    return withFilters(table.orderBy(orderBy), query, false);
+}
+
+/**
+ * Number of rows the query lists. Without a match this is a key count on
+ * one index and doesn't read any rows.
+ */
+export function countQuery<T>(query: PageQuery<T>): Promise<number> {
+    const { table, where, match } = query;
+    if (match) return toCollection(query).count();
+    if (where) return table.where(where.index).anyOf(where.anyOf).count();
+    return table.orderBy(query.orderBy).count();
+}
+
+/**
+ * Rows [offset, offset + limit) of the query
+ */
+export function fetchPage<T>(query: PageQuery<T>, offset: number, limit: number): Promise<T[]> {
+    return toCollection(query).offset(offset).limit(limit).toArray();
+}
+
+export const cursorOf = <T>(query: PageQuery<T>, row: T): PageCursor => ({
+    key: Dexie.getByKeyPath(row, orderKeyPath(query)),
+    primaryKey: Dexie.getByKeyPath(row, primaryKeyPath(query.table)),
+});
+
+/**
+ * Up to limit rows following the cursor (from the start without one). Reads
+ * a key range starting at the cursor, so the cost doesn't grow with how far
+ * the query has been paged.
+ */
+export async function fetchPageAfter<T>(query: PageQuery<T>, cursor: PageCursor | undefined, limit: number): Promise<CursorPage<T>> {
+    let collection: Collection<T, any>;
+    if (!cursor) {
+        collection = toCollection(query);
+    } else if (query.orderBy === ':id') {
+        const range = query.table.where(':id');
+        collection = withFilters(query.reverse ? range.below(cursor.primaryKey) : range.above(cursor.primaryKey), query, false);
+    } else {
+        // Rows sharing the cursor's key come in primary key order; skip those up to the cursor
+        const range = query.table.where(query.orderBy);
+        const keyPath = primaryKeyPath(query.table);
+        const step = query.reverse ? -1 : 1;
+        collection = withFilters(query.reverse ? range.belowOrEqual(cursor.key) : range.aboveOrEqual(cursor.key), query, false)
+            .filter(row => indexedDB.cmp(Dexie.getByKeyPath(row, query.orderBy), cursor.key) !== 0
+                || indexedDB.cmp(Dexie.getByKeyPath(row, keyPath), cursor.primaryKey) * step > 0);
+    }
+
+    const rows = await collection.limit(limit).toArray();
+    return {
+        rows,
+        next: rows.length === limit ? cursorOf(query, rows[rows.length - 1]) : undefined,
+    };
+}
+
+// One source of a merged feed: a query plus how to turn its rows into items
+export interface FeedSource<T, Item> {
+    query: PageQuery<T>;
+    toItem: (row: T) => Item;
+}
+
+// Per source: undefined to read from the start, null once it's exhausted
+export type FeedCursors = (PageCursor | null | undefined)[];
+
+export interface FeedPage<Item> {
+    items: Item[];
+    next?: FeedCursors; // Unset once every source is exhausted
+}
+
+/**
+ * One page of several sources merged newest first by time. Each source is
+ * read limit rows past its own cursor and the heads are merged, so every
+ * source contributes a prefix of its rows and its cursor advances past
+ * exactly those.
+ */
+export async function fetchFeedPage<Item>(
+    sources: FeedSource<any, Item>[],
+    cursors: FeedCursors,
+    limit: number,
+    time: (item: Item) => number,
+): Promise<FeedPage<Item>> {
+    const pages = await Promise.all(sources.map((source, i) => {
+        const cursor = cursors[i];
+        return cursor === null ? Promise.resolve<CursorPage<any>>({ rows: [] }) : fetchPageAfter(source.query, cursor, limit);
+    }));
+    const items = pages.map((page, i) => page.rows.map(sources[i].toItem));
+    const used = pages.map(() => 0);
+
+    const merged: Item[] = [];
+    while (merged.length < limit) {
+        let pick = -1;
+        items.forEach((list, i) => {
+            if (used[i] < list.length && (pick < 0 || time(list[used[i]]) > time(items[pick][used[pick]]))) pick = i;
+        });
+        if (pick < 0) break;
+        merged.push(items[pick][used[pick]++]);
+    }
+
+    const next: FeedCursors = pages.map((page, i) => {
+        // Everything this source had left made it onto the page
+        if (!page.next && used[i] === page.rows.length) return null;
+        if (used[i] === 0) return cursors[i];
+        return cursorOf(sources[i].query, page.rows[used[i] - 1]);
+    });
+
+    return {
+        items: merged,
+        next: next.every(cursor => cursor === null) ? undefined : next,
+    };
+}
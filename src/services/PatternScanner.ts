@@ -0,0 +1,232 @@
+// Single-pass multi-pattern scanner.
+//
+// All rules are compiled into one alternation regex, so the text is walked once
+// regardless of how many rules there are. Each rule is wrapped in its own
+// capture group and its inner groups are located by number, which keeps every
+// rule's captures available on the combined match. After a hit the scan
+// resumes one character further on (not at the end of the match), and rules
+// that could also start at that offset are tried there, so hits that overlap
+// or share a start offset are all reported, just as if every rule had been run
+// over the text on its own.
+
+export type ScanKind = 'event' | 'covenant' | 'date' | 'entity' | 'clause' | 'keyword';
+
+export interface ScanRule {
+    id: string;
+    kind: ScanKind;
+    pattern: RegExp;
+}
+
+export interface ScanHit {
+    rule: number; // Index into the rules the scanner was compiled with
+    id: string;
+    kind: ScanKind;
+    start: number;
+    end: number;
+    text: string;
+    groups: (string | undefined)[]; // The rule's own capture groups, in order
+}
+
+interface CompiledRule extends ScanRule {
+    group: number; // Capture group wrapping the rule in the combined regex
+    innerGroups: number[];
+    lead: Set<string> | null; // Possible first characters (lowercase), null if unknown
+    sticky: RegExp;
+}
+
+const SPECIAL_CHARS = new Set(['\\', '[', ']', '.', '^', '$', '(', ')', '|', '*', '+', '?', '{', '}']);
+
+/**
+ * Index of the parenthesis closing the group that opens at `open`
+ */
+function closingParen(source: string, open: number): number {
+    let depth = 0;
+    let inClass = false;
+    for (let i = open; i < source.length; i++) {
+        const ch = source[i];
+        if (ch === '\\') i++;
+        else if (inClass) inClass = ch !== ']';
+        else if (ch === '[') inClass = true;
+        else if (ch === '(') depth++;
+        else if (ch === ')' && --depth === 0) return i;
+    }
+    return -1;
+}
+
+/**
+ * Splits a pattern on its top-level `|`
+ */
+function topLevelBranches(source: string): string[] {
+    const branches: string[] = [];
+    let depth = 0;
+    let inClass = false;
+    let from = 0;
+    for (let i = 0; i < source.length; i++) {
+        const ch = source[i];
+        if (ch === '\\') i++;
+        else if (inClass) inClass = ch !== ']';
+        else if (ch === '[') inClass = true;
+        else if (ch === '(') depth++;
+        else if (ch === ')') depth--;
+        else if (ch === '|' && depth === 0) {
+            branches.push(source.slice(from, i));
+            from = i + 1;
+        }
+    }
+    branches.push(source.slice(from));
+    return branches;
+}
+
+/**
+ * Characters a case-insensitive pattern can start with, or null when that
+ * can't be worked out from literals and (optional) groups alone
+ */
+function leadChars(source: string): Set<string> | null {
+    const lead = new Set<string>();
+    for (const branch of topLevelBranches(source)) {
+        const chars = branchLeadChars(branch);
+        if (!chars) return null;
+        chars.forEach(c => lead.add(c));
+    }
+    return lead;
+}
+
+function branchLeadChars(branch: string): Set<string> | null {
+    if (branch.length === 0) return null;
+
+    let chars: Set<string> | null;
+    let rest: string;
+    if (branch[0] === '(') {
+        const close = closingParen(branch, 0);
+        if (close < 0 || /^\(\?[=!]|^\(\?<[=!]/.test(branch)) return null;
+        const inner = branch.startsWith('(?:') ? branch.slice(3, close)
+            : branch.startsWith('(?<') ? branch.slice(branch.indexOf('>') + 1, close)
+                : branch.slice(1, close);
+        chars = leadChars(inner);
+        rest = branch.slice(close + 1);
+    } else if (!SPECIAL_CHARS.has(branch[0])) {
+        chars = new Set([branch[0].toLowerCase()]);
+        rest = branch.slice(1);
+    } else {
+        return null;
+    }
+    if (!chars) return null;
+
+    if (rest[0] === '?' || rest[0] === '*' || rest.startsWith('{0')) {
+        // Optional prefix: the pattern may also start with whatever follows it
+        const quantifierEnd = rest[0] === '{' ? rest.indexOf('}') + 1 : 1;
+        const after = branchLeadChars(rest.slice(quantifierEnd).replace(/^\?/, ''));
+        if (!after) return null;
+        after.forEach(c => chars!.add(c));
+    }
+    return chars;
+}
+
+/**
+ * Numbers of the capturing groups in a pattern, relative to its first group
+ */
+function countCapturingGroups(source: string): number {
+    let count = 0;
+    let inClass = false;
+    for (let i = 0; i < source.length; i++) {
+        const ch = source[i];
+        if (ch === '\\') i++;
+        else if (inClass) inClass = ch !== ']';
+        else if (ch === '[') inClass = true;
+        else if (ch === '(' && (source[i + 1] !== '?' || (source[i + 2] === '<' && source[i + 3] !== '=' && source[i + 3] !== '!'))) {
+            count++;
+        }
+    }
+    return count;
+}
+
+export class PatternScanner {
+    private readonly rules: CompiledRule[];
+    private readonly combined: RegExp;
+    // For each rule, the later rules that could match at the same offset
+    private readonly sameOffsetRules: number[][];
+
+    constructor(rules: ScanRule[]) {
+        let group = 1;
+        this.rules = rules.map(rule => {
+            const inner = countCapturingGroups(rule.pattern.source);
+            const compiled: CompiledRule = {
+                ...rule,
+                group,
+                innerGroups: Array.from({ length: inner }, (_, i) => group + 1 + i),
+                lead: leadChars(rule.pattern.source),
+                sticky: new RegExp(rule.pattern.source, 'iy'),
+            };
+            group += 1 + inner;
+            return compiled;
+        });
+
+        this.combined = new RegExp(this.rules.map(rule => `(${rule.pattern.source})`).join('|'), 'gi');
+
+        this.sameOffsetRules = this.rules.map((rule, index) =>
+            this.rules
+                .map((_, other) => other)
+                .filter(other => other > index && PatternScanner.mayShareStart(rule, this.rules[other]))
+        );
+    }
+
+    private static mayShareStart(a: CompiledRule, b: CompiledRule): boolean {
+        if (!a.lead || !b.lead) return true;
+        for (const c of a.lead) {
+            if (b.lead.has(c)) return true;
+        }
+        return false;
+    }
+
+    /**
+     * Scans the text once and returns every hit in offset order.
+     */
+    scan(text: string): ScanHit[] {
+        const hits: ScanHit[] = [];
+        const rules = this.rules;
+        const regex = this.combined;
+        regex.lastIndex = 0;
+
+        let match: RegExpExecArray | null;
+        while ((match = regex.exec(text)) !== null) {
+            const start = match.index;
+            let winner = 0;
+            while (match[rules[winner].group] === undefined) winner++;
+            const rule = rules[winner];
+
+            hits.push({
+                rule: winner,
+                id: rule.id,
+                kind: rule.kind,
+                start,
+                end: start + match[0].length,
+                text: match[0],
+                groups: rule.innerGroups.map(g => match![g]),
+            });
+
+            // The alternation only reports the first rule matching here; check the others that could
+            const lead = text[start].toLowerCase();
+            for (const index of this.sameOffsetRules[winner]) {
+                const other = rules[index];
+                if (other.lead && !other.lead.has(lead)) continue;
+                other.sticky.lastIndex = start;
+                const extra = other.sticky.exec(text);
+                if (extra) {
+                    hits.push({
+                        rule: index,
+                        id: other.id,
+                        kind: other.kind,
+                        start,
+                        end: start + extra[0].length,
+                        text: extra[0],
+                        groups: extra.slice(1),
+                    });
+                }
+            }
+
+            regex.lastIndex = start + 1;
+        }
+
+        return hits;
+    }
+}
@@ -0,0 +1,285 @@
+import { Transaction } from 'dexie';
+import { db, AggregateCounter } from '../db';
+import { Doc, Loan } from '../types';
+import { parseAmountMinor, parseDateTs } from '../utils/loanFields';
+
+// Materialized portfolio summary.
+//
+// The aggregates table holds one row per counter (loan count, exposure, loans
+// per risk and status, exposure per type and month, documents per status).
+// Hooks on the loans and docs tables turn every create, update and delete into
+// a delta (minus the row's old contribution, plus its new one), and the deltas
+// of a transaction are applied once it commits. Views read a few dozen
+// counter rows instead of scanning the portfolio. A marker in localStorage is
+// set as soon as a committed write leaves deltas to apply and cleared once
+// none are left, so a tab that closed in between (or a flush that failed)
+// leaves it behind, and the next startup rebuilds the counters from a full
+// scan. They're also rebuilt when the counter set changed or the loan and
+// document counts disagree with the tables.
+
+// Bump when counters are added or change meaning; they're rebuilt on startup
+export const AGGREGATES_VERSION = '3';
+const AGGREGATES_VERSION_KEY = 'portfolio_aggregates_version';
+const AGGREGATES_DIRTY_KEY = 'portfolio_aggregates_dirty';
+
+// Same scale PortfolioAnalyticsView has always used for its risk grade
+export const RISK_SCORES: Record<string, number> = { Low: 4, Medium: 3, High: 2, Critical: 1 };
+const DEFAULT_RISK_SCORE = 3;
+
+const MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+
+export interface PortfolioAggregates {
+    loanCount: number;
+    exposureMinor: number;
+    riskScoreSum: number;
+    riskCounts: Record<string, number>;
+    statusCounts: Record<string, number>;
+    typeCounts: Record<string, number>;
+    exposureByTypeMinor: Record<string, number>;
+    exposureByMonthMinor: Record<string, number>; // Keyed by 'Jan'..'Dec' of the loan date
+    riskExposureByMonthMinor: Record<string, number>; // High and Critical loans only
+    undatedExposureMinor: number; // Loans without a parseable date; charts show them in the current month
+    undatedRiskExposureMinor: number;
+    docCount: number;
+    docSizeKb: number; // Sum of the display sizes ('1.2 MB', '512 KB')
+    docStatusCounts: Record<string, number>;
+}
+
+type Delta = Map<string, number>;
+
+const bump = (delta: Delta, key: string, by: number) => {
+    if (by !== 0) delta.set(key, (delta.get(key) ?? 0) + by);
+};
+
+const SIZE_UNITS_KB: Record<string, number> = { B: 1 / 1024, KB: 1, MB: 1024, GB: 1024 * 1024 };
+
+/**
+ * Kilobytes in a display size like "1.2 MB" or "512 KB"; a bare number is
+ * taken as MB, the unit the upload view writes
+ */
+const parseSizeKb = (size: string | undefined): number => {
+    const match = /^\s*([\d.]+)\s*([KMG]?B)?\s*$/i.exec(size ?? '');
+    const value = match ? parseFloat(match[1]) : NaN;
+    if (!Number.isFinite(value)) return 0;
+    return value * SIZE_UNITS_KB[(match![2] ?? 'MB').toUpperCase()];
+};
+
+/**
+ * Add (sign 1) or remove (sign -1) one loan's contribution. Everything is
+ * derived from the display strings, so the same loan always contributes the
+ * same amounts.
+ */
+function countLoan(delta: Delta, loan: Partial<Loan>, sign: 1 | -1) {
+    const amount = parseAmountMinor(loan.amount) ?? 0;
+    bump(delta, 'loans', sign);
+    bump(delta, 'exposureMinor', sign * amount);
+    bump(delta, 'riskScore', sign * (RISK_SCORES[loan.risk ?? ''] ?? DEFAULT_RISK_SCORE));
+    bump(delta, `risk:${loan.risk}`, sign);
+    bump(delta, `status:${loan.status}`, sign);
+    bump(delta, `typeCount:${loan.type}`, sign);
+    bump(delta, `typeExposure:${loan.type}`, sign * amount);
+
+    // Undated loans aren't pinned to the month they were written in; readers
+    // add them to whatever month is current, as the charts always have
+    const dateTs = parseDateTs(loan.date);
+    const risky = loan.risk === 'High' || loan.risk === 'Critical';
+    if (dateTs !== undefined) {
+        const month = MONTHS[new Date(dateTs).getMonth()];
+        bump(delta, `monthExposure:${month}`, sign * amount);
+        if (risky) bump(delta, `monthRiskExposure:${month}`, sign * amount);
+    } else {
+        bump(delta, 'undatedExposure', sign * amount);
+        if (risky) bump(delta, 'undatedRiskExposure', sign * amount);
+    }
+}
+
+function countDoc(delta: Delta, doc: Partial<Doc>, sign: 1 | -1) {
+    bump(delta, 'docs', sign);
+    bump(delta, 'docSizeKb', sign * Math.round(parseSizeKb(doc.size)));
+    bump(delta, `docStatus:${doc.status}`, sign);
+}
+
+// Deltas collected per transaction, applied when it commits
+const deltas = new WeakMap<Transaction, Delta>();
+const queued: Delta = new Map();
+let chain: Promise<void> = Promise.resolve();
+let flushScheduled = false;
+
+function deltaFor(trans: Transaction): Delta {
+    let delta = deltas.get(trans);
+    if (!delta) {
+        const created: Delta = new Map();
+        deltas.set(trans, created);
+        trans.on('complete', () => {
+            created.forEach((by, key) => bump(queued, key, by));
+            if (queued.size > 0) localStorage.setItem(AGGREGATES_DIRTY_KEY, '1');
+            scheduleFlush();
+        });
+        delta = created;
+    }
+    return delta;
+}
+
+// Flushes and rebuilds run one at a time, in order
+const serialize = (task: () => Promise<void>) => {
+    chain = chain.then(task).catch(error => console.warn('Portfolio aggregates update failed:', error));
+    return chain;
+};
+
+function scheduleFlush() {
+    if (flushScheduled) return;
+    flushScheduled = true;
+    serialize(async () => {
+        flushScheduled = false;
+        if (queued.size === 0) return;
+        const delta = new Map(queued);
+        queued.clear();
+
+        await db.transaction('rw', db.aggregates, async () => {
+            const keys = Array.from(delta.keys());
+            const rows = await db.aggregates.bulkGet(keys);
+            const updated: AggregateCounter[] = [];
+            const emptied: string[] = [];
+            keys.forEach((key, i) => {
+                const value = (rows[i]?.value ?? 0) + delta.get(key)!;
+                if (value === 0) emptied.push(key);
+                else updated.push({ key, value });
+            });
+            await db.aggregates.bulkPut(updated);
+            await db.aggregates.bulkDelete(emptied);
+        });
+        // Deltas queued during the write keep the marker for the next flush
+        if (queued.size === 0) localStorage.removeItem(AGGREGATES_DIRTY_KEY);
+    });
+}
+
+/**
+ * Recompute every counter from a full scan of loans and docs
+ */
+export function rebuildAggregates(): Promise<void> {
+    return serialize(async () => {
+        // Writers are blocked for the scan, so the result is exact
+        await db.transaction('rw', db.loans, db.docs, db.aggregates, async () => {
+            // Deltas still queued are already part of what the scan sees
+            queued.clear();
+            const totals: Delta = new Map();
+            await db.loans.each(loan => countLoan(totals, loan, 1));
+            await db.docs.each(doc => countDoc(totals, doc, 1));
+            await db.aggregates.clear();
+            await db.aggregates.bulkPut(Array.from(totals, ([key, value]) => ({ key, value })).filter(row => row.value !== 0));
+        });
+        localStorage.setItem(AGGREGATES_VERSION_KEY, AGGREGATES_VERSION);
+        if (queued.size === 0) localStorage.removeItem(AGGREGATES_DIRTY_KEY);
+    });
+}
+
+async function reconcile(): Promise<void> {
+    const [loanCount, docCount, counters] = await Promise.all([
+        db.loans.count(),
+        db.docs.count(),
+        db.aggregates.bulkGet(['loans', 'docs']),
+    ]);
+    const stale = localStorage.getItem(AGGREGATES_VERSION_KEY) !== AGGREGATES_VERSION
+        || localStorage.getItem(AGGREGATES_DIRTY_KEY) !== null
+        || (counters[0]?.value ?? 0) !== loanCount
+        || (counters[1]?.value ?? 0) !== docCount;
+    if (stale) await rebuildAggregates();
+}
+
+let installed = false;
+
+/**
+ * Keep the aggregates in sync with the loans and docs tables. Call once at
+ * startup, before the app writes to either table.
+ */
+export function installPortfolioAggregates() {
+    if (installed) return;
+    installed = true;
+
+    // Counted in onsuccess, so a write that fails inside a committed transaction doesn't count
+    db.loans.hook('creating', function (_key, loan, trans) {
+        this.onsuccess = () => countLoan(deltaFor(trans), loan, 1);
+    });
+    db.loans.hook('updating', function (mods, _key, loan, trans) {
+        this.onsuccess = () => {
+            const delta = deltaFor(trans);
+            countLoan(delta, loan, -1);
+            countLoan(delta, { ...loan, ...(mods as Partial<Loan>) }, 1);
+        };
+    });
+    db.loans.hook('deleting', function (_key, loan, trans) {
+        this.onsuccess = () => countLoan(deltaFor(trans), loan, -1);
+    });
+
+    db.docs.hook('creating', function (_key, doc, trans) {
+        this.onsuccess = () => countDoc(deltaFor(trans), doc, 1);
+    });
+    db.docs.hook('updating', function (mods, _key, doc, trans) {
+        this.onsuccess = () => {
+            const delta = deltaFor(trans);
+            countDoc(delta, doc, -1);
+            countDoc(delta, { ...doc, ...(mods as Partial<Doc>) }, 1);
+        };
+    });
+    db.docs.hook('deleting', function (_key, doc, trans) {
+        this.onsuccess = () => countDoc(deltaFor(trans), doc, -1);
+    });
+
+    reconcile().catch(error => console.warn('Portfolio aggregates check failed:', error));
+}
+
+/**
+ * Start at 100 and deduct per risky loan, as Dashboard and Compliance show it
+ */
+export const complianceScore = (aggregates: PortfolioAggregates) => Math.max(0, 100
+    - 15 * (aggregates.riskCounts.Critical ?? 0)
+    - 5 * (aggregates.riskCounts.High ?? 0)
+    - (aggregates.riskCounts.Medium ?? 0));
+
+/**
+ * The current summary, read from the counter rows
+ */
+export async function getPortfolioAggregates(): Promise<PortfolioAggregates> {
+    const aggregates: PortfolioAggregates = {
+        loanCount: 0,
+        exposureMinor: 0,
+        riskScoreSum: 0,
+        riskCounts: {},
+        statusCounts: {},
+        typeCounts: {},
+        exposureByTypeMinor: {},
+        exposureByMonthMinor: {},
+        riskExposureByMonthMinor: {},
+        undatedExposureMinor: 0,
+        undatedRiskExposureMinor: 0,
+        docCount: 0,
+        docSizeKb: 0,
+        docStatusCounts: {},
+    };
+    const groups: Record<string, Record<string, number>> = {
+        risk: aggregates.riskCounts,
+        status: aggregates.statusCounts,
+        typeCount: aggregates.typeCounts,
+        typeExposure: aggregates.exposureByTypeMinor,
+        monthExposure: aggregates.exposureByMonthMinor,
+        monthRiskExposure: aggregates.riskExposureByMonthMinor,
+        docStatus: aggregates.docStatusCounts,
+    };
+
+    (await db.aggregates.toArray()).forEach(({ key, value }) => {
+        const split = key.indexOf(':');
+        if (split < 0) {
+            if (key === 'loans') aggregates.loanCount = value;
+            else if (key === 'docs') aggregates.docCount = value;
+            else if (key === 'docSizeKb') aggregates.docSizeKb = value;
+            else if (key === 'exposureMinor') aggregates.exposureMinor = value;
+            else if (key === 'riskScore') aggregates.riskScoreSum = value;
+            else if (key === 'undatedExposure') aggregates.undatedExposureMinor = value;
+            else if (key === 'undatedRiskExposure') aggregates.undatedRiskExposureMinor = value;
+        } else {
+            const group = groups[key.slice(0, split)];
+            if (group) group[key.slice(split + 1)] = value;
+        }
+    });
+    return aggregates;
+}
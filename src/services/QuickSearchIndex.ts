@@ -0,0 +1,225 @@
+import { Transaction } from 'dexie';
+import { db, QuickSearchRecord } from '../db';
+import { Doc, Loan } from '../types';
+
+// Prefix index for GlobalSearch.
+//
+// Every loan and document has one record holding its searchable terms (loan
+// id, counterparty and type; document name, type and extracted entities) with
+// a weight per term. The terms are a multiEntry index, so a prefix lookup is
+// one key range scan however many records there are. Like the retrieval
+// index, Dexie hooks on the loans and docs tables queue a row for re-indexing
+// once its write commits, and a startup backfill catches anything missed.
+//
+// A lookup counts each word's range (keys only, up to SCAN_LIMIT + 1) and
+// loads the records of the narrowest, so "term acme" reads the Acme records
+// rather than the first few hundred term loans. Their other words are checked
+// against each candidate's terms and what's left is ranked. Bounded ranges
+// keep lookups flat as the portfolio grows; the price is that when every word
+// is a very common prefix, only the records whose matching terms sort first
+// (the exact and shortest matches) are considered.
+
+// Bump when tokenisation or weights change; the index is rebuilt on startup
+export const QUICK_SEARCH_VERSION = '1';
+const QUICK_SEARCH_VERSION_KEY = 'quick_search_version';
+
+const SCAN_LIMIT = 400;
+const REINDEX_BATCH = 200;
+
+// How much a match on each field counts
+const WEIGHTS = {
+    id: 4,
+    counterparty: 3,
+    name: 3,
+    type: 2,
+    entity: 1,
+};
+
+export interface QuickSearchResults {
+    loans: Loan[];
+    docs: Doc[];
+}
+
+/**
+ * Lowercased words. Numbers are also indexed without leading zeros, so
+ * "884" finds LN-2023-000884.
+ */
+export function quickSearchTerms(text: string): string[] {
+    const terms: string[] = [];
+    for (const [word] of (text ?? '').toLowerCase().matchAll(/[a-z0-9]+/g)) {
+        terms.push(word);
+        const trimmed = word.replace(/^0+(?=\d)/, '');
+        if (trimmed !== word) terms.push(trimmed);
+    }
+    return terms;
+}
+
+function buildRecord(ref: string, fields: [string | undefined, number][]): QuickSearchRecord {
+    // A term found in several fields keeps its highest weight
+    const weights = new Map<string, number>();
+    fields.forEach(([text, weight]) => quickSearchTerms(text ?? '').forEach(term => {
+        weights.set(term, Math.max(weights.get(term) ?? 0, weight));
+    }));
+    return { ref, terms: Array.from(weights.keys()), weights: Array.from(weights.values()) };
+}
+
+const loanRecord = (loan: Loan) => buildRecord(`loan:${loan.id}`, [
+    [loan.id, WEIGHTS.id],
+    [loan.counterparty, WEIGHTS.counterparty],
+    [loan.type, WEIGHTS.type],
+]);
+
+const docRecord = (doc: Doc) => buildRecord(`doc:${doc.id}`, [
+    [doc.name, WEIGHTS.name],
+    [doc.type, WEIGHTS.type],
+    ...(doc.entities ?? []).map((entity): [string, number] => [entity, WEIGHTS.entity]),
+]);
+
+/**
+ * Replace the records of the given loans and documents
+ */
+async function reindex(refs: string[]): Promise<void> {
+    const loanIds = refs.filter(ref => ref.startsWith('loan:')).map(ref => ref.slice(5));
+    const docIds = refs.filter(ref => ref.startsWith('doc:')).map(ref => Number(ref.slice(4)));
+    const [loans, docs] = await Promise.all([db.loans.bulkGet(loanIds), db.docs.bulkGet(docIds)]);
+
+    const records = [
+        ...loans.filter((loan): loan is Loan => !!loan).map(loanRecord),
+        ...docs.filter((doc): doc is Doc => !!doc).map(docRecord),
+    ];
+    const present = new Set(records.map(record => record.ref));
+    await db.transaction('rw', db.quickSearch, async () => {
+        await db.quickSearch.bulkDelete(refs.filter(ref => !present.has(ref)));
+        await db.quickSearch.bulkPut(records);
+    });
+}
+
+const dirty = new Set<string>();
+let flushing: Promise<void> | null = null;
+
+function markDirty(ref: string) {
+    dirty.add(ref);
+    if (!flushing) {
+        flushing = (async () => {
+            while (dirty.size > 0) {
+                const refs = Array.from(dirty).slice(0, REINDEX_BATCH);
+                refs.forEach(ref => dirty.delete(ref));
+                try {
+                    await reindex(refs);
+                } catch (error) {
+                    // Retried on the row's next write, or at startup if it was never indexed
+                    console.warn('Quick search index update failed:', error);
+                }
+            }
+        })().finally(() => { flushing = null; });
+    }
+}
+
+const afterCommit = (trans: Transaction, ref: string) => trans.on('complete', () => markDirty(ref));
+
+/**
+ * Queue every loan and document without a record, and every record whose
+ * row is gone. Rebuilds from scratch when QUICK_SEARCH_VERSION changed.
+ */
+async function backfill(): Promise<void> {
+    const [loanKeys, docKeys] = await Promise.all([
+        db.loans.toCollection().primaryKeys(),
+        db.docs.toCollection().primaryKeys(),
+    ]);
+    const expected = [...loanKeys.map(key => `loan:${key}`), ...docKeys.map(key => `doc:${key}`)];
+
+    if (localStorage.getItem(QUICK_SEARCH_VERSION_KEY) !== QUICK_SEARCH_VERSION) {
+        await db.quickSearch.clear();
+        localStorage.setItem(QUICK_SEARCH_VERSION_KEY, QUICK_SEARCH_VERSION);
+        expected.forEach(markDirty);
+        return;
+    }
+
+    const indexed = new Set(await db.quickSearch.toCollection().primaryKeys());
+    expected.filter(ref => !indexed.has(ref)).forEach(markDirty);
+    const present = new Set(expected);
+    indexed.forEach(ref => {
+        if (!present.has(ref)) markDirty(ref);
+    });
+}
+
+let installed = false;
+
+/**
+ * Keep the index in sync with the loans and docs tables. Call once at startup,
+ * before the app writes to either table.
+ */
+export function installQuickSearchIndex() {
+    if (installed) return;
+    installed = true;
+
+    db.loans.hook('creating', function (_key, _loan, trans) {
+        this.onsuccess = key => afterCommit(trans, `loan:${key}`);
+    });
+    db.loans.hook('updating', (_mods, key, _loan, trans) => { afterCommit(trans, `loan:${key}`); });
+    db.loans.hook('deleting', (key, _loan, trans) => { afterCommit(trans, `loan:${key}`); });
+
+    db.docs.hook('creating', function (_key, _doc, trans) {
+        this.onsuccess = key => afterCommit(trans, `doc:${key}`);
+    });
+    db.docs.hook('updating', (_mods, key, _doc, trans) => { afterCommit(trans, `doc:${key}`); });
+    db.docs.hook('deleting', (key, _doc, trans) => { afterCommit(trans, `doc:${key}`); });
+
+    backfill().catch(error => console.warn('Quick search index backfill failed:', error));
+}
+
+/**
+ * Score of a record for the query words, or 0 unless every word prefixes
+ * one of its terms. Exact terms count double, and shorter terms rank a
+ * partial word higher.
+ */
+function scoreRecord(record: QuickSearchRecord, words: string[]): number {
+    let total = 0;
+    for (const word of words) {
+        let best = 0;
+        record.terms.forEach((term, i) => {
+            if (!term.startsWith(word)) return;
+            const score = record.weights[i] * (term === word ? 2 : 1 + word.length / term.length);
+            if (score > best) best = score;
+        });
+        if (best === 0) return 0;
+        total += best;
+    }
+    return total;
+}
+
+/**
+ * Best matching loans and documents for a search box query, limit of each
+ */
+export async function quickSearch(query: string, limit = 5): Promise<QuickSearchResults> {
+    const words = Array.from(new Set(query.toLowerCase().match(/[a-z0-9]+/g) ?? []));
+    if (words.length === 0) return { loans: [], docs: [] };
+
+    // Every word has to match, so the word with the fewest matches bounds the candidates
+    const ranges = await Promise.all(words.map(word =>
+        db.quickSearch.where('terms').startsWith(word).limit(SCAN_LIMIT + 1).primaryKeys()));
+    const narrowest = ranges.reduce((best, refs) => refs.length < best.length ? refs : best);
+    // A record with several matching terms is listed once per term
+    const refs = Array.from(new Set(narrowest)).slice(0, SCAN_LIMIT);
+    const candidates = (await db.quickSearch.bulkGet(refs)).filter((record): record is QuickSearchRecord => !!record);
+
+    const ranked = candidates
+        .map(record => ({ ref: record.ref, score: scoreRecord(record, words) }))
+        .filter(({ score }) => score > 0)
+        .sort((a, b) => b.score - a.score || (a.ref < b.ref ? -1 : 1));
+
+    const top = (prefix: string) => ranked.filter(({ ref }) => ref.startsWith(prefix)).slice(0, limit).map(({ ref }) => ref.slice(prefix.length));
+    const [loans, docs] = await Promise.all([
+        db.loans.bulkGet(top('loan:')),
+        db.docs.bulkGet(top('doc:').map(Number)),
+    ]);
+    return {
+        loans: loans.filter((loan): loan is Loan => !!loan),
+        docs: docs.filter((doc): doc is Doc => !!doc),
+    };
+}
+
+// Verification tooling sets this flag from a Playwright init script to time lookups
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_SEARCH__) {
+    (window as any).__docpulseQuickSearch = { quickSearch };
+}
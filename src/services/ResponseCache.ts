@@ -0,0 +1,157 @@
+import { CHAT_MODEL, streamChatAnswer } from './openai';
+import { deleteCached, getCached, hashContent, putCached } from './AnalysisCache';
+
+// Response cache for Smart Query answers.
+//
+// Answers are stored in the analysis cache (kind 'answer', so they share its
+// size-bounded LRU eviction) under the SHA-256 of model and full prompt. The
+// prompt embeds the retrieved context, so a change to the underlying loans or
+// documents is a different key. Entries also expire after a TTL, and a read
+// that finds one expired deletes it. Identical questions asked while the
+// first is still streaming join that request instead of sending their own;
+// the shared request is only aborted once every caller has given up on it.
+
+export const ANSWER_TTL_MS = 24 * 60 * 60 * 1000;
+
+// Optional override in milliseconds
+const getAnswerTtl = () => Number(localStorage.getItem('answer_cache_ttl_ms')) || ANSWER_TTL_MS;
+
+interface CachedAnswer {
+    text: string;
+    createdAt: number;
+}
+
+export type AnswerSource = 'cache' | 'network' | 'coalesced';
+
+export interface AnswerResult {
+    text: string;
+    source: AnswerSource;
+}
+
+interface Flight {
+    text: string; // Streamed so far, replayed to callers that join late
+    listeners: Set<(token: string) => void>;
+    controller: AbortController;
+    callers: number;
+    result: Promise<string>;
+}
+
+const flights = new Map<string, Flight>();
+
+const counters = {
+    hits: 0,
+    misses: 0,
+    coalesced: 0,
+    hitMs: 0,
+    missMs: 0,
+};
+
+export interface ResponseCacheStats {
+    hits: number;
+    misses: number;
+    coalesced: number;
+    hitRate: number;
+    avgHitMs: number;
+    avgMissMs: number;
+}
+
+export const getResponseCacheStats = (): ResponseCacheStats => {
+    const lookups = counters.hits + counters.misses + counters.coalesced;
+    return {
+        hits: counters.hits,
+        misses: counters.misses,
+        coalesced: counters.coalesced,
+        hitRate: lookups > 0 ? counters.hits / lookups : 0,
+        avgHitMs: counters.hits > 0 ? Math.round(counters.hitMs / counters.hits) : 0,
+        avgMissMs: counters.misses > 0 ? Math.round(counters.missMs / counters.misses) : 0,
+    };
+};
+
+function startFlight(hash: string, prompt: string): Flight {
+    const flight: Flight = {
+        text: '',
+        listeners: new Set(),
+        controller: new AbortController(),
+        callers: 0,
+        result: Promise.resolve(''),
+    };
+    flight.result = streamChatAnswer(prompt, token => {
+        flight.text += token;
+        flight.listeners.forEach(listener => listener(token));
+    }, flight.controller.signal)
+        .then(text => {
+            // Only complete answers are cached; errors and aborts reject before this
+            if (text) putCached<CachedAnswer>(hash, 'answer', CHAT_MODEL, { text, createdAt: Date.now() });
+            return text;
+        })
+        .finally(() => {
+            // A newer flight may have replaced this one after it was aborted
+            if (flights.get(hash) === flight) flights.delete(hash);
+        });
+    flights.set(hash, flight);
+    return flight;
+}
+
+/**
+ * Wait for a shared request on behalf of one caller. Aborting rejects this
+ * caller only, and aborts the request once no caller is left.
+ */
+const follow = (flight: Flight, signal?: AbortSignal) =>
+    new Promise<string>((resolve, reject) => {
+        flight.callers++;
+        const onAbort = () => {
+            if (--flight.callers === 0) flight.controller.abort();
+            reject(new DOMException('Answer cancelled', 'AbortError'));
+        };
+        if (signal?.aborted) return onAbort();
+        signal?.addEventListener('abort', onAbort, { once: true });
+        flight.result
+            .then(resolve, reject)
+            .finally(() => signal?.removeEventListener('abort', onAbort));
+    });
+
+/**
+ * Answer a chat prompt from the cache, an identical request already in
+ * flight, or a new streamed request. onToken receives the answer as it
+ * arrives; a cache hit delivers it in one piece.
+ */
+export async function answerWithCache(prompt: string, onToken: (token: string) => void, signal?: AbortSignal): Promise<AnswerResult> {
+    const started = performance.now();
+    const hash = await hashContent(new TextEncoder().encode(`${CHAT_MODEL}\n${prompt}`).buffer as ArrayBuffer);
+
+    const cached = await getCached<CachedAnswer>(hash, 'answer', CHAT_MODEL);
+    if (cached && Date.now() - cached.createdAt < getAnswerTtl()) {
+        counters.hits++;
+        counters.hitMs += performance.now() - started;
+        onToken(cached.text);
+        return { text: cached.text, source: 'cache' };
+    }
+    if (cached) await deleteCached(hash, 'answer', CHAT_MODEL);
+    signal?.throwIfAborted();
+
+    let flight = flights.get(hash);
+    // Every caller of this one has already gone; don't join it on its way out
+    if (flight?.controller.signal.aborted) flight = undefined;
+    const source: AnswerSource = flight ? 'coalesced' : 'network';
+    if (flight) {
+        counters.coalesced++;
+    } else {
+        counters.misses++;
+        flight = startFlight(hash, prompt);
+    }
+
+    if (flight.text) onToken(flight.text);
+    flight.listeners.add(onToken);
+    try {
+        const text = await follow(flight, signal);
+        if (source === 'network') counters.missMs += performance.now() - started;
+        return { text, source };
+    } finally {
+        flight.listeners.delete(onToken);
+    }
+}
+
+// Verification tooling sets this flag from a Playwright init script to read the counters
+if (typeof window !== 'undefined' && (window as any).__DOCPULSE_EXPOSE_CACHE__) {
+    (window as any).__docpulseResponseCache = { getResponseCacheStats };
+}
@@ -0,0 +1,379 @@
+import Dexie, { Transaction } from 'dexie';
+import { AggregateCounter, db, SearchPosting, SearchRecord } from '../db';
+import { Doc, Loan } from '../types';
+import { getCached } from './AnalysisCache';
+import { PDF_TEXT_VERSION } from '../utils/pdfExtract';
+
+// Local retrieval for Smart Query context.
+//
+// Loans (core fields, review summary, covenants, events of default, risk
+// flags), document metadata and passages of extracted document text are kept
+// in an inverted index in IndexedDB. Dexie hooks on the loans and docs tables
+// mark a row dirty when a write commits, and dirty rows are re-indexed in the
+// background, so the index follows the data without full rebuilds. The BM25
+// statistics (record count, total length, document frequency per term) are
+// counters in searchStats, updated in the same transaction as the postings,
+// so a query reads a handful of rows rather than every record. A query is
+// scored with BM25 and the best records are packed into the prompt until the
+// token budget is spent.
+
+// Bump when tokenisation, record text or the stored statistics change; the index is rebuilt on startup
+export const INDEX_VERSION = '2';
+const INDEX_VERSION_KEY = 'retrieval_index_version';
+
+export interface RetrievalOptions {
+    tokenBudget: number; // Approximate tokens of context per query
+    topK: number; // Most records per query
+}
+
+export const DEFAULT_RETRIEVAL_OPTIONS: RetrievalOptions = {
+    tokenBudget: 3000,
+    topK: 20,
+};
+
+// Optional overrides, e.g. for a model with a larger context window
+export const getRetrievalOptions = (): RetrievalOptions => {
+    const options = { ...DEFAULT_RETRIEVAL_OPTIONS };
+    (Object.keys(options) as (keyof RetrievalOptions)[]).forEach(key => {
+        const value = Number(localStorage.getItem(`retrieval_${key}`));
+        if (value > 0) options[key] = value;
+    });
+    return options;
+};
+
+export interface RetrievedRecord {
+    ref: string;
+    kind: SearchRecord['kind'];
+    text: string;
+    score: number;
+}
+
+const PASSAGE_CHARS = 1200;
+const MAX_PASSAGES_PER_DOC = 3;
+const REINDEX_BATCH = 25;
+const K1 = 1.2;
+const B = 0.75;
+// A term in more than this share of the records (and at least
+// COMMON_TERM_MIN_RECORDS of them) says little about relevance and would load
+// a posting per record, so queries skip it
+const COMMON_TERM_FRACTION = 0.5;
+const COMMON_TERM_MIN_RECORDS = 500;
+
+const RECORDS_KEY = 'records';
+const LENGTH_KEY = 'length';
+const dfKey = (term: string) => `df:${term}`;
+
+const STOPWORDS = new Set([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'me', 'my', 'of', 'on', 'or', 'our', 'show', 'that', 'the', 'their', 'this', 'to', 'was',
+    'what', 'which', 'with', 'all', 'any', 'list', 'tell', 'about', 'do', 'does', 'there', 'how',
+]);
+
+// Roughly four characters per token on English text
+export const estimateTokens = (text: string) => Math.ceil(text.length / 4);
+
+/**
+ * Lowercased terms without stopwords, with a plural "s" folded away
+ */
+export function tokenize(text: string): string[] {
+    const terms: string[] = [];
+    for (const [word] of text.toLowerCase().matchAll(/[a-z0-9]+/g)) {
+        if (word.length < 2 || STOPWORDS.has(word)) continue;
+        terms.push(word.length > 3 && word.endsWith('s') && !word.endsWith('ss') ? word.slice(0, -1) : word);
+    }
+    return terms;
+}
+
+const loanText = (loan: Loan) => {
+    const review = loan.reviewData;
+    const parts = [
+        `Loan ${loan.id} (${loan.type}) with ${loan.counterparty}: ${loan.amount}, Risk: ${loan.risk}, Status: ${loan.status}, Deadline: ${loan.deadline}`,
+    ];
+    if (review?.summary) parts.push(`Summary: ${review.summary}`);
+    const covenants = Array.isArray(review?.financialCovenants) ? review!.financialCovenants : [];
+    if (covenants.length > 0) {
+        parts.push(`Covenants: ${covenants.map(c => `${c.termName} ${c.value} (${c.status}${c.clauseRef ? `, ${c.clauseRef}` : ''})`).join('; ')}`);
+    }
+    const events = Array.isArray(review?.eventsOfDefault) ? review!.eventsOfDefault : [];
+    if (events.length > 0) {
+        parts.push(`Events of default: ${events.map(e => (typeof e === 'string' ? e : e.type)).join('; ')}`);
+    }
+    if (review?.riskFlags?.length) parts.push(`Risk flags: ${review.riskFlags.join('; ')}`);
+    return parts.join('. ');
+};
+
+const docText = (doc: Doc) =>
+    `${doc.name} (${doc.type}): Status ${doc.status}, Date: ${doc.date}, Entities: ${doc.entities?.join(', ') || 'None'}`;
+
+/**
+ * Split text into passages of about PASSAGE_CHARS, cut at whitespace
+ */
+function splitPassages(text: string): string[] {
+    const passages: string[] = [];
+    let start = 0;
+    while (start < text.length) {
+        let end = Math.min(text.length, start + PASSAGE_CHARS);
+        if (end < text.length) {
+            const space = text.lastIndexOf(' ', end);
+            if (space > start + PASSAGE_CHARS / 2) end = space;
+        }
+        const passage = text.slice(start, end).trim();
+        if (passage) passages.push(passage);
+        start = end;
+    }
+    return passages;
+}
+
+/**
+ * Current index records for one loan or document; none if the row is gone
+ */
+async function buildRecords(owner: string): Promise<SearchRecord[]> {
+    const [kind, key] = owner.split(':');
+    const record = (ref: string, recordKind: SearchRecord['kind'], text: string): SearchRecord =>
+        ({ ref, owner, kind: recordKind, text, length: 0 });
+
+    if (kind === 'loan') {
+        const loan = await db.loans.get(key);
+        return loan ? [record(owner, 'loan', loanText(loan))] : [];
+    }
+
+    const doc = await db.docs.get(Number(key));
+    if (!doc) return [];
+    const records = [record(owner, 'doc', docText(doc))];
+    // Extracted text lives in the analysis cache; an evicted entry leaves only the metadata indexed
+    const text = doc.contentHash ? await getCached<string>(doc.contentHash, 'text', PDF_TEXT_VERSION) : undefined;
+    if (typeof text === 'string') {
+        splitPassages(text).forEach((passage, i) => records.push(record(`${owner}#${i}`, 'passage', `[${doc.name}] ${passage}`)));
+    }
+    return records;
+}
+
+/**
+ * Add deltas to the searchStats counters; call inside a transaction that includes it
+ */
+async function applyStats(delta: Map<string, number>): Promise<void> {
+    const keys = Array.from(delta.keys()).filter(key => delta.get(key) !== 0);
+    const rows = await db.searchStats.bulkGet(keys);
+    const updated: AggregateCounter[] = [];
+    const emptied: string[] = [];
+    keys.forEach((key, i) => {
+        const value = (rows[i]?.value ?? 0) + delta.get(key)!;
+        if (value <= 0) emptied.push(key);
+        else updated.push({ key, value });
+    });
+    await db.searchStats.bulkPut(updated);
+    await db.searchStats.bulkDelete(emptied);
+}
+
+/**
+ * Replace the index records of the given owners
+ */
+async function reindex(owners: string[]): Promise<void> {
+    const records = (await Promise.all(owners.map(buildRecords))).flat();
+    const postings: SearchPosting[] = [];
+    records.forEach(record => {
+        const counts = new Map<string, number>();
+        const terms = tokenize(record.text);
+        terms.forEach(term => counts.set(term, (counts.get(term) ?? 0) + 1));
+        record.length = terms.length;
+        counts.forEach((tf, term) => postings.push({ term, ref: record.ref, tf, length: terms.length }));
+    });
+
+    await db.transaction('rw', db.searchRecords, db.searchPostings, db.searchStats, async () => {
+        const stale = await db.searchRecords.where('owner').anyOf(owners).toArray();
+        const staleRefs = stale.map(record => record.ref);
+        const stalePostings = await db.searchPostings.where('ref').anyOf(staleRefs).toArray();
+
+        const delta = new Map<string, number>();
+        const add = (key: string, by: number) => delta.set(key, (delta.get(key) ?? 0) + by);
+        add(RECORDS_KEY, records.length - stale.length);
+        add(LENGTH_KEY, records.reduce((sum, record) => sum + record.length, 0) - stale.reduce((sum, record) => sum + record.length, 0));
+        stalePostings.forEach(({ term }) => add(dfKey(term), -1));
+        postings.forEach(({ term }) => add(dfKey(term), 1));
+
+        await db.searchPostings.bulkDelete(stalePostings.map(({ term, ref }) => [term, ref] as [string, string]));
+        await db.searchRecords.bulkDelete(staleRefs);
+        await db.searchRecords.bulkAdd(records);
+        await db.searchPostings.bulkAdd(postings);
+        await applyStats(delta);
+    });
+}
+
+const dirty = new Set<string>();
+let flushing: Promise<void> | null = null;
+
+function markDirty(owner: string) {
+    dirty.add(owner);
+    if (!flushing) {
+        flushing = (async () => {
+            while (dirty.size > 0) {
+                const owners = Array.from(dirty).slice(0, REINDEX_BATCH);
+                owners.forEach(owner => dirty.delete(owner));
+                try {
+                    await reindex(owners);
+                } catch (error) {
+                    // Retried on the row's next write, or at startup if it was never indexed
+                    console.warn('Retrieval index update failed:', error);
+                }
+            }
+        })().finally(() => { flushing = null; });
+    }
+}
+
+// Re-index only once the write has committed; an aborted transaction changes nothing
+const afterCommit = (trans: Transaction, owner: string) => trans.on('complete', () => markDirty(owner));
+
+/**
+ * Queue every loan and document the index is missing, and every indexed one
+ * that no longer exists. Rebuilds from scratch when INDEX_VERSION changed.
+ */
+async function backfill(): Promise<void> {
+    const [loanKeys, docKeys] = await Promise.all([
+        db.loans.toCollection().primaryKeys(),
+        db.docs.toCollection().primaryKeys(),
+    ]);
+    const expected = [...loanKeys.map(key => `loan:${key}`), ...docKeys.map(key => `doc:${key}`)];
+
+    if (localStorage.getItem(INDEX_VERSION_KEY) !== INDEX_VERSION) {
+        await db.transaction('rw', db.searchRecords, db.searchPostings, db.searchStats, async () => {
+            await db.searchRecords.clear();
+            await db.searchPostings.clear();
+            await db.searchStats.clear();
+        });
+        localStorage.setItem(INDEX_VERSION_KEY, INDEX_VERSION);
+        expected.forEach(markDirty);
+        return;
+    }
+
+    const indexed = new Set((await db.searchRecords.orderBy('owner').uniqueKeys()) as string[]);
+    expected.filter(owner => !indexed.has(owner)).forEach(markDirty);
+    const present = new Set(expected);
+    indexed.forEach(owner => {
+        if (!present.has(owner)) markDirty(owner);
+    });
+}
+
+let installed = false;
+
+/**
+ * Keep the index in sync with the loans and docs tables. Call once at startup,
+ * before the app writes to either table.
+ */
+export function installRetrievalIndex() {
+    if (installed) return;
+    installed = true;
+
+    db.loans.hook('creating', function (_key, _loan, trans) {
+        this.onsuccess = key => afterCommit(trans, `loan:${key}`);
+    });
+    db.loans.hook('updating', (_mods, key, _loan, trans) => { afterCommit(trans, `loan:${key}`); });
+    db.loans.hook('deleting', (key, _loan, trans) => { afterCommit(trans, `loan:${key}`); });
+
+    db.docs.hook('creating', function (_key, _doc, trans) {
+        this.onsuccess = key => afterCommit(trans, `doc:${key}`);
+    });
+    db.docs.hook('updating', (_mods, key, _doc, trans) => { afterCommit(trans, `doc:${key}`); });
+    db.docs.hook('deleting', (key, _doc, trans) => { afterCommit(trans, `doc:${key}`); });
+
+    backfill().catch(error => console.warn('Retrieval index backfill failed:', error));
+}
+
+/**
+ * BM25 top-k under the token budget. At most MAX_PASSAGES_PER_DOC passages
+ * come from any one document, so a long agreement can't crowd out the rest.
+ * Answers from what has been indexed so far, without waiting for rows still
+ * queued for re-indexing (e.g. the startup backfill). Terms common to most
+ * records are skipped; a query made only of those matches nothing, and
+ * buildRetrievalContext falls back to listing loans.
+ */
+export async function retrieve(query: string, options: RetrievalOptions = getRetrievalOptions()): Promise<RetrievedRecord[]> {
+    const terms = Array.from(new Set(tokenize(query)));
+    if (terms.length === 0) return [];
+
+    // One read transaction, so the statistics match the postings
+    const { recordCount, averageLength, postingLists } = await db.transaction('r', db.searchStats, db.searchPostings, async () => {
+        const [records, length, ...frequencies] = await db.searchStats.bulkGet([RECORDS_KEY, LENGTH_KEY, ...terms.map(dfKey)]);
+        const recordCount = records?.value ?? 0;
+        const maxFrequency = Math.max(COMMON_TERM_MIN_RECORDS, recordCount * COMMON_TERM_FRACTION);
+        const selected = terms.filter((_, i) => {
+            const frequency = frequencies[i]?.value ?? 0;
+            return frequency > 0 && frequency <= maxFrequency;
+        });
+        return {
+            recordCount,
+            averageLength: (length?.value ?? 0) / recordCount || 1,
+            postingLists: await Promise.all(selected.map(term =>
+                db.searchPostings.where('[term+ref]').between([term, Dexie.minKey], [term, Dexie.maxKey]).toArray()
+            )),
+        };
+    });
+    if (recordCount === 0) return [];
+
+    const scores = new Map<string, number>();
+    postingLists.forEach(postings => {
+        const idf = Math.log(1 + (recordCount - postings.length + 0.5) / (postings.length + 0.5));
+        postings.forEach(({ ref, tf, length }) => {
+            const score = idf * (tf * (K1 + 1)) / (tf + K1 * (1 - B + B * length / averageLength));
+            scores.set(ref, (scores.get(ref) ?? 0) + score);
+        });
+    });
+
+    const ranked = Array.from(scores, ([ref, score]) => ({ ref, score })).sort((a, b) => b.score - a.score);
+    const results: RetrievedRecord[] = [];
+    const passagesPerDoc = new Map<string, number>();
+    let budget = options.tokenBudget;
+
+    // Records are loaded a page at a time; most queries fill up from the first page
+    const pageSize = options.topK * 2;
+    for (let start = 0; start < ranked.length && results.length < options.topK && budget > 0; start += pageSize) {
+        const page = ranked.slice(start, start + pageSize);
+        const records = await db.searchRecords.bulkGet(page.map(({ ref }) => ref));
+        for (let i = 0; i < page.length && results.length < options.topK; i++) {
+            const record = records[i];
+            if (!record) continue;
+            if (record.kind === 'passage') {
+                const count = passagesPerDoc.get(record.owner) ?? 0;
+                if (count >= MAX_PASSAGES_PER_DOC) continue;
+                passagesPerDoc.set(record.owner, count + 1);
+            }
+            const cost = estimateTokens(record.text);
+            if (cost > budget) continue;
+            budget -= cost;
+            results.push({ ref: record.ref, kind: record.kind, text: record.text, score: page[i].score });
+        }
+    }
+    return results;
+}
+
+/**
+ * Prompt context for a Smart Query: the most relevant loans, documents and
+ * document passages. When nothing matches (e.g. "summarise my portfolio"),
+ * falls back to loans in index order, still within the budget.
+ */
+export async function buildRetrievalContext(query: string, options: RetrievalOptions = getRetrievalOptions()): Promise<string> {
+    let records = await retrieve(query, options);
+    if (records.length === 0) {
+        const loans = await db.searchRecords.where('owner').startsWith('loan:').limit(options.topK).toArray();
+        let budget = options.tokenBudget;
+        for (const record of loans) {
+            const cost = estimateTokens(record.text);
+            if (cost > budget) break;
+            budget -= cost;
+            records.push({ ref: record.ref, kind: record.kind, text: record.text, score: 0 });
+        }
+    }
+
+    const [loanCount, docCount] = await Promise.all([db.loans.count(), db.docs.count()]);
+    const scope = `(Selected by relevance to the query from ${loanCount} loans and ${docCount} documents; records not listed were left out.)\n\n`;
+
+    const section = (title: string, kind: SearchRecord['kind']) => {
+        const lines = records.filter(record => record.kind === kind).map(record => `- ${record.text}`);
+        return lines.length > 0 ? `=== ${title} ===\n${lines.join('\n')}\n\n` : '';
+    };
+    return (
+        scope +
+        section('LOAN PORTFOLIO DATA', 'loan') +
+        section('AVAILABLE DOCUMENTS', 'doc') +
+        section('DOCUMENT EXCERPTS', 'passage')
+    ).trim();
+}
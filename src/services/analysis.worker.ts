@@ -0,0 +1,87 @@
+// Document analysis worker. Parses the PDF with pdf.js and scans each page's
+// text as soon as it is extracted, posting progress and partial findings as
+// pages finish so the UI thread neither holds the text nor runs the scan.
+// Pages without a text layer are listed in the result instead; OCR needs a
+// canvas and runs its own workers, so AnalysisService recognizes those pages
+// and sends their text back here, where the document is rescanned with it.
+
+import { analyzeText, DocumentExtractionResult, extractPdfPages, hasTextLayer, IncrementalAnalysis } from './DocumentAnalyzer';
+import type { AnalysisWorkerRequest, AnalysisWorkerResponse } from './AnalysisService';
+
+// Deriving the findings covers every hit so far, so on long documents it is
+// refreshed at most this often rather than after every page
+const PARTIAL_INTERVAL_MS = 100;
+
+// Jobs still running; a cancel for any other id arrived too late and is dropped
+const active = new Set<number>();
+const cancelled = new Set<number>();
+// Page texts of finished jobs with scanned pages, until their OCR text (or a release) arrives
+const retained = new Map<number, string[]>();
+
+function post(message: AnalysisWorkerResponse) {
+    self.postMessage(message);
+}
+
+async function analyze(id: number, data: ArrayBuffer) {
+    const analysis = new IncrementalAnalysis();
+    let partial: DocumentExtractionResult | null = null;
+    let partialAt = 0;
+    const texts: string[] = [];
+    active.add(id);
+    try {
+        for await (const { page, numPages, text } of extractPdfPages(data)) {
+            // Cancel requests are delivered between the awaits of the page loop
+            if (cancelled.has(id)) {
+                post({ type: 'cancelled', id });
+                return;
+            }
+            analysis.addPage(text);
+            texts.push(text);
+            if (!partial || performance.now() - partialAt >= PARTIAL_INTERVAL_MS) {
+                partial = analysis.partial();
+                partialAt = performance.now();
+            }
+            post({ type: 'page', id, page, numPages, partial });
+        }
+        const scannedPages = texts.flatMap((text, i) => (hasTextLayer(text) ? [] : [i + 1]));
+        if (scannedPages.length > 0) retained.set(id, texts);
+        post({ type: 'done', id, result: analysis.finish(), scannedPages });
+    } catch (error) {
+        post({ type: 'error', id, message: error instanceof Error ? error.message : String(error) });
+    } finally {
+        active.delete(id);
+        cancelled.delete(id);
+    }
+}
+
+/**
+ * Rescan a finished job's document with OCR text for its scanned pages
+ */
+function rescan(id: number, pages: { page: number; text: string }[]) {
+    const texts = retained.get(id);
+    retained.delete(id);
+    if (!texts) {
+        post({ type: 'error', id, message: 'No analysis to rescan' });
+        return;
+    }
+    try {
+        pages.forEach(({ page, text }) => { texts[page - 1] = text; });
+        // Joined as IncrementalAnalysis joins pages, so finish() and a rescan agree
+        post({ type: 'done', id, result: analyzeText(texts.map(text => text + '\n').join('')), scannedPages: [] });
+    } catch (error) {
+        post({ type: 'error', id, message: error instanceof Error ? error.message : String(error) });
+    }
+}
+
+self.onmessage = (event: MessageEvent<AnalysisWorkerRequest>) => {
+    const message = event.data;
+    if (message.type === 'analyze') {
+        analyze(message.id, message.data);
+    } else if (message.type === 'rescan') {
+        rescan(message.id, message.pages);
+    } else if (message.type === 'release') {
+        retained.delete(message.id);
+    } else if (message.type === 'cancel' && active.has(message.id)) {
+        cancelled.add(message.id);
+    }
+};
@@ -9,12 +9,22 @@ const getApiKey = () => {
   return import.meta.env.VITE_OPENAI_API_KEY;
 };
 
+// Optional OpenAI-compatible endpoint (e.g. the local stand-in in verification/mock_openai.py)
+const getBaseUrl = () => {
+  const localUrl = localStorage.getItem('openai_base_url');
+  if (localUrl && localUrl.trim() !== '') {
+    return localUrl;
+  }
+  return import.meta.env.VITE_OPENAI_BASE_URL || undefined;
+};
+
 const apiKey = getApiKey();
 
 // Initialize the client
 // dangerouslyAllowBrowser: true is required for client-side usage
 export const openai = new OpenAI({
   apiKey: apiKey || 'dummy-key', // Fallback to avoid crash on init, but calls will fail if missing
+  baseURL: getBaseUrl(),
   dangerouslyAllowBrowser: true
 });
 
@@ -31,12 +41,23 @@ export const updateApiKey = (key: string) => {
   window.location.reload(); // Simple way to ensure new key is picked up by the module-level init
 };
 
-export const getLoanAnalysisPrompt = (filename: string, fileContent: string) => `
+// Model and prompt revision behind cached loan reviews; bump when either changes
+export const LOAN_ANALYSIS_MODEL = "gpt-4o";
+export const LOAN_ANALYSIS_PROMPT_VERSION = `${LOAN_ANALYSIS_MODEL}:3`;
+
+// Long agreements are reviewed in parts (see services/LoanAnalysis.ts) rather
+// than truncated, so fileContent is expected to be one chunk-sized part.
+// Parts aren't numbered, so a part's prompt (and its cached review) doesn't
+// change when an edit elsewhere adds or removes parts.
+export const getLoanAnalysisPrompt = (filename: string, fileContent: string, isPart = false) => `
 You are an expert financial analyst AI (LMA DocPulse).
 Analyze the following loan agreement document.
-
+${isPart ? `
+This is one part of a longer agreement. Report only what appears in this part:
+leave fields that this part doesn't cover empty, and count only the clauses in this part in clauseStats.
+` : ''}
 Filename: "${filename}"
-Content: "${fileContent.substring(0, 50000)}..."
+Content: "${fileContent}"
 
 Extract or generate a JSON object with the following fields:
 - counterparty (string): Name of the borrower/company.
@@ -76,6 +97,30 @@ Extract or generate a JSON object with the following fields:
 Return ONLY the JSON object.
 `;
 
+export const CHAT_MODEL = "gpt-4o";
+
+// Streams a chat answer, calling onToken with each content delta as it
+// arrives; resolves with the full text. Abort via signal to cancel.
+export const streamChatAnswer = async (prompt: string, onToken: (token: string) => void, signal?: AbortSignal) => {
+  const stream = await openai.chat.completions.create({
+    model: CHAT_MODEL,
+    messages: [
+      { role: "user", content: prompt }
+    ],
+    stream: true
+  }, { signal });
+
+  let text = '';
+  for await (const chunk of stream) {
+    const token = chunk.choices[0]?.delta?.content;
+    if (token) {
+      text += token;
+      onToken(token);
+    }
+  }
+  return text;
+};
+
 export const getChatPrompt = (query: string, context: string) => `
 You are LMA DocPulse, an advanced AI assistant for loan compliance.
 User Query: "${query}"
@@ -1,4 +1,5 @@
 import React from 'react';
+import type { IngestUpdate } from '../services/IngestQueue';
 
 export type ViewState = 'landing' | 'auth' | 'dashboard' | 'vault' | 'upload' | 'smart_query' | 'analytics' | 'compliance' | 'notifications' | 'settings' | 'loan_review' | 'profile' | 'loan_reviews' | 'filter' | 'document_detail' | 'edit_profile' | 'alerts_log' | 'activity_log' | 'violations_log' | 'public_profile' | 'analytics_result';
 
@@ -9,7 +10,10 @@ export interface Doc {
     size: string;
     status: string;
     date: string;
-    fileData?: Blob;
+    dateTs?: number; // Epoch ms of date (or of the upload if it doesn't parse); derived on write, see src/db.ts
+    // SHA-256 of the uploaded file; keys its bytes in the blobs table (services/BlobStore.ts)
+    // and its cached analysis (services/AnalysisCache.ts)
+    contentHash?: string;
     entities?: string[];
 }
 
@@ -19,6 +23,7 @@ export interface QueueItem {
     progress: number;
     status: 'uploading' | 'ready' | 'error';
     errorMessage?: string;
+    ingest?: IngestUpdate; // Set once the file has been handed to the ingest queue
 }
 
 export interface StatCardProps {
@@ -43,7 +48,8 @@ export interface AlertItemProps {
 export interface Alert {
     id?: number;
     title: string;
-    time: string;
+    time: string; // Display text, e.g. 'now' or '2h'
+    createdAt?: number; // Epoch ms, set on write from time or the write itself; see src/db.ts
     subtitle: string;
     type: 'critical' | 'warning' | 'info';
 }
@@ -55,6 +61,8 @@ export interface Query {
     model: string;
     result?: string;
     bookmarked?: boolean;
+    status?: 'streaming' | 'done' | 'cancelled' | 'error';
+    firstTokenMs?: number; // Time from submit to the first streamed token
 }
 
 export interface BorrowerDetails {
@@ -124,4 +132,8 @@ export interface Loan {
     risk: 'Low' | 'Medium' | 'High' | 'Critical';
     deadline?: string;
     reviewData?: ReviewData;
+    // Derived from amount, deadline and date on every write (see src/db.ts)
+    amountMinor?: number; // Cents; 0 if the amount doesn't parse
+    deadlineTs?: number; // Epoch ms
+    dateTs?: number; // Epoch ms; 0 if the date doesn't parse
 }
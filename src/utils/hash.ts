@@ -0,0 +1,8 @@
+/**
+ * Hex SHA-256 of a Blob or its bytes
+ */
+export async function hashContent(data: Blob | ArrayBuffer): Promise<string> {
+    const buffer = data instanceof Blob ? await data.arrayBuffer() : data;
+    const digest = await crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
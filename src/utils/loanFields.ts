@@ -0,0 +1,41 @@
+import { Loan } from '../types';
+
+// Numeric columns derived from a loan's display strings. AppDatabase fills
+// them in on every write (see src/db.ts), so views and range queries never
+// re-parse "$12.5M" or "Oct 24, 2023". The columns the list views sort on
+// are never left unset, since a row without the key drops out of the index:
+// an amount that doesn't parse ("Undisclosed") counts as 0 and an undated
+// loan as the oldest (epoch 0), matching how the views already treat them.
+
+export type NormalizedLoanFields = Pick<Loan, 'amountMinor' | 'deadlineTs' | 'dateTs'>;
+
+/**
+ * Amount in minor units (cents) from strings like "$12.5M", "€750K" or "1,200,000"
+ */
+export const parseAmountMinor = (amount: string | undefined | null): number | undefined => {
+    if (!amount || typeof amount !== 'string') return undefined;
+
+    // Remove currency symbols, commas, and spaces
+    const clean = amount.replace(/[$€£,\s]/g, '').trim();
+    const value = parseFloat(clean.replace(/[^0-9.]/g, ''));
+    if (isNaN(value)) return undefined;
+
+    const multiplier = /b$/i.test(clean) ? 1e9 : /m$/i.test(clean) ? 1e6 : /k$/i.test(clean) ? 1e3 : 1;
+    return Math.round(value * multiplier * 100);
+};
+
+/**
+ * Epoch ms of a display date like "Oct 24, 2023" (local midnight), or undefined
+ * for anything that isn't a date ("Immediate", "TBD")
+ */
+export const parseDateTs = (date: string | undefined | null): number | undefined => {
+    if (!date || typeof date !== 'string') return undefined;
+    const ts = Date.parse(date);
+    return isNaN(ts) ? undefined : ts;
+};
+
+export const normalizeLoanFields = (loan: Partial<Loan>): NormalizedLoanFields => ({
+    amountMinor: parseAmountMinor(loan.amount) ?? 0,
+    deadlineTs: parseDateTs(loan.deadline),
+    dateTs: parseDateTs(loan.date) ?? 0,
+});
@@ -1,35 +1,18 @@
-import { pdfjs } from 'react-pdf';
+import { DocumentProcessor, ExtractOptions } from '../services/DocumentProcessor';
 
-// Ensure worker is configured.
-// Note: If DocumentDetailView runs first, it might set this, but better to be safe.
-// We use the same CDN url as in DocumentDetailView.
-if (!pdfjs.GlobalWorkerOptions.workerSrc) {
-    pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`;
-}
+// Bump when the extracted text format changes (invalidates cached text)
+export const PDF_TEXT_VERSION = '2';
 
-export const extractTextFromPDF = async (file: File): Promise<string> => {
+/**
+ * Text of every page, OCRing pages without a text layer. Rethrows an
+ * AbortError; other failures give an empty string.
+ */
+export const extractTextFromPDF = async (file: File, options: ExtractOptions = {}): Promise<string> => {
     try {
-        const arrayBuffer = await file.arrayBuffer();
-
-        // Load the document
-        const loadingTask = pdfjs.getDocument(arrayBuffer);
-        const pdf = await loadingTask.promise;
-
-        let fullText = '';
-
-        // Extract text from all pages
-        for (let i = 1; i <= pdf.numPages; i++) {
-            const page = await pdf.getPage(i);
-            const textContent = await page.getTextContent();
-            const pageText = textContent.items
-                .map((item: any) => item.str)
-                .join(' ');
-
-            fullText += `--- Page ${i} ---\n${pageText}\n\n`;
-        }
-
-        return fullText;
+        const { pages } = await DocumentProcessor.getInstance().extractText(file, options);
+        return pages.map(({ page, text }) => `--- Page ${page} ---\n${text}\n\n`).join('');
     } catch (error) {
+        if (error instanceof DOMException && error.name === 'AbortError') throw error;
         console.error("Error extracting PDF text:", error);
         return ""; // Fallback to empty string (will rely on filename analysis)
     }
@@ -0,0 +1,35 @@
+/**
+ * Trailing-edge throttle for writes. schedule() keeps only the latest value
+ * and writes it at most once per intervalMs; flush() writes anything pending
+ * immediately. Writes are chained, so an older value never lands after a
+ * newer one.
+ */
+export const throttledWriter = <T>(write: (value: T) => Promise<unknown>, intervalMs: number) => {
+    let pending: { value: T } | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let last: Promise<unknown> = Promise.resolve();
+
+    const run = () => {
+        if (timer) clearTimeout(timer);
+        timer = null;
+        if (pending) {
+            const { value } = pending;
+            pending = null;
+            last = last.then(() => write(value)).catch(error => console.warn('Throttled write failed:', error));
+        }
+        return last;
+    };
+
+    return {
+        schedule(value: T) {
+            pending = { value };
+            if (!timer) timer = setTimeout(run, intervalMs);
+        },
+        flush: run,
+        cancel() {
+            if (timer) clearTimeout(timer);
+            timer = null;
+            pending = null;
+        },
+    };
+};
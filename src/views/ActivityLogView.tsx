@@ -1,5 +1,5 @@
 import React from 'react';
-import { ViewState } from '../types';
+import { ViewState, Doc, Loan } from '../types';
 import { motion } from 'framer-motion';
 import { ChevronLeft, Clock, FileText, CheckCircle2, MessageSquare, Edit3 } from 'lucide-react';
 
@@ -8,33 +8,53 @@ interface ActivityLogViewProps {
 }
 
 import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { FeedSource } from '../services/PagedQuery';
+import { parseDateTs } from '../utils/loanFields';
+import { usePagedFeed } from '../components/VirtualList';
 
-export const ActivityLogView = ({ setView }: ActivityLogViewProps) => {
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
+interface Activity {
+    id: string;
+    type: string;
+    title: string;
+    time: string;
+    timeTs: number;
+    user: string;
+    icon: typeof FileText;
+    color: string;
+}
 
-    // Synthesize activities from real data
-    const activities = [
-        ...docs.map(d => ({
+// Synthesize activities from real data: uploads newest first, loans by booking date
+const ACTIVITY_SOURCES: FeedSource<any, Activity>[] = [
+    {
+        query: { table: db.docs, orderBy: ':id', reverse: true },
+        toItem: (d: Doc) => ({
             id: `doc-${d.id}`,
             type: 'upload',
             title: `Uploaded Document: ${d.name}`,
             time: d.date,
+            timeTs: parseDateTs(d.date) ?? 0,
             user: 'You',
             icon: FileText,
             color: 'text-blue-400'
-        })),
-        ...loans.map(l => ({
+        }),
+    },
+    {
+        query: { table: db.loans, orderBy: 'dateTs', reverse: true },
+        toItem: (l: Loan) => ({
             id: `loan-${l.id}`,
             type: 'review',
             title: `Loan Review Processed: ${l.counterparty}`,
             time: l.date,
+            timeTs: l.dateTs ?? 0,
             user: 'System AI',
             icon: CheckCircle2,
             color: 'text-green-400'
-        }))
-    ].sort(() => Math.random() - 0.5); // Random sort since we don't have real timestamps for everything yet, simple fallback
+        }),
+    },
+];
+
+export const ActivityLogView = ({ setView }: ActivityLogViewProps) => {
+    const { items: activities, hasMore, loadMore } = usePagedFeed(ACTIVITY_SOURCES, activity => activity.timeTs);
 
     return (
         <motion.div
@@ -86,9 +106,11 @@ export const ActivityLogView = ({ setView }: ActivityLogViewProps) => {
                     ))}
                 </div>
 
-                <div className="flex justify-center pt-4">
-                    <button className="text-xs font-bold uppercase tracking-wider text-text-muted hover:text-white transition-colors">Load Older Activity</button>
-                </div>
+                {hasMore && (
+                    <div className="flex justify-center pt-4">
+                        <button onClick={loadMore} className="text-xs font-bold uppercase tracking-wider text-text-muted hover:text-white transition-colors">Load Older Activity</button>
+                    </div>
+                )}
             </div>
         </motion.div>
     );
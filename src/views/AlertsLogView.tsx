@@ -3,14 +3,18 @@ import { ViewState } from '../types';
 import { motion } from 'framer-motion';
 import { ChevronLeft, AlertTriangle, Info, CheckCircle2, XCircle, Filter, Search } from 'lucide-react';
 import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { usePagedQuery, VirtualList } from '../components/VirtualList';
+
+const GRID_COLUMNS = 'grid grid-cols-[130px_150px_minmax(0,1fr)_minmax(0,2fr)_100px_100px] items-center';
+const ROW_HEIGHT = 53;
 
 interface AlertsLogViewProps {
     setView: (view: ViewState) => void;
 }
 
 export const AlertsLogView = ({ setView }: AlertsLogViewProps) => {
-    const alerts = useLiveQuery(() => db.alerts.toArray()) || [];
+    // Newest first; alert times are free text ('now'), so insertion order is the timeline
+    const alerts = usePagedQuery({ table: db.alerts, orderBy: ':id', reverse: true }, []);
     return (
         <motion.div
             initial={{ opacity: 0, scale: 0.98 }}
@@ -49,46 +53,48 @@ export const AlertsLogView = ({ setView }: AlertsLogViewProps) => {
                 </div>
 
                 <div className="glass-panel rounded-2xl overflow-hidden min-h-[400px] flex flex-col">
-                    <table className="w-full text-left border-collapse">
-                        <thead className="bg-surface/50 border-b border-border text-xs uppercase text-text-muted font-bold tracking-wider">
-                            <tr>
-                                <th className="p-4">Severity</th>
-                                <th className="p-4">Timestamp</th>
-                                <th className="p-4">Event Type</th>
-                                <th className="p-4">Description</th>
-                                <th className="p-4">Source</th>
-                                <th className="p-4 text-right">Status</th>
-                            </tr>
-                        </thead>
-                        <tbody className="divide-y divide-border/50 text-sm">
-                            {alerts.length > 0 ? (
-                                alerts.map((log, i) => (
-                                    <tr key={i} className="hover:bg-surface-highlight/20 transition-colors">
-                                        <td className="p-4">
-                                            {log.type === 'critical' && <span className="flex items-center gap-2 text-red-400 font-bold"><XCircle size={16} /> Critical</span>}
-                                            {log.type === 'warning' && <span className="flex items-center gap-2 text-amber-400 font-bold"><AlertTriangle size={16} /> Warning</span>}
-                                            {log.type === 'info' && <span className="flex items-center gap-2 text-blue-400 font-bold"><Info size={16} /> Info</span>}
-                                        </td>
-                                        <td className="p-4 text-text-muted font-mono text-xs">{log.time}</td>
-                                        <td className="p-4 text-white font-medium">{log.title}</td>
-                                        <td className="p-4 text-slate-300">{log.subtitle}</td>
-                                        <td className="p-4 text-text-muted text-xs uppercase tracking-wide">System</td>
-                                        <td className="p-4 text-right">
-                                            <span className="inline-flex items-center px-2 py-0.5 rounded text-[10px] font-bold uppercase border text-green-400 border-green-500/30 bg-green-500/10">
-                                                Active
-                                            </span>
-                                        </td>
-                                    </tr>
-                                ))
+                    <div className={`${GRID_COLUMNS} bg-surface/50 border-b border-border text-xs uppercase text-text-muted font-bold tracking-wider`}>
+                        <div className="p-4">Severity</div>
+                        <div className="p-4">Timestamp</div>
+                        <div className="p-4">Event Type</div>
+                        <div className="p-4">Description</div>
+                        <div className="p-4">Source</div>
+                        <div className="p-4 text-right">Status</div>
+                    </div>
+                    {alerts.loaded && alerts.total === 0 ? (
+                        <div className="p-10 text-center text-sm text-text-muted">
+                            No alerts found in the system.
+                        </div>
+                    ) : (
+                        <VirtualList
+                            id="alerts-list"
+                            rows={alerts}
+                            rowHeight={ROW_HEIGHT}
+                            className="h-[calc(100vh-300px)] min-h-[360px] text-sm"
+                            renderRow={log => log ? (
+                                <div className={`${GRID_COLUMNS} border-b border-border/50 hover:bg-surface-highlight/20 transition-colors`} style={{ height: ROW_HEIGHT }}>
+                                    <div className="px-4">
+                                        {log.type === 'critical' && <span className="flex items-center gap-2 text-red-400 font-bold"><XCircle size={16} /> Critical</span>}
+                                        {log.type === 'warning' && <span className="flex items-center gap-2 text-amber-400 font-bold"><AlertTriangle size={16} /> Warning</span>}
+                                        {log.type === 'info' && <span className="flex items-center gap-2 text-blue-400 font-bold"><Info size={16} /> Info</span>}
+                                    </div>
+                                    <div className="px-4 text-text-muted font-mono text-xs truncate">{log.time}</div>
+                                    <div className="px-4 text-white font-medium truncate">{log.title}</div>
+                                    <div className="px-4 text-slate-300 truncate">{log.subtitle}</div>
+                                    <div className="px-4 text-text-muted text-xs uppercase tracking-wide">System</div>
+                                    <div className="px-4 text-right">
+                                        <span className="inline-flex items-center px-2 py-0.5 rounded text-[10px] font-bold uppercase border text-green-400 border-green-500/30 bg-green-500/10">
+                                            Active
+                                        </span>
+                                    </div>
+                                </div>
                             ) : (
-                                <tr>
-                                    <td colSpan={6} className="p-10 text-center text-text-muted">
-                                        No alerts found in the system.
-                                    </td>
-                                </tr>
+                                <div className="border-b border-border/50 px-4 flex items-center" style={{ height: ROW_HEIGHT }}>
+                                    <div className="h-3 w-1/3 rounded bg-surface-highlight/50 animate-pulse" />
+                                </div>
                             )}
-                        </tbody>
-                    </table>
+                        />
+                    )}
                 </div>
             </div>
         </motion.div>
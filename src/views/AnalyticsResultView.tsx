@@ -5,6 +5,7 @@ import { ChevronLeft, BarChart2, PieChart, TrendingUp, Download, Share2, Check,
 import { ResponsiveContainer, BarChart, Bar, XAxis, YAxis, Tooltip, Legend, PieChart as RePieChart, Pie, Cell } from 'recharts';
 import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableRows } from '../services/LiveStore';
 import { useActionFeedback } from '../components/ActionFeedback';
 
 interface AnalyticsResultViewProps {
@@ -17,7 +18,7 @@ export const AnalyticsResultView = ({ setView, queryId }: AnalyticsResultViewPro
     const { trigger: triggerShare, state: shareState } = useActionFeedback('Link Copied', { duration: 2000 });
     const { trigger: triggerExport, state: exportState } = useActionFeedback('Report Exported', { duration: 2000 });
 
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
+    const loans = useTableRows(db.loans) || [];
 
     // Fetch specific query if ID provided, otherwise get latest
     const selectedQuery = useLiveQuery(
@@ -50,12 +51,7 @@ export const AnalyticsResultView = ({ setView, queryId }: AnalyticsResultViewPro
     const activeLoans = filteredLoans.length > 0 ? filteredLoans : loans; // Fallback to all if filter returns empty (optional, or show 0)
 
     // 3. Calculate Stats
-    const parseAmount = (amtStr: string) => {
-        if (!amtStr) return 0;
-        return parseFloat(amtStr.replace(/[^0-9.]/g, '')) || 0;
-    };
-
-    const totalExposure = activeLoans.reduce((sum, loan) => sum + parseAmount(loan.amount), 0);
+    const totalExposure = activeLoans.reduce((sum, loan) => sum + (loan.amountMinor ?? 0), 0) / 100;
     const uniqueEntities = new Set(activeLoans.map(l => l.counterparty)).size;
 
     // Mock spread calculation based on Risk
@@ -6,6 +6,8 @@ import { toast } from 'sonner';
 import { ViewState } from '../types';
 import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableRows } from '../services/LiveStore';
+import { complianceScore, getPortfolioAggregates } from '../services/PortfolioAggregates';
 
 interface ComplianceViewProps {
     setView?: (view: ViewState) => void;
@@ -14,28 +16,20 @@ interface ComplianceViewProps {
 export const ComplianceView = ({ setView }: ComplianceViewProps) => {
     const { trigger: triggerFeedback } = useActionFeedback('Auto-Remediation');
 
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
-    const chartData = useLiveQuery(() => db.chartData.toArray()) || [];
-    const alerts = useLiveQuery(() => db.alerts.toArray()) || [];
+    const loans = useTableRows(db.loans) || [];
+    const aggregates = useLiveQuery(getPortfolioAggregates);
+    // Use Analyzed docs as "Recently Cleared" proxy for demo
+    const recentlyAnalyzed = useLiveQuery(() => db.docs.where('status').equals('Analyzed').reverse().limit(5).toArray()) || [];
+    const chartData = useTableRows(db.chartData) || [];
+    const alerts = useTableRows(db.alerts) || [];
 
     // Dynamic Compliance Score Calc
-    let calculatedScore = 100;
-    loans.forEach(l => {
-        if (l.risk === 'Critical') calculatedScore -= 15;
-        else if (l.risk === 'High') calculatedScore -= 5;
-        else if (l.risk === 'Medium') calculatedScore -= 1;
-    });
-    calculatedScore = Math.max(0, calculatedScore);
+    const calculatedScore = aggregates ? complianceScore(aggregates) : 100;
 
     const currentScore = calculatedScore;
     const previousScore = 100;
     const scoreTrend = currentScore - previousScore;
 
-    const criticalIssuesCount = loans.filter(l => l.risk === 'Critical').length + alerts.filter(a => a.type === 'critical').length;
-    const pendingReviewsCount = docs.filter(d => d.status === 'Review' || d.status === 'Pending').length;
-    const analyzedCount = docs.filter(d => d.status === 'Analyzed').length;
-
     const criticalDbAlerts = alerts.filter(a => a.type === 'critical');
 
     // Generate dynamic violations from loan data
@@ -85,10 +79,11 @@ export const ComplianceView = ({ setView }: ComplianceViewProps) => {
     // Combine database alerts with dynamic violations
     const criticalAlerts = [...criticalDbAlerts, ...loanViolations].slice(0, 8);
 
-    // Use Analyzed docs as "Recently Cleared" proxy for demo
-    const recentlyAnalyzed = docs.filter(d => d.status === 'Analyzed').sort((a, b) => b.id! - a.id!).slice(0, 5);
+    const criticalIssuesCount = (aggregates?.riskCounts.Critical ?? 0) + criticalDbAlerts.length;
+    const pendingReviewsCount = (aggregates?.docStatusCounts.Review ?? 0) + (aggregates?.docStatusCounts.Pending ?? 0);
+    const analyzedCount = aggregates?.docStatusCounts.Analyzed ?? 0;
 
-    if (loans.length === 0 && docs.length === 0) {
+    if (aggregates && aggregates.loanCount === 0 && aggregates.docCount === 0) {
         return (
             <div className="flex-1 overflow-y-auto p-4 lg:p-8 pt-2 custom-scrollbar bg-pattern">
                 <div className="mx-auto max-w-[1600px] flex flex-col items-center justify-center h-full text-center py-20">
@@ -25,9 +25,14 @@ import { RiskHeatmap } from '../components/RiskHeatmap';
 import { useActionFeedback } from '../components/ActionFeedback';
 import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableRows } from '../services/LiveStore';
+import { complianceScore, getPortfolioAggregates } from '../services/PortfolioAggregates';
 
 import { ViewState } from '../types';
 
+// Loans listed in the Attention Required table
+const ATTENTION_ROWS = 10;
+
 interface DashboardViewProps {
     setView?: (view: ViewState) => void;
 }
@@ -35,17 +40,21 @@ interface DashboardViewProps {
 export const DashboardView = ({ setView }: DashboardViewProps) => {
     const { trigger: triggerExport } = useActionFeedback('Export Data');
 
-    const chartData = useLiveQuery(() => db.chartData.toArray()) || [];
-    const loansData = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
-    const dbAlerts = useLiveQuery(() => db.alerts.toArray()) || [];
+    const chartData = useTableRows(db.chartData) || [];
+    // Bounded index reads; the heatmap's counts come from the aggregates
+    const attentionLoans = useLiveQuery(() => db.loans.orderBy(':id').limit(ATTENTION_ROWS).toArray()) || [];
+    const criticalLoans = useLiveQuery(() => db.loans.where('risk').equals('Critical').limit(5).toArray()) || [];
+    const highRiskLoans = useLiveQuery(() => db.loans.where('risk').equals('High').limit(1).toArray()) || [];
+    const docsNeedingReview = useLiveQuery(() => db.docs.where('status').anyOf('Review', 'Pending').limit(2).toArray()) || [];
+    const aggregates = useLiveQuery(getPortfolioAggregates);
+    const dbAlerts = useTableRows(db.alerts) || [];
 
     // Generate dynamic alerts from loan data
     const dynamicAlerts = React.useMemo(() => {
         const generated: Array<{ title: string; time: string; subtitle: string; type: 'critical' | 'warning' | 'info' }> = [];
 
         // Check for critical risk loans
-        loansData.filter(l => l.risk === 'Critical').forEach((loan, idx) => {
+        criticalLoans.forEach((loan, idx) => {
             generated.push({
                 title: 'Critical Risk Detected',
                 time: `${idx + 1}m`,
@@ -55,7 +64,7 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
         });
 
         // Check for pending review documents
-        docs.filter(d => d.status === 'Review' || d.status === 'Pending').slice(0, 2).forEach((doc, idx) => {
+        docsNeedingReview.forEach((doc, idx) => {
             generated.push({
                 title: 'Doc Needs Review',
                 time: `${(idx + 1) * 15}m`,
@@ -65,7 +74,7 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
         });
 
         // Check for high risk loans
-        loansData.filter(l => l.risk === 'High').slice(0, 1).forEach(loan => {
+        highRiskLoans.forEach(loan => {
             generated.push({
                 title: 'High Risk Alert',
                 time: '1h',
@@ -75,15 +84,16 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
         });
 
         return generated;
-    }, [loansData, docs]);
+    }, [criticalLoans, highRiskLoans, docsNeedingReview]);
 
     // Combine DB alerts with dynamic alerts
     const alerts = [...dbAlerts, ...dynamicAlerts].slice(0, 5);
 
     // Run diagnostics - creates new alert based on analysis
     const runDiagnostics = async () => {
-        const criticalCount = loansData.filter(l => l.risk === 'Critical').length;
-        const pendingDocs = docs.filter(d => d.status !== 'Analyzed').length;
+        const summary = await getPortfolioAggregates();
+        const criticalCount = summary.riskCounts.Critical ?? 0;
+        const pendingDocs = summary.docCount - (summary.docStatusCounts.Analyzed ?? 0);
 
         if (criticalCount > 0 || pendingDocs > 0) {
             await db.alerts.add({
@@ -102,20 +112,14 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
         }
     };
 
-    // Calculate real stats
-    const activeLoansCount = loansData.length;
-    const criticalRisksCount = loansData.filter(l => l.risk === 'Critical').length;
-    const pendingApprovalsCount = docs.filter(d => d.status === 'Review' || d.status === 'Pending').length;
+    // Real stats, read from the maintained portfolio counters
+    const activeLoansCount = aggregates?.loanCount ?? 0;
+    const criticalRisksCount = aggregates?.riskCounts.Critical ?? 0;
+    const pendingApprovalsCount = (aggregates?.docStatusCounts.Review ?? 0) + (aggregates?.docStatusCounts.Pending ?? 0);
 
     // Dynamic Compliance Score Calc
     // Start at 100. Deduct points for risks.
-    let calculatedScore = 100;
-    loansData.forEach(l => {
-        if (l.risk === 'Critical') calculatedScore -= 15;
-        else if (l.risk === 'High') calculatedScore -= 5;
-        else if (l.risk === 'Medium') calculatedScore -= 1;
-    });
-    calculatedScore = Math.max(0, calculatedScore);
+    const calculatedScore = aggregates ? complianceScore(aggregates) : 100;
 
     // Use calculated score if chartData is empty, otherwise use DB trend logic (if we were logging history)
     // Since we cleared mock history, we just show current score.
@@ -358,7 +362,7 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
                                     </tr>
                                 </thead>
                                 <tbody className="divide-y divide-border text-white">
-                                    {loansData.map((loan) => {
+                                    {attentionLoans.map((loan) => {
                                         const initial = loan.counterparty ? loan.counterparty.charAt(0).toUpperCase() : '?';
                                         const initialColor = getInitialColor(loan.counterparty || '');
                                         const riskColor = getRiskColor(loan.risk);
@@ -399,7 +403,7 @@ export const DashboardView = ({ setView }: DashboardViewProps) => {
 
                     {/* Risk Heatmap */}
                     <div className="lg:col-span-1 glass-panel rounded-2xl p-6">
-                        <RiskHeatmap loans={loansData} />
+                        <RiskHeatmap counts={aggregates?.riskCounts ?? {}} />
                     </div>
                 </div>
 
@@ -1,12 +1,13 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { ViewState } from '../types';
 import { toast } from 'sonner';
 import { motion } from 'framer-motion';
-import { ChevronLeft, Download, Eye, FileText, Info, Share2, Printer, Search, CheckCircle, Loader2 } from 'lucide-react';
+import { ChevronLeft, Download, Eye, FileText, Info, Share2, Printer, Search, CheckCircle, Loader2, X } from 'lucide-react';
 import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
 import { Document, Page, pdfjs } from 'react-pdf';
-import { analyzeDocument } from '../services/DocumentAnalyzer';
+import { AnalysisProgress, AnalysisService, isAbortError } from '../services/AnalysisService';
+import { getBlob } from '../services/BlobStore';
 
 // Configure PDF worker
 pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`;
@@ -19,26 +20,44 @@ interface DocumentDetailViewProps {
 
 export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDetailViewProps) => {
     const [numPages, setNumPages] = useState<number | null>(null);
+    const [fileData, setFileData] = useState<Blob | null>(null);
     const [fileUrl, setFileUrl] = useState<string | null>(null);
     const [isAnalyzing, setIsAnalyzing] = useState(false);
+    const [analysisProgress, setAnalysisProgress] = useState<AnalysisProgress | null>(null);
+    const analysisAbort = useRef<AbortController | null>(null);
 
     const doc = useLiveQuery(() => docId ? db.docs.get(docId) : Promise.resolve(undefined), [docId]);
 
+    // The file's bytes are only read here, not with the doc record
     useEffect(() => {
-        if (doc?.fileData) {
-            const url = URL.createObjectURL(doc.fileData);
+        setFileData(null);
+        if (!doc?.contentHash) return;
+        let current = true;
+        getBlob(doc.contentHash)
+            .then(blob => { if (current && blob) setFileData(blob); })
+            .catch(error => console.error('Failed to load document file:', error));
+        return () => { current = false; };
+    }, [doc?.contentHash]);
+
+    useEffect(() => {
+        setFileUrl(null);
+        if (fileData) {
+            const url = URL.createObjectURL(fileData);
             setFileUrl(url);
             return () => URL.revokeObjectURL(url);
         }
-    }, [doc?.fileData]);
+    }, [fileData]);
+
+    // Stop any running analysis when leaving the document
+    useEffect(() => () => analysisAbort.current?.abort(), [docId]);
 
     const onDocumentLoadSuccess = ({ numPages }: { numPages: number }) => {
         setNumPages(numPages);
     };
 
     const handleDownload = () => {
-        if (doc?.fileData) {
-            const url = URL.createObjectURL(doc.fileData);
+        if (doc && fileData) {
+            const url = URL.createObjectURL(fileData);
             const a = document.createElement('a');
             a.href = url;
             a.download = doc.name;
@@ -54,10 +73,15 @@ export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDet
         }
     };
 
+    const handleCancelAnalysis = () => {
+        analysisAbort.current?.abort();
+    };
+
     const handleGoToAnalysis = async () => {
-        if (!doc || !onSelectLoan) return;
+        if (!doc || !onSelectLoan || isAnalyzing) return;
 
         setIsAnalyzing(true);
+        setAnalysisProgress(null);
         toast.info('Analyzing document...', { description: 'Extracting clauses and events of default' });
 
         const loanIdRaw = `LN-${new Date().getFullYear()}-${doc.id || Math.floor(Math.random() * 1000)}`;
@@ -75,17 +99,31 @@ export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDet
                 riskFlags: [] as string[],
             };
 
-            if (doc.fileData && doc.type === 'PDF') {
+            if (fileData && doc.type === 'PDF') {
+                const controller = new AbortController();
+                analysisAbort.current = controller;
                 try {
-                    extractedData = await analyzeDocument(doc.fileData);
+                    // Runs in a worker; findings stream in as each page is parsed, then scanned pages are OCRed
+                    extractedData = await AnalysisService.getInstance().analyze(fileData, {
+                        onProgress: setAnalysisProgress,
+                        signal: controller.signal,
+                    });
 
                     // Update document with extracted entities
                     if (extractedData.entities.length > 0) {
                         await db.docs.update(doc.id!, { entities: extractedData.entities });
                     }
                 } catch (error) {
+                    if (isAbortError(error)) {
+                        toast.info('Analysis cancelled');
+                        setIsAnalyzing(false);
+                        setAnalysisProgress(null);
+                        return;
+                    }
                     console.error('Document analysis failed:', error);
                     toast.error('Analysis partially failed', { description: 'Using default values for some fields' });
+                } finally {
+                    analysisAbort.current = null;
                 }
             }
 
@@ -148,6 +186,7 @@ export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDet
         }
 
         setIsAnalyzing(false);
+        setAnalysisProgress(null);
         onSelectLoan(loanId);
         setView('loan_review');
     };
@@ -185,11 +224,24 @@ export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDet
                         <Download size={18} />
                     </button>
                     <div className="h-6 w-px bg-border mx-2"></div>
+                    {isAnalyzing && analysisProgress && (
+                        <button
+                            onClick={handleCancelAnalysis}
+                            className="flex items-center gap-1 px-3 py-2 rounded-lg border border-border text-xs text-text-muted hover:text-white hover:bg-white/5 transition-colors"
+                        >
+                            <X size={14} /> Cancel
+                        </button>
+                    )}
                     <button
                         onClick={handleGoToAnalysis}
-                        className="px-4 py-2 bg-primary text-black text-xs font-bold rounded-lg hover:bg-primary-hover shadow-glow transition-all"
+                        disabled={isAnalyzing}
+                        className="flex items-center gap-2 px-4 py-2 bg-primary text-black text-xs font-bold rounded-lg hover:bg-primary-hover shadow-glow transition-all disabled:opacity-70 disabled:cursor-wait"
                     >
-                        Go to Analysis
+                        {isAnalyzing && <Loader2 size={14} className="animate-spin" />}
+                        {isAnalyzing
+                            ? analysisProgress?.ocr ? `Reading scanned page ${analysisProgress.ocr.done} of ${analysisProgress.ocr.total}`
+                                : analysisProgress ? `Analyzing page ${analysisProgress.page} of ${analysisProgress.numPages}` : 'Analyzing...'
+                            : 'Go to Analysis'}
                     </button>
                 </div>
             </header>
@@ -239,6 +291,34 @@ export const DocumentDetailView = ({ setView, docId, onSelectLoan }: DocumentDet
                         </h3>
                     </div>
                     <div className="p-4 space-y-6 flex-1 overflow-y-auto">
+                        {analysisProgress && (
+                            <div id="doc-live-findings" className="space-y-2">
+                                <p className="text-xs font-bold text-text-muted uppercase">Live Findings</p>
+                                <div className="h-1 rounded bg-surface-highlight overflow-hidden">
+                                    <div
+                                        className="h-full bg-primary transition-all"
+                                        style={{ width: `${(analysisProgress.ocr ? analysisProgress.ocr.done / analysisProgress.ocr.total : analysisProgress.page / analysisProgress.numPages) * 100}%` }}
+                                    />
+                                </div>
+                                <div className="grid grid-cols-2 gap-2 text-xs">
+                                    <span className="text-text-muted">Events of default</span>
+                                    <span className="text-white font-mono text-right">{analysisProgress.partial.eventsOfDefault.length}</span>
+                                    <span className="text-text-muted">Covenants</span>
+                                    <span className="text-white font-mono text-right">{analysisProgress.partial.financialCovenants.length}</span>
+                                    <span className="text-text-muted">Critical dates</span>
+                                    <span className="text-white font-mono text-right">{analysisProgress.partial.criticalDates.length}</span>
+                                    <span className="text-text-muted">Entities</span>
+                                    <span className="text-white font-mono text-right">{analysisProgress.partial.entities.length}</span>
+                                </div>
+                                <div className="flex flex-wrap gap-1.5">
+                                    {analysisProgress.partial.eventsOfDefault.map(event => (
+                                        <span key={event.type} className="px-2 py-0.5 rounded bg-accent-orange/10 border border-accent-orange/20 text-[10px] text-accent-orange">
+                                            {event.type}
+                                        </span>
+                                    ))}
+                                </div>
+                            </div>
+                        )}
                         <div className="space-y-2">
                             <p className="text-xs font-bold text-text-muted uppercase">Status</p>
                             <div id="doc-status-badge" className="flex flex-col gap-2">
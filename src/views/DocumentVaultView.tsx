@@ -4,24 +4,37 @@ import { db } from '../db';
 import { toast } from 'sonner';
 import { ViewState, Doc } from '../types';
 import { exportToCSV } from '../utils/exportUtils';
+import { deleteDocWithBlob } from '../services/BlobStore';
+import { getPortfolioAggregates } from '../services/PortfolioAggregates';
+import { PageQuery, toCollection } from '../services/PagedQuery';
+import { usePagedQuery, VirtualList } from '../components/VirtualList';
+import { useLiveQuery } from 'dexie-react-hooks';
+
+const GRID_COLUMNS = 'grid grid-cols-[72px_minmax(0,3fr)_140px_160px_110px_120px] items-center';
+const ROW_HEIGHT = 69;
 
 interface DocumentVaultViewProps {
     setView: (v: ViewState) => void;
-    docs: Doc[];
     onSelectDoc: (id: number) => void;
 }
 
-export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultViewProps) => {
+export const DocumentVaultView = ({ setView, onSelectDoc }: DocumentVaultViewProps) => {
     const [searchTerm, setSearchTerm] = useState('');
     const [typeFilter, setTypeFilter] = useState('All');
     const [showFilters, setShowFilters] = useState(false);
 
-    // Filter Logic
-    const filteredDocs = docs.filter(doc => {
-        const matchesSearch = doc.name.toLowerCase().includes(searchTerm.toLowerCase());
-        const matchesType = typeFilter === 'All' || doc.type === typeFilter;
-        return matchesSearch && matchesType;
-    });
+    const aggregates = useLiveQuery(getPortfolioAggregates);
+
+    // Filter Logic: newest uploads first, type through its index
+    const term = searchTerm.toLowerCase();
+    const query: PageQuery<Doc> = {
+        table: db.docs,
+        orderBy: ':id',
+        reverse: true,
+        where: typeFilter === 'All' ? undefined : { index: 'type', anyOf: [typeFilter] },
+        match: term ? doc => doc.name.toLowerCase().includes(term) : undefined,
+    };
+    const docs = usePagedQuery(query, [typeFilter, term]);
 
     const handleDocClick = (doc: Doc) => {
         if (doc.id) {
@@ -35,7 +48,7 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
         if (!id) return;
         if (confirm('Are you sure you want to delete this document from the vault?')) {
             try {
-                await db.docs.delete(id);
+                await deleteDocWithBlob(id);
                 toast.success('Document deleted successfully');
             } catch (error) {
                 console.error("Failed to delete doc:", error);
@@ -44,7 +57,8 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
         }
     };
 
-    const handleExport = () => {
+    const handleExport = async () => {
+        const filteredDocs = await toCollection(query).toArray();
         if (filteredDocs.length === 0) {
             toast.error('No documents to export');
             return;
@@ -81,12 +95,12 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                     </button>
                 </div>
 
-                {/* Stats - Using GLOBAL docs size as metrics typically reflect total system state */}
+                {/* Stats - Global, from the portfolio counters, as metrics typically reflect total system state */}
                 <div id="vault-stats" className="grid grid-cols-1 sm:grid-cols-3 gap-5">
                     <div className="glass-panel rounded-2xl p-5 flex items-center justify-between">
                         <div>
                             <p className="text-sm font-medium text-text-muted">Total Documents</p>
-                            <h3 className="text-2xl font-display font-bold text-white mt-1">{docs.length}</h3>
+                            <h3 className="text-2xl font-display font-bold text-white mt-1">{aggregates?.docCount ?? 0}</h3>
                         </div>
                         <div className="h-10 w-10 rounded-xl bg-primary/10 text-primary flex items-center justify-center">
                             <Files size={20} />
@@ -95,7 +109,7 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                     <div className="glass-panel rounded-2xl p-5 flex items-center justify-between">
                         <div>
                             <p className="text-sm font-medium text-text-muted">Analyzed this week</p>
-                            <h3 className="text-2xl font-display font-bold text-white mt-1">{docs.filter(d => d.status === 'Analyzed').length}</h3>
+                            <h3 className="text-2xl font-display font-bold text-white mt-1">{aggregates?.docStatusCounts.Analyzed ?? 0}</h3>
                         </div>
                         <div className="h-10 w-10 rounded-xl bg-surface-highlight text-text-muted flex items-center justify-center">
                             <TrendingUp size={20} />
@@ -105,7 +119,7 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                         <div>
                             <p className="text-sm font-medium text-text-muted">Storage Used</p>
                             <h3 className="text-2xl font-display font-bold text-white mt-1">
-                                {(docs.reduce((acc, doc) => acc + parseFloat(doc.size), 0)).toFixed(1)} MB
+                                {((aggregates?.docSizeKb ?? 0) / 1024).toFixed(1)} MB
                             </h3>
                         </div>
                         <div className="h-10 w-10 rounded-xl bg-surface-highlight text-text-muted flex items-center justify-center">
@@ -175,7 +189,7 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                     </div>
 
                     <div className="overflow-x-auto flex-1 flex flex-col">
-                        {docs.length === 0 ? (
+                        {aggregates && aggregates.docCount === 0 ? (
                             <div className="flex-1 flex flex-col items-center justify-center text-center p-10 space-y-4">
                                 <div className="w-20 h-20 rounded-full bg-surface-highlight flex items-center justify-center mb-2">
                                     <Inbox size={40} className="text-text-muted opacity-50" />
@@ -195,39 +209,41 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                                 </button>
                             </div>
                         ) : (
-                            <table className="w-full text-left text-sm">
-                                <thead className="bg-surface text-xs uppercase text-text-muted font-semibold tracking-wider border-b border-border">
-                                    <tr>
-                                        <th className="px-6 py-4 w-12"></th>
-                                        <th className="px-6 py-4">Name</th>
-                                        <th className="px-6 py-4">Status</th>
-                                        <th className="px-6 py-4">Date Uploaded</th>
-                                        <th className="px-6 py-4">Size</th>
-                                        <th className="px-6 py-4 text-right">Action</th>
-                                    </tr>
-                                </thead>
-                                <tbody className="divide-y divide-border text-white">
-                                    {filteredDocs.map((doc, idx) => (
-                                        <tr
-                                            key={doc.id || idx}
+                            <div className="min-w-[800px] flex-1 flex flex-col text-sm">
+                                <div className={`${GRID_COLUMNS} bg-surface text-xs uppercase text-text-muted font-semibold tracking-wider border-b border-border`}>
+                                    <div className="px-6 py-4"></div>
+                                    <div className="px-6 py-4">Name</div>
+                                    <div className="px-6 py-4">Status</div>
+                                    <div className="px-6 py-4">Date Uploaded</div>
+                                    <div className="px-6 py-4">Size</div>
+                                    <div className="px-6 py-4 text-right">Action</div>
+                                </div>
+                                <VirtualList
+                                    id="document-list"
+                                    rows={docs}
+                                    rowHeight={ROW_HEIGHT}
+                                    className="h-[calc(100vh-480px)] min-h-[400px] text-white"
+                                    renderRow={doc => doc ? (
+                                        <div
                                             onClick={() => handleDocClick(doc)}
-                                            className="hover:bg-surface-highlight/40 transition-colors group cursor-pointer"
+                                            className={`${GRID_COLUMNS} border-b border-border hover:bg-surface-highlight/40 transition-colors group cursor-pointer`}
+                                            style={{ height: ROW_HEIGHT }}
                                         >
-                                            <td className="px-6 py-4 text-text-muted">
+                                            <div className="px-6 text-text-muted">
                                                 {doc.type === 'PDF' ? <FileText size={20} /> : <FileIcon size={20} />}
-                                            </td>
-                                            <td className="px-6 py-4 font-medium">{doc.name}</td>
-                                            <td className="px-6 py-4">
+                                            </div>
+                                            <div className="px-6 font-medium truncate">{doc.name}</div>
+                                            <div className="px-6">
                                                 <span className={`inline-flex items-center gap-1.5 rounded px-2 py-1 text-[10px] font-bold uppercase border tracking-wider
                           ${doc.status === 'Analyzed' ? 'text-primary bg-primary/10 border-primary/20' :
                                                         doc.status === 'Review' ? 'text-accent-orange bg-accent-orange/10 border-accent-orange/20' :
                                                             'text-text-muted bg-surface-highlight border-border'}`}>
                                                     {doc.status}
                                                 </span>
-                                            </td>
-                                            <td className="px-6 py-4 text-text-muted text-xs">{doc.date}</td>
-                                            <td className="px-6 py-4 text-text-muted text-xs font-mono">{doc.size}</td>
-                                            <td className="px-6 py-4 text-right flex items-center justify-end gap-2">
+                                            </div>
+                                            <div className="px-6 text-text-muted text-xs">{doc.date}</div>
+                                            <div className="px-6 text-text-muted text-xs font-mono">{doc.size}</div>
+                                            <div className="px-6 flex items-center justify-end gap-2">
                                                 <button
                                                     onClick={(e) => handleDeleteDoc(e, doc.id)}
                                                     className="p-2 rounded hover:bg-white/10 text-text-muted hover:text-red-500 transition-colors"
@@ -241,11 +257,15 @@ export const DocumentVaultView = ({ setView, docs, onSelectDoc }: DocumentVaultV
                                                 >
                                                     <ChevronRight size={20} />
                                                 </button>
-                                            </td>
-                                        </tr>
-                                    ))}
-                                </tbody>
-                            </table>
+                                            </div>
+                                        </div>
+                                    ) : (
+                                        <div className="border-b border-border px-6 flex items-center" style={{ height: ROW_HEIGHT }}>
+                                            <div className="h-3 w-1/3 rounded bg-surface-highlight/50 animate-pulse" />
+                                        </div>
+                                    )}
+                                />
+                            </div>
                         )}
                     </div>
                 </div>
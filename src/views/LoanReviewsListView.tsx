@@ -12,13 +12,32 @@ import {
     FileText,
     ArrowUpRight,
     Inbox,
-    Trash2
+    Trash2,
+    ArrowUp,
+    ArrowDown
 } from 'lucide-react';
 import { toast } from 'sonner';
-import { ViewState } from '../types';
+import { ViewState, Loan } from '../types';
 import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 import { exportToCSV } from '../utils/exportUtils';
+import { getPortfolioAggregates } from '../services/PortfolioAggregates';
+import { PageQuery, toCollection } from '../services/PagedQuery';
+import { usePagedQuery, VirtualList } from '../components/VirtualList';
+
+// Sortable columns, by the loans index each one sorts on
+const COLUMNS = [
+    { label: 'Loan ID', index: 'id' },
+    { label: 'Counterparty', index: 'counterparty' },
+    { label: 'Amount', index: 'amountMinor', align: 'justify-end' },
+    { label: 'Type', index: 'type' },
+    { label: 'Date', index: 'dateTs' },
+    { label: 'Status', index: 'status' },
+];
+
+const GRID_COLUMNS = 'grid grid-cols-[150px_minmax(0,2fr)_120px_minmax(0,1fr)_130px_140px_140px] items-center';
+const ROW_HEIGHT = 73;
 
 interface LoanReviewsListViewProps {
     setView?: (view: ViewState) => void;
@@ -29,20 +48,27 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
     const [searchTerm, setSearchTerm] = useState('');
     const [statusFilter, setStatusFilter] = useState('All');
     const [showFilters, setShowFilters] = useState(false);
+    const [sort, setSort] = useState({ index: 'id', reverse: false });
 
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const user = useLiveQuery(() => db.users.toArray())?.[0];
+    const user = useTableQuery(db.users, users => users[0]);
+    const aggregates = useLiveQuery(getPortfolioAggregates);
 
-    // Filter Logic
-    const filteredLoans = loans.filter(loan => {
-        const matchesSearch =
-            loan.counterparty.toLowerCase().includes(searchTerm.toLowerCase()) ||
-            loan.id.toLowerCase().includes(searchTerm.toLowerCase());
-
-        const matchesStatus = statusFilter === 'All' || loan.status === statusFilter;
+    // Filter Logic: status through its index, search while scanning the page
+    const term = searchTerm.toLowerCase();
+    const query: PageQuery<Loan> = {
+        table: db.loans,
+        orderBy: sort.index,
+        reverse: sort.reverse,
+        where: statusFilter === 'All' ? undefined : { index: 'status', anyOf: [statusFilter] },
+        match: term ? loan =>
+            loan.counterparty.toLowerCase().includes(term) ||
+            loan.id.toLowerCase().includes(term) : undefined,
+    };
+    const loans = usePagedQuery(query, [sort.index, sort.reverse, statusFilter, term]);
 
-        return matchesSearch && matchesStatus;
-    });
+    const toggleSort = (index: string) => {
+        setSort(prev => ({ index, reverse: prev.index === index ? !prev.reverse : false }));
+    };
 
     const handleLoanClick = (loanId: string) => {
         if (onSelectLoan) onSelectLoan(loanId);
@@ -62,7 +88,8 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
         }
     };
 
-    const handleExport = () => {
+    const handleExport = async () => {
+        const filteredLoans = await toCollection(query).toArray();
         if (filteredLoans.length === 0) {
             toast.error('No loans to export');
             return;
@@ -82,11 +109,10 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
         toast.success('Export started');
     };
 
-    // Calculate stats based on FILTERED data for responsiveness
-    // (Or keep global? Usually stats reflect global portfolio, but list reflects filter. Let's keep stats global for high-level view)
-    const totalReviews = loans.length;
-    const pendingAction = loans.filter(l => l.status === 'Pending' || l.status === 'In Review').length;
-    const criticalRisks = loans.filter(l => l.risk === 'Critical').length;
+    // Stats stay global for a high-level view, read from the portfolio counters
+    const totalReviews = aggregates?.loanCount ?? 0;
+    const pendingAction = (aggregates?.statusCounts.Pending ?? 0) + (aggregates?.statusCounts['In Review'] ?? 0);
+    const criticalRisks = aggregates?.riskCounts.Critical ?? 0;
 
     // Status color mapping
     const getStatusColor = (status: string) => {
@@ -99,7 +125,7 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
         }
     };
 
-    if (loans.length === 0) {
+    if (aggregates && aggregates.loanCount === 0) {
         return (
             <div className="flex-1 overflow-y-auto p-4 lg:p-8 pt-2 custom-scrollbar">
                 <div className="mx-auto max-w-[1600px] flex flex-col gap-8 h-full">
@@ -219,44 +245,50 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
                 {/* Main List */}
                 <div className="glass-panel rounded-2xl overflow-hidden border border-border flex flex-col">
                     <div className="overflow-x-auto">
-                        <table className="w-full text-left border-collapse">
-                            <thead>
-                                <tr className="bg-surface/50 border-b border-border">
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider">Loan ID</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider">Counterparty</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider text-right">Amount</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider">Type</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider">Date</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider">Status</th>
-                                    <th className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider text-right">Actions</th>
-                                </tr>
-                            </thead>
-                            <tbody className="divide-y divide-border">
-                                {filteredLoans.map((loan, i) => (
-                                    <tr
-                                        key={loan.id || i}
-                                        className="hover:bg-surface-highlight/30 transition-colors group cursor-pointer"
+                        <div className="min-w-[1000px]">
+                            <div className={`${GRID_COLUMNS} bg-surface/50 border-b border-border`}>
+                                {COLUMNS.map(column => (
+                                    <button
+                                        key={column.index}
+                                        onClick={() => toggleSort(column.index)}
+                                        className={`p-5 flex items-center gap-1 ${column.align ?? ''} text-[11px] font-mono font-bold uppercase tracking-wider transition-colors ${sort.index === column.index ? 'text-white' : 'text-text-muted hover:text-white'}`}
+                                    >
+                                        {column.label}
+                                        {sort.index === column.index && (sort.reverse ? <ArrowDown size={12} /> : <ArrowUp size={12} />)}
+                                    </button>
+                                ))}
+                                <div className="p-5 text-[11px] font-mono font-bold text-text-muted uppercase tracking-wider text-right">Actions</div>
+                            </div>
+                            <VirtualList
+                                id="loan-list"
+                                rows={loans}
+                                rowHeight={ROW_HEIGHT}
+                                className="h-[calc(100vh-420px)] min-h-[360px]"
+                                renderRow={loan => loan ? (
+                                    <div
+                                        className={`${GRID_COLUMNS} border-b border-border hover:bg-surface-highlight/30 transition-colors group cursor-pointer`}
+                                        style={{ height: ROW_HEIGHT }}
                                         onClick={() => handleLoanClick(loan.id)}
                                     >
-                                        <td className="p-5 font-mono text-sm text-primary group-hover:underline">{loan.id}</td>
-                                        <td className="p-5">
+                                        <div className="px-5 font-mono text-sm text-primary group-hover:underline truncate">{loan.id}</div>
+                                        <div className="px-5">
                                             <div className="flex items-center gap-3">
-                                                <div className="size-8 rounded bg-surface-highlight flex items-center justify-center text-xs font-bold text-white">
+                                                <div className="size-8 shrink-0 rounded bg-surface-highlight flex items-center justify-center text-xs font-bold text-white">
                                                     {loan.counterparty.substring(0, 2).toUpperCase()}
                                                 </div>
-                                                <span className="text-sm font-medium text-white">{loan.counterparty}</span>
+                                                <span className="text-sm font-medium text-white truncate">{loan.counterparty}</span>
                                             </div>
-                                        </td>
-                                        <td className="p-5 text-sm font-mono text-white text-right">{loan.amount}</td>
-                                        <td className="p-5 text-sm text-text-muted">{loan.type}</td>
-                                        <td className="p-5 text-sm text-text-muted font-mono">{loan.date}</td>
-                                        <td className="p-5">
+                                        </div>
+                                        <div className="px-5 text-sm font-mono text-white text-right">{loan.amount}</div>
+                                        <div className="px-5 text-sm text-text-muted truncate">{loan.type}</div>
+                                        <div className="px-5 text-sm text-text-muted font-mono">{loan.date}</div>
+                                        <div className="px-5">
                                             <span className={`inline-flex items-center gap-1.5 px-2.5 py-1 rounded-md text-xs font-bold border ${getStatusColor(loan.status)}`}>
                                                 <span className="size-1.5 rounded-full bg-current"></span>
                                                 {loan.status}
                                             </span>
-                                        </td>
-                                        <td className="p-5 text-right">
+                                        </div>
+                                        <div className="px-5 text-right">
                                             <div className="flex items-center justify-end gap-2 opacity-0 group-hover:opacity-100 transition-opacity">
                                                 <button className="p-2 rounded hover:bg-white/10 text-white transition-colors" title="View Details">
                                                     <ArrowUpRight size={16} />
@@ -272,17 +304,21 @@ export const LoanReviewsListView = ({ setView, onSelectLoan }: LoanReviewsListVi
                                                     <MoreHorizontal size={16} />
                                                 </button>
                                             </div>
-                                        </td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
+                                        </div>
+                                    </div>
+                                ) : (
+                                    <div className="border-b border-border px-5 flex items-center" style={{ height: ROW_HEIGHT }}>
+                                        <div className="h-3 w-1/3 rounded bg-surface-highlight/50 animate-pulse" />
+                                    </div>
+                                )}
+                            />
+                        </div>
                     </div>
-                    {/* Simplified load more */}
+                    {/* Row count for the current filter */}
                     <div className="p-4 border-t border-border flex justify-center bg-surface/30">
-                        <button className="text-xs font-mono font-bold text-text-muted hover:text-white transition-colors flex items-center gap-2">
-                            End of List
-                        </button>
+                        <span className="text-xs font-mono font-bold text-text-muted flex items-center gap-2">
+                            {loans.loaded ? `${loans.total.toLocaleString()} loan${loans.total === 1 ? '' : 's'}` : 'Loading...'}
+                        </span>
                     </div>
                 </div>
             </div>
@@ -1,7 +1,9 @@
 import React from 'react';
 import { Bell, Info, AlertTriangle, CheckCheck, Clock, FileText, XCircle } from 'lucide-react';
-import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { db, Notification } from '../db';
+import { Alert, Doc, Loan } from '../types';
+import { FeedSource } from '../services/PagedQuery';
+import { usePagedFeed } from '../components/VirtualList';
 // Helper for relative time since date-fns might not be installed
 
 const getRelativeTime = (dateString: string) => {
@@ -21,16 +23,25 @@ const getRelativeTime = (dateString: string) => {
     }
 };
 
-export const NotificationsView = () => {
-    // Fetch all sources of "events"
-    const systemNotifications = useLiveQuery(() => db.notifications.toArray()) || [];
-    const alerts = useLiveQuery(() => db.alerts.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
+interface FeedItem {
+    id: string;
+    title: string;
+    desc: string;
+    type: string;
+    time: string;
+    rawTime: number;
+    read: boolean;
+}
 
-    // Synthesize into a unified list
-    const unifiedNotifications = [
-        ...systemNotifications.map(n => ({
+// Every source of "events", each read newest first off an index and merged
+// into a unified list by time. The merge assumes every source comes in the
+// order of the time it is merged on, so each is read off the index holding
+// that time.
+const NOTIFICATION_SOURCES: FeedSource<any, FeedItem>[] = [
+    {
+        // ISO 8601 timestamps sort as strings in time order
+        query: { table: db.notifications, orderBy: 'timestamp', reverse: true },
+        toItem: (n: Notification) => ({
             id: `sys-${n.id}`,
             title: n.title,
             desc: n.message,
@@ -38,42 +49,52 @@ export const NotificationsView = () => {
             time: n.timestamp,
             rawTime: new Date(n.timestamp).getTime(),
             read: n.read
-        })),
-        ...alerts.map(a => ({
+        }),
+    },
+    {
+        // Alert times may be free text ('now'); createdAt is set when they're written
+        query: { table: db.alerts, orderBy: 'createdAt', reverse: true },
+        toItem: (a: Alert) => ({
             id: `alert-${a.id}`,
             title: a.title,
             desc: a.subtitle,
             type: a.type === 'critical' ? 'alert' : a.type === 'warning' ? 'warning' : 'info',
-            time: a.time,
-            rawTime: new Date(a.time).getTime() || 0, // Fallback if time string is just "2h ago" (mock data might have this) - wait, real data from verify scripts usually has timestamps or "2h ago". 
-            // If the data in DB is "2h ago", sorting by date is hard. 
-            // BUT, usually we store real dates in DB for "real" app. 
-            // I will assume for synthesized data we might have mixed formats. 
+            time: a.createdAt !== undefined ? new Date(a.createdAt).toISOString() : a.time,
+            rawTime: a.createdAt ?? NaN,
             read: false
-        })),
-        ...docs.map(d => ({
+        }),
+    },
+    {
+        query: { table: db.docs, orderBy: 'dateTs', reverse: true },
+        toItem: (d: Doc) => ({
             id: `doc-${d.id}`,
             title: 'Document Uploaded',
             desc: `${d.name} was successfully uploaded to the vault.`,
             type: 'success',
             time: d.date,
-            rawTime: new Date(d.date).getTime(),
+            rawTime: d.dateTs ?? NaN,
             read: true
-        })),
-        ...loans.map(l => ({
+        }),
+    },
+    {
+        query: { table: db.loans, orderBy: 'dateTs', reverse: true },
+        toItem: (l: Loan) => ({
             id: `loan-${l.id}`,
             title: 'Loan Review Update',
             desc: `${l.counterparty} - Status: ${l.status}`,
-            type: l.status === 'Approved' ? 'success' : l.status === 'Critical' ? 'alert' : 'info',
+            type: l.status === 'Approved' ? 'success' : (l.status as string) === 'Critical' ? 'alert' : 'info',
             time: l.date,
-            rawTime: new Date(l.date).getTime(),
+            rawTime: l.dateTs ?? NaN,
             read: true
-        }))
-    ].sort((a, b) => {
-        // Try to sort by raw time if available and valid
-        if (!isNaN(a.rawTime) && !isNaN(b.rawTime)) return b.rawTime - a.rawTime;
-        return 0;
-    });
+        }),
+    },
+];
+
+// Only notifications with a malformed timestamp lack a time; they sort as the oldest
+const feedTime = (item: FeedItem) => isNaN(item.rawTime) ? 0 : item.rawTime;
+
+export const NotificationsView = () => {
+    const { items: unifiedNotifications, hasMore, loadMore } = usePagedFeed(NOTIFICATION_SOURCES, feedTime);
 
     const getIcon = (type: string) => {
         switch (type) {
@@ -119,11 +140,11 @@ export const NotificationsView = () => {
 
                 <div className="flex flex-col gap-4">
                     {unifiedNotifications.length > 0 ? (
-                        unifiedNotifications.map((notif, i) => {
+                        unifiedNotifications.map(notif => {
                             const Icon = getIcon(notif.type);
                             const styles = getStyles(notif.type);
                             return (
-                                <div key={i} className={`glass-panel p-4 rounded-xl flex gap-4 hover:border-primary/30 transition-colors cursor-pointer group ${notif.read ? 'opacity-70' : 'border-primary/20'}`}>
+                                <div key={notif.id} className={`glass-panel p-4 rounded-xl flex gap-4 hover:border-primary/30 transition-colors cursor-pointer group ${notif.read ? 'opacity-70' : 'border-primary/20'}`}>
                                     <div className={`w-10 h-10 rounded-full flex items-center justify-center shrink-0 ${styles.bg} ${styles.color}`}>
                                         <Icon size={20} />
                                     </div>
@@ -153,6 +174,14 @@ export const NotificationsView = () => {
                         </div>
                     )}
                 </div>
+
+                {hasMore && (
+                    <div className="flex justify-center">
+                        <button onClick={loadMore} className="text-xs font-bold uppercase tracking-wider text-text-muted hover:text-white transition-colors">
+                            Load Older Notifications
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -1,73 +1,44 @@
 import React from 'react';
 import { AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, BarChart, Bar, Legend } from 'recharts';
 import { ArrowUpRight, TrendingUp, DollarSign, Activity, AlertCircle } from 'lucide-react';
-import { db } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { getLoansDueThisWeek } from '../services/LoanQueries';
+import { getPortfolioAggregates, PortfolioAggregates } from '../services/PortfolioAggregates';
 
-export const PortfolioAnalyticsView = () => {
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-
-    // Parse amount string to number - with better error handling
-    const parseAmount = (amtStr: string | undefined | null): number => {
-        if (!amtStr || typeof amtStr !== 'string') return 0;
-
-        // Remove currency symbols, commas, and spaces
-        const cleanStr = amtStr.replace(/[$€£,\s]/g, '').trim();
-
-        // Check for multiplier suffixes
-        const hasM = /m$/i.test(cleanStr);
-        const hasK = /k$/i.test(cleanStr);
-        const hasB = /b$/i.test(cleanStr);
-
-        // Extract numeric part
-        const numericPart = cleanStr.replace(/[^0-9.]/g, '');
-        const val = parseFloat(numericPart);
-
-        if (isNaN(val)) return 0;
+const MONTH_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
 
-        if (hasB) return val * 1000000000;
-        if (hasM) return val * 1000000;
-        if (hasK) return val * 1000;
-
-        // If no suffix but large number, assume it's already in base units
-        return val;
-    };
-
-    // Aggregate data for charts
-    const aggregatedData = loans.reduce((acc, loan) => {
-        const date = loan.date ? new Date(loan.date) : new Date();
-        const month = date.toLocaleString('default', { month: 'short' });
-        const amount = parseAmount(loan.amount);
+const EMPTY_AGGREGATES: PortfolioAggregates = {
+    loanCount: 0, exposureMinor: 0, riskScoreSum: 0, riskCounts: {}, statusCounts: {}, typeCounts: {},
+    exposureByTypeMinor: {}, exposureByMonthMinor: {}, riskExposureByMonthMinor: {}, undatedExposureMinor: 0,
+    undatedRiskExposureMinor: 0, docCount: 0, docSizeKb: 0, docStatusCounts: {},
+};
 
-        const existing = acc.find(d => d.name === month);
-        if (existing) {
-            existing.value += amount;
-            if (loan.risk === 'High' || loan.risk === 'Critical') {
-                existing.risk += amount;
-            }
-        } else {
-            acc.push({
+export const PortfolioAnalyticsView = () => {
+    // Maintained counters (see services/PortfolioAggregates.ts), not a scan of the loans table
+    const aggregates = useLiveQuery(getPortfolioAggregates) ?? EMPTY_AGGREGATES;
+    const dueThisWeek = useLiveQuery(() => getLoansDueThisWeek().then(due => due.length)) ?? 0;
+    const loanCount = aggregates.loanCount;
+
+    // Chart data by month of the loan date; loans without one count in the current month
+    const currentMonth = MONTH_ORDER[new Date().getMonth()];
+    const hasUndated = aggregates.undatedExposureMinor !== 0 || aggregates.undatedRiskExposureMinor !== 0;
+    const aggregatedData = MONTH_ORDER
+        .filter(month => aggregates.exposureByMonthMinor[month] !== undefined || (hasUndated && month === currentMonth))
+        .map(month => {
+            const undated = month === currentMonth;
+            return {
                 name: month,
-                value: amount,
-                risk: (loan.risk === 'High' || loan.risk === 'Critical') ? amount : 0
-            });
-        }
-        return acc;
-    }, [] as { name: string; value: number; risk: number }[]);
-
-    // Sort by month order
-    const monthOrder = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
-    aggregatedData.sort((a, b) => monthOrder.indexOf(a.name) - monthOrder.indexOf(b.name));
+                value: ((aggregates.exposureByMonthMinor[month] ?? 0) + (undated ? aggregates.undatedExposureMinor : 0)) / 100,
+                risk: ((aggregates.riskExposureByMonthMinor[month] ?? 0) + (undated ? aggregates.undatedRiskExposureMinor : 0)) / 100,
+            };
+        });
 
     // Stats
-    const totalExposure = loans.reduce((acc, l) => acc + parseAmount(l.amount), 0);
-    const performantLoans = loans.filter(l => l.risk === 'Low' || l.risk === 'Medium').length;
+    const totalExposure = aggregates.exposureMinor / 100;
+    const performantLoans = (aggregates.riskCounts.Low ?? 0) + (aggregates.riskCounts.Medium ?? 0);
 
-    // Simple risk score calc
-    const riskMap: Record<string, number> = { 'Low': 4, 'Medium': 3, 'High': 2, 'Critical': 1 };
-    const avgRiskScoreVal = loans.length > 0
-        ? loans.reduce((acc, l) => acc + (riskMap[l.risk] || 3), 0) / loans.length
-        : 0;
+    // Simple risk score calc (Low 4 ... Critical 1, summed as loans are written)
+    const avgRiskScoreVal = loanCount > 0 ? aggregates.riskScoreSum / loanCount : 0;
 
     let avgRiskLabel = 'N/A';
     if (avgRiskScoreVal >= 3.5) avgRiskLabel = 'A';
@@ -76,7 +47,7 @@ export const PortfolioAnalyticsView = () => {
     else if (avgRiskScoreVal > 0) avgRiskLabel = 'D';
 
     // Calculate estimated yield based on risk (simulated)
-    const estimatedYield = loans.length > 0
+    const estimatedYield = loanCount > 0
         ? (avgRiskScoreVal * 1.5 + 2).toFixed(1) + '%' // Higher risk = Lower yield potential
         : 'N/A';
 
@@ -88,7 +59,7 @@ export const PortfolioAnalyticsView = () => {
         return `$${val.toLocaleString()}`;
     };
 
-    if (loans.length === 0) {
+    if (loanCount === 0) {
         return (
             <div className="flex-1 overflow-y-auto p-4 lg:p-8 pt-2 custom-scrollbar">
                 <div className="mx-auto max-w-[1600px] flex flex-col gap-6 h-full justify-center items-center text-center opacity-70">
@@ -113,9 +84,9 @@ export const PortfolioAnalyticsView = () => {
                 {/* Stats Grid */}
                 <div id="analytics-stats-grid" className="grid grid-cols-1 md:grid-cols-4 gap-4">
                     {[
-                        { label: 'Total Exposure', value: formatCurrency(totalExposure), change: 'Realtime', icon: DollarSign, color: 'text-primary' },
+                        { label: 'Total Exposure', value: formatCurrency(totalExposure), change: `${dueThisWeek} due this week`, icon: DollarSign, color: 'text-primary' },
                         { label: 'Avg. Risk Score', value: avgRiskLabel, change: 'Calculated', icon: Activity, color: 'text-accent-orange' },
-                        { label: 'Performant Loans', value: performantLoans.toString(), change: `${loans.length > 0 ? ((performantLoans / loans.length) * 100).toFixed(0) : 0}%`, icon: TrendingUp, color: 'text-blue-400' },
+                        { label: 'Performant Loans', value: performantLoans.toString(), change: `${loanCount > 0 ? ((performantLoans / loanCount) * 100).toFixed(0) : 0}%`, icon: TrendingUp, color: 'text-blue-400' },
                         { label: 'Est. Yield', value: estimatedYield, change: 'Projected', icon: ArrowUpRight, color: 'text-primary' },
                     ].map((stat, i) => (
                         <div key={i} className="glass-panel p-5 rounded-xl flex flex-col gap-4">
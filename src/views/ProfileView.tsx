@@ -4,6 +4,7 @@ import { ViewState } from '../types';
 import { useActionFeedback } from '../components/ActionFeedback';
 import { db, User } from '../db';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableRows } from '../services/LiveStore';
 
 interface ProfileViewProps {
     setView?: (view: ViewState) => void;
@@ -26,8 +27,8 @@ export const ProfileView = ({ setView }: ProfileViewProps) => {
         [userId]
     );
 
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
+    const loans = useTableRows(db.loans) || [];
+    const docs = useTableRows(db.docs) || [];
 
     if (!user) {
         return (
@@ -4,7 +4,7 @@ import { motion } from 'framer-motion';
 import { ChevronLeft, Share2, Award, MapPin, UserPlus } from 'lucide-react';
 import { useActionFeedback } from '../components/ActionFeedback';
 import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 
 interface PublicProfileViewProps {
     setView: (view: ViewState) => void;
@@ -14,7 +14,7 @@ export const PublicProfileView = ({ setView }: PublicProfileViewProps) => {
     const { trigger: copyLink } = useActionFeedback('Copy Link');
 
     // Fetch user from database
-    const user = useLiveQuery(() => db.users.toArray())?.[0];
+    const user = useTableQuery(db.users, users => users[0]);
 
     // Empty state if no user
     if (!user) {
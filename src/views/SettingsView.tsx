@@ -3,7 +3,7 @@ import { User, Shield, BellRing, Monitor, Laptop, ChevronDown, Palette, Globe, K
 import { ViewState } from '../types';
 import { toast } from 'sonner';
 import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 
 interface SettingsViewProps {
     setView?: (view: ViewState) => void;
@@ -14,7 +14,7 @@ export const SettingsView = ({ setView }: SettingsViewProps) => {
     const [isSidebarOpen, setIsSidebarOpen] = useState(true);
 
     // Fetch user from database
-    const user = useLiveQuery(() => db.users.toArray())?.[0];
+    const user = useTableQuery(db.users, users => users[0]);
 
     const tabs = [
         { id: 'General', icon: Monitor },
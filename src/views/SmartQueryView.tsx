@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { ViewState } from '../types';
 import {
     History,
@@ -28,10 +28,16 @@ import {
     Check,
     File,
     Database,
+    Square,
 } from 'lucide-react';
+import { toast } from 'sonner';
 import { useActionFeedback } from '../components/ActionFeedback';
-import { openai, getChatPrompt } from '../services/openai';
+import { getChatPrompt } from '../services/openai';
+import { answerWithCache, AnswerSource } from '../services/ResponseCache';
+import { buildRetrievalContext } from '../services/RetrievalIndex';
+import { throttledWriter } from '../utils/throttle';
 import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableRows } from '../services/LiveStore';
 import { db } from '../db';
 import { Query } from '../types';
 
@@ -48,13 +54,22 @@ const MODELS = [
     { id: 'gpt-5', name: 'GPT-5', desc: 'Previous intelligent reasoning model for coding and agentic tasks with configurable reasoning effort' }
 ];
 
+// Streamed answers are written to the queries table at most this often
+const PERSIST_INTERVAL_MS = 500;
+
+const CANCELLED_NOTE = '\n\n[Stopped]';
+
 export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps) => {
     const [isSidebarOpen, setIsSidebarOpen] = useState(true);
-    const { trigger: triggerAnalyze } = useActionFeedback('Analysis', { duration: 3000 });
 
     const [query, setQuery] = useState('');
     const [result, setResult] = useState<string | null>(null);
     const [isLoading, setIsLoading] = useState(false);
+    const [isStreaming, setIsStreaming] = useState(false);
+    const [answerSource, setAnswerSource] = useState<AnswerSource | null>(null);
+    const streamAbort = useRef<AbortController | null>(null);
+    // Query shown in the result panel; a stream only renders into its own query
+    const visibleQueryId = useRef<number | undefined>(undefined);
     const [selectedModel, setSelectedModel] = useState(MODELS[0]);
     const [isModelMenuOpen, setIsModelMenuOpen] = useState(false);
 
@@ -67,10 +82,13 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
     const [currentQueryId, setCurrentQueryId] = useState<number | undefined>(undefined);
     const { trigger: triggerSave, state: saveState } = useActionFeedback('Saved', { duration: 2000 });
 
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
-    const docs = useLiveQuery(() => db.docs.toArray()) || [];
+    const loans = useTableRows(db.loans) || [];
+    const docs = useTableRows(db.docs) || [];
     const history = useLiveQuery(() => db.queries.orderBy('timestamp').reverse().toArray()) || [];
 
+    // Stop any in-flight answer when leaving the view
+    useEffect(() => () => streamAbort.current?.abort(), []);
+
     // Helper to handle selection
     const toggleSelection = (id: string) => {
         setSelectedContextIds(prev =>
@@ -95,6 +113,37 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
         }
     };
 
+    const buildContext = async (textToAnalyze: string) => {
+        // Without a selection, only the records relevant to the question are sent
+        if (selectedContextIds.length === 0) {
+            return buildRetrievalContext(textToAnalyze);
+        }
+
+        let context = "";
+
+        // 1. Add Loans
+        const activeLoans = loans.filter(l => selectedContextIds.includes(l.id));
+
+        if (activeLoans.length > 0) {
+            context += "=== LOAN PORTFOLIO DATA ===\n";
+            context += activeLoans.map(l =>
+                `- Loan ${l.id} (${l.type}) with ${l.counterparty}: ${l.amount}, Risk: ${l.risk}, Status: ${l.status}, Deadline: ${l.deadline}`
+            ).join('\n');
+            context += "\n\n";
+        }
+
+        // 2. Add Documents
+        const activeDocs = docs.filter(d => d.id && selectedContextIds.includes(d.id.toString()));
+
+        if (activeDocs.length > 0) {
+            context += "=== AVAILABLE DOCUMENTS ===\n";
+            context += activeDocs.map(d =>
+                `- ${d.name} (${d.type}): Status ${d.status}, Date: ${d.date}, Entities: ${d.entities?.join(', ') || 'None'}`
+            ).join('\n');
+        }
+        return context;
+    };
+
     const handleAnalyze = async (overrideQuery?: string) => {
         const textToAnalyze = overrideQuery || query;
         if (!textToAnalyze.trim()) return;
@@ -103,77 +152,94 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
             setQuery(overrideQuery);
         }
 
+        // A new question replaces any answer still streaming
+        streamAbort.current?.abort();
+        const controller = new AbortController();
+        streamAbort.current = controller;
+        const startedAt = performance.now();
+
         setIsLoading(true);
+        setIsStreaming(false);
         setResult(null);
+        setAnswerSource(null);
 
         // Save query to history
         const queryId = await db.queries.add({
             text: textToAnalyze,
             timestamp: Date.now(),
             model: selectedModel.name,
-            result: '', // Initial empty result
-            bookmarked: false
-        });
-
-        setCurrentQueryId(queryId as number);
-        onSelectQuery?.(queryId as number);
-
-        triggerAnalyze(async () => {
-            try {
-                // Build Context based on selection
-                let context = "";
-
-                // 1. Add Loans
-                const activeLoans = selectedContextIds.length === 0
-                    ? loans
-                    : loans.filter(l => selectedContextIds.includes(l.id));
-
-                if (activeLoans.length > 0) {
-                    context += "=== LOAN PORTFOLIO DATA ===\n";
-                    context += activeLoans.map(l =>
-                        `- Loan ${l.id} (${l.type}) with ${l.counterparty}: ${l.amount}, Risk: ${l.risk}, Status: ${l.status}, Deadline: ${l.deadline}`
-                    ).join('\n');
-                    context += "\n\n";
-                }
-
-                // 2. Add Documents
-                const activeDocs = selectedContextIds.length === 0
-                    ? docs
-                    : docs.filter(d => d.id && selectedContextIds.includes(d.id.toString()));
-
-                if (activeDocs.length > 0) {
-                    context += "=== AVAILABLE DOCUMENTS ===\n";
-                    context += activeDocs.map(d =>
-                        `- ${d.name} (${d.type}): Status ${d.status}, Date: ${d.date}, Entities: ${d.entities?.join(', ') || 'None'}`
-                    ).join('\n');
+            result: '', // Filled in as the answer streams
+            bookmarked: false,
+            status: 'streaming'
+        }) as number;
+
+        visibleQueryId.current = queryId;
+        setCurrentQueryId(queryId);
+        onSelectQuery?.(queryId);
+
+        // Tokens are rendered once per frame and persisted in throttled batches,
+        // not on every token
+        let text = '';
+        let frame = 0;
+        const render = () => {
+            frame = 0;
+            if (visibleQueryId.current === queryId) setResult(text);
+        };
+        const persist = throttledWriter((result: string) => db.queries.update(queryId, { result }), PERSIST_INTERVAL_MS);
+
+        try {
+            const context = await buildContext(textToAnalyze);
+            const { source } = await answerWithCache(getChatPrompt(textToAnalyze, context), token => {
+                if (!text) {
+                    const firstTokenMs = Math.round(performance.now() - startedAt);
+                    setIsStreaming(true);
+                    db.queries.update(queryId, { firstTokenMs });
                 }
-
-                const completion = await openai.chat.completions.create({
-                    model: "gpt-4o", // Forcing gpt-4o for stability as gpt-5 is not publicly available yet, but UI shows selection.
-                    messages: [
-                        { role: "user", content: getChatPrompt(textToAnalyze, context) }
-                    ]
-                });
-
-                const content = completion.choices[0].message.content || "No response generated.";
-                setResult(content);
-
-                // Update history with result
-                await db.queries.update(queryId, { result: content });
-
-            } catch (error) {
+                text += token;
+                if (!frame) frame = requestAnimationFrame(render);
+                persist.schedule(text);
+            }, controller.signal);
+
+            text = text || "No response generated.";
+            if (visibleQueryId.current === queryId) setAnswerSource(source);
+            persist.cancel();
+            await persist.flush();
+            await db.queries.update(queryId, { result: text, status: 'done' });
+        } catch (error) {
+            persist.cancel();
+            await persist.flush();
+            if (controller.signal.aborted) {
+                // Keep whatever arrived before the stop
+                text += CANCELLED_NOTE;
+                await db.queries.update(queryId, { result: text, status: 'cancelled' });
+            } else {
                 console.error("OpenAI Chat Failed:", error);
-                const errorMsg = "Sorry, I couldn't connect to the AI service. Please check your API key or network connection.";
-                setResult(errorMsg);
-                // Optionally update DB with error or delete failed query
-                await db.queries.update(queryId, { result: errorMsg });
-            } finally {
+                text = "Sorry, I couldn't connect to the AI service. Please check your API key or network connection.";
+                await db.queries.update(queryId, { result: text, status: 'error' });
+                toast.error('Analysis failed.');
+            }
+        } finally {
+            cancelAnimationFrame(frame);
+            // A newer question owns the result panel now
+            if (streamAbort.current === controller) {
+                streamAbort.current = null;
+                if (visibleQueryId.current === queryId) setResult(text);
                 setIsLoading(false);
+                setIsStreaming(false);
             }
-        });
+        }
+    };
+
+    const handleStop = () => {
+        streamAbort.current?.abort();
     };
 
     const handleClearHistory = async () => {
+        streamAbort.current?.abort();
+        streamAbort.current = null;
+        visibleQueryId.current = undefined;
+        setIsLoading(false);
+        setIsStreaming(false);
         await db.queries.clear();
         setCurrentQueryId(undefined);
         setResult(null);
@@ -235,7 +301,9 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
                                         key={item.id}
                                         onClick={() => {
                                             setQuery(item.text);
+                                            visibleQueryId.current = item.id;
                                             setResult(item.result || null);
+                                            setAnswerSource(null);
                                             setCurrentQueryId(item.id);
                                             onSelectQuery?.(item.id as number);
                                             // Optional: Close sidebar on mobile if needed, or keep open
@@ -271,7 +339,9 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
                                     key={item.id}
                                     onClick={() => {
                                         setQuery(item.text);
+                                        visibleQueryId.current = item.id;
                                         setResult(item.result || null);
+                                        setAnswerSource(null);
                                         setCurrentQueryId(item.id);
                                         onSelectQuery?.(item.id as number);
                                     }}
@@ -382,15 +452,26 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
                                             )}
                                         </div>
                                     </div>
-                                    <button
-                                        id="analyze-btn"
-                                        onClick={() => handleAnalyze()}
-                                        disabled={isLoading}
-                                        className="flex items-center gap-2 bg-primary hover:bg-primary-hover text-black px-6 py-2 rounded-lg font-display font-bold text-sm transition-all shadow-glow hover:shadow-glow transform hover:-translate-y-0.5 active:translate-y-0 disabled:opacity-50 disabled:cursor-not-allowed"
-                                    >
-                                        <Sparkles size={16} />
-                                        <span>{isLoading ? 'Thinking...' : 'Analyze'}</span>
-                                    </button>
+                                    {isLoading ? (
+                                        <button
+                                            id="stop-btn"
+                                            onClick={handleStop}
+                                            className="flex items-center gap-2 bg-surface-highlight hover:bg-white/10 text-white border border-border px-6 py-2 rounded-lg font-display font-bold text-sm transition-all"
+                                            title="Stop generating"
+                                        >
+                                            <Square size={14} />
+                                            <span>{isStreaming ? 'Stop' : 'Thinking...'}</span>
+                                        </button>
+                                    ) : (
+                                        <button
+                                            id="analyze-btn"
+                                            onClick={() => handleAnalyze()}
+                                            className="flex items-center gap-2 bg-primary hover:bg-primary-hover text-black px-6 py-2 rounded-lg font-display font-bold text-sm transition-all shadow-glow hover:shadow-glow transform hover:-translate-y-0.5 active:translate-y-0 disabled:opacity-50 disabled:cursor-not-allowed"
+                                        >
+                                            <Sparkles size={16} />
+                                            <span>Analyze</span>
+                                        </button>
+                                    )}
                                 </div>
                             </div>
                         </div>
@@ -424,6 +505,9 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
                                             <Search size={18} />
                                         </span>
                                         <span>Result</span>
+                                        {answerSource === 'cache' && (
+                                            <span id="result-cached" className="text-[10px] font-mono uppercase tracking-wider px-2 py-0.5 rounded border border-primary/20 bg-primary/10 text-primary">Cached</span>
+                                        )}
                                     </h3>
                                     <div className="flex gap-2">
                                         <button
@@ -453,7 +537,7 @@ export const SmartQueryView = ({ setView, onSelectQuery }: SmartQueryViewProps)
                                         </div>
                                         <div className="flex-1 space-y-4">
                                             <div className="prose prose-invert max-w-none">
-                                                <p className="text-lg text-white font-light leading-relaxed whitespace-pre-wrap">
+                                                <p id="query-result" className="text-lg text-white font-light leading-relaxed whitespace-pre-wrap" aria-live="polite" aria-busy={isStreaming}>
                                                     {result}
                                                 </p>
                                             </div>
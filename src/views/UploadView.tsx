@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
     UploadCloud,
     FileText,
@@ -9,14 +9,125 @@ import {
     Bot,
     Info,
     Lock,
-    Loader2
+    Loader2,
+    RotateCw
 } from 'lucide-react';
 import { ViewState, Doc, QueueItem, Loan } from '../types';
 import { db } from '../db';
-import { openai, getLoanAnalysisPrompt, hasApiKey } from '../services/openai';
-import { extractTextFromPDF } from '../utils/pdfExtract';
+import { hasApiKey, LOAN_ANALYSIS_PROMPT_VERSION } from '../services/openai';
+import { analyzeLoanDocument } from '../services/LoanAnalysis';
+import { getIngestOptions, IngestQueue, IngestStage, IngestUpdate } from '../services/IngestQueue';
+import { getCached, hashContent, putCached, withCache } from '../services/AnalysisCache';
+import { putBlob } from '../services/BlobStore';
+import { extractTextFromPDF, PDF_TEXT_VERSION } from '../utils/pdfExtract';
+import { extractionFraction } from '../services/DocumentProcessor';
 import { toast } from 'sonner';
 
+const INGEST_STAGE_LABELS: Record<IngestStage, string> = {
+    queued: 'Queued',
+    extracting: 'Extracting text',
+    waiting: 'Waiting for AI',
+    analyzing: 'Analyzing with AI',
+    retrying: 'Retrying',
+    saving: 'Saving',
+    done: 'Analyzed',
+    failed: 'Failed',
+    cancelled: 'Cancelled',
+};
+
+const INGEST_STAGE_PROGRESS: Partial<Record<IngestStage, number>> = {
+    queued: 5,
+    extracting: 20,
+    waiting: 40,
+    analyzing: 60,
+    retrying: 60,
+    saving: 90,
+};
+
+// Extraction reports its own progress (scanned pages can take a while to OCR)
+const ingestProgress = ({ stage, progress }: IngestUpdate) =>
+    stage === 'extracting' && progress !== undefined
+        ? INGEST_STAGE_PROGRESS.extracting! + (INGEST_STAGE_PROGRESS.waiting! - INGEST_STAGE_PROGRESS.extracting!) * progress
+        : INGEST_STAGE_PROGRESS[stage];
+
+const isIngestActive = (item: QueueItem) =>
+    !!item.ingest && !['done', 'failed', 'cancelled'].includes(item.ingest.stage);
+
+// Ready files that haven't been analyzed yet (failed and cancelled ones can be resubmitted)
+const isAnalyzable = (item: QueueItem) =>
+    item.status === 'ready' && (!item.ingest || item.ingest.stage === 'failed' || item.ingest.stage === 'cancelled');
+
+interface ExtractedContent {
+    hash: string;
+    contentSnippet: string;
+}
+
+/**
+ * Hash the file and read the text to send for analysis, OCRing scanned pages
+ */
+const extractContent = async (file: File, signal: AbortSignal, report: (progress: number) => void): Promise<ExtractedContent> => {
+    const ext = file.name.split('.').pop()?.toUpperCase() || 'FILE';
+    const hash = await hashContent(file);
+
+    let contentSnippet = "Content extraction pending...";
+    if (ext === 'PDF') {
+        try {
+            contentSnippet = await withCache(hash, 'text', PDF_TEXT_VERSION,
+                () => extractTextFromPDF(file, { signal, onProgress: progress => report(extractionFraction(progress)) }));
+        } catch (e) {
+            signal.throwIfAborted();
+            console.error("PDF extraction failed, falling back to metadata", e);
+            contentSnippet = "PDF Text Extraction Failed. Please infer from filename.";
+        }
+    } else if (ext === 'DOCX') {
+        // DOCX extraction in browser is harder without libraries like mammoth.js
+        // For now, we'll note it.
+        contentSnippet = "DOCX Content extraction not yet implemented in browser. Infer from filename.";
+    }
+    signal.throwIfAborted();
+    return { hash, contentSnippet };
+};
+
+// The same document twice in one batch shares a single request
+const reviewsInFlight = new Map<string, Promise<any>>();
+
+const cachedReview = (_file: File, { hash }: ExtractedContent) =>
+    getCached<any>(hash, 'review', LOAN_ANALYSIS_PROMPT_VERSION);
+
+/**
+ * One analysis attempt; retries and rate limiting are handled by the ingest queue.
+ * Long agreements are reviewed chunk by chunk, see services/LoanAnalysis.ts.
+ */
+const analyzeContent = async (
+    file: File,
+    { hash, contentSnippet }: ExtractedContent,
+    signal: AbortSignal,
+    throttle: (signal?: AbortSignal) => Promise<void>
+): Promise<any> => {
+    const key = `${hash}:${LOAN_ANALYSIS_PROMPT_VERSION}`;
+    const inFlight = reviewsInFlight.get(key);
+    if (inFlight) {
+        try {
+            return await inFlight;
+        } catch {
+            // The other request failed or was cancelled; make our own
+        }
+    }
+
+    const request = (async () => {
+        const review = await analyzeLoanDocument(file.name, contentSnippet, { signal, throttle });
+        await putCached(hash, 'review', LOAN_ANALYSIS_PROMPT_VERSION, review);
+        return review;
+    })();
+
+    reviewsInFlight.set(key, request);
+    try {
+        return await request;
+    } finally {
+        if (reviewsInFlight.get(key) === request) reviewsInFlight.delete(key);
+    }
+};
+
 interface UploadViewProps {
     setView: (v: ViewState) => void;
     onUploadComplete: (newDocs: Doc[]) => void;
@@ -28,6 +139,10 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
     const [queue, setQueue] = useState<QueueItem[]>([]);
     const [isAnalyzing, setIsAnalyzing] = useState(false);
     const [analyzingProgress, setAnalyzingProgress] = useState<{ current: number, total: number } | null>(null);
+    const ingestQueue = useRef<IngestQueue<ExtractedContent, any> | null>(null);
+
+    // Leaving the view cancels whatever is still in flight
+    useEffect(() => () => ingestQueue.current?.cancelAll(), []);
 
     const handleDrag = (e: React.DragEvent) => {
         e.preventDefault();
@@ -116,8 +231,20 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
         setQueue(prev => prev.filter(i => i.id !== id));
     };
 
+    const updateIngest = (id: string, ingest: IngestUpdate) => {
+        setQueue(prev => prev.map(item => item.id === id ? { ...item, ingest } : item));
+    };
+
+    const cancelIngest = (id: string) => {
+        ingestQueue.current?.cancel(id);
+    };
+
+    const handleCancelAll = () => {
+        ingestQueue.current?.cancelAll();
+    };
+
     const handleAnalyze = async () => {
-        const readyItems = queue.filter(i => i.status === 'ready');
+        const readyItems = queue.filter(isAnalyzable);
         if (readyItems.length === 0) return;
 
         if (!hasApiKey()) {
@@ -137,97 +264,73 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
         const newLoans: Loan[] = [];
         const newDocs: Doc[] = [];
 
-        try {
-            // Process each file sequentially to allow for async API calls
-            for (let i = 0; i < readyItems.length; i++) {
-                const item = readyItems[i];
-                setAnalyzingProgress({ current: i + 1, total: readyItems.length });
-
-                const ext = item.file.name.split('.').pop()?.toUpperCase() || 'FILE';
-
-                // Read basic content
-                let contentSnippet = "Content extraction pending...";
-                if (ext === 'PDF') {
-                    try {
-                        contentSnippet = await extractTextFromPDF(item.file);
-                    } catch (e) {
-                        console.error("PDF extraction failed, falling back to metadata", e);
-                        contentSnippet = "PDF Text Extraction Failed. Please infer from filename.";
-                    }
-                } else if (ext === 'DOCX') {
-                    // DOCX extraction in browser is harder without libraries like mammoth.js
-                    // For now, we'll note it.
-                    contentSnippet = "DOCX Content extraction not yet implemented in browser. Infer from filename.";
-                }
+        const commit = async (file: File, extractedData: any, { hash }: ExtractedContent) => {
+            const ext = file.name.split('.').pop()?.toUpperCase() || 'FILE';
+            const randomId = `LN-${new Date().getFullYear()}-${Math.floor(Math.random() * 1000).toString().padStart(3, '0')}`;
+            const todayStr = new Date().toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' });
+
+            // Generate entities based on the extracted data
+            const entities = [
+                extractedData.counterparty || "Unknown",
+                "LMA Banking Group",
+                extractedData.amount || "N/A",
+                todayStr
+            ];
+
+            // Create corresponding Loan record
+            const newLoan: Loan = {
+                id: randomId,
+                counterparty: extractedData.counterparty || "Unknown",
+                amount: extractedData.amount || "$0M",
+                type: extractedData.type || "General",
+                status: (extractedData.status === 'Approved' || extractedData.status === 'In Review') ? extractedData.status : 'In Review',
+                date: todayStr,
+                risk: (extractedData.risk as any) || "Medium",
+                deadline: extractedData.deadline || todayStr,
+                reviewData: extractedData.reviewData
+            };
 
-                let extractedData: any = {};
-
-                try {
-                    // Call OpenAI for "Real" Analysis
-                    const completion = await openai.chat.completions.create({
-                        model: "gpt-4o", // Using a stable, existing model
-                        messages: [
-                            { role: "user", content: getLoanAnalysisPrompt(item.file.name, contentSnippet) }
-                        ],
-                        response_format: { type: "json_object" }
-                    }, {
-                        timeout: 60000 // Increased timeout for text processing
-                    });
-
-                    const content = completion.choices[0].message.content;
-                    if (content) {
-                        extractedData = JSON.parse(content);
-                    }
-                } catch (error) {
-                    console.error("OpenAI Analysis Failed:", error);
-                    toast.error(`Analysis failed for ${item.file.name}`);
-                    continue;
-                }
+            const newDoc: Doc = {
+                name: file.name,
+                type: (ext === 'PDF' || ext === 'DOCX' || ext === 'XLSX') ? ext as any : 'File',
+                size: (file.size / (1024 * 1024)).toFixed(1) + ' MB',
+                status: newLoan.status === 'Approved' ? 'Analyzed' : 'Review',
+                date: todayStr,
+                // The file itself is stored once per hash in the blobs table
+                contentHash: hash,
+                entities: entities
+            };
 
-                const randomId = `LN-${new Date().getFullYear()}-${Math.floor(Math.random() * 1000).toString().padStart(3, '0')}`;
-                const todayStr = new Date().toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' });
-
-                // Generate entities based on the extracted data
-                const entities = [
-                    extractedData.counterparty || "Unknown",
-                    "LMA Banking Group",
-                    extractedData.amount || "N/A",
-                    todayStr
-                ];
-
-                // Create corresponding Loan record
-                const newLoan: Loan = {
-                    id: randomId,
-                    counterparty: extractedData.counterparty || "Unknown",
-                    amount: extractedData.amount || "$0M",
-                    type: extractedData.type || "General",
-                    status: (extractedData.status === 'Approved' || extractedData.status === 'In Review') ? extractedData.status : 'In Review',
-                    date: todayStr,
-                    risk: (extractedData.risk as any) || "Medium",
-                    deadline: extractedData.deadline || todayStr,
-                    reviewData: extractedData.reviewData
-                };
-                newLoans.push(newLoan);
-
-                newDocs.push({
-                    name: item.file.name,
-                    type: (ext === 'PDF' || ext === 'DOCX' || ext === 'XLSX') ? ext as any : 'File',
-                    size: (item.file.size / (1024 * 1024)).toFixed(1) + ' MB',
-                    status: newLoan.status === 'Approved' ? 'Analyzed' : 'Review',
-                    date: todayStr,
-                    // fileData: item.file, // Removing raw file storage to prevent IDB serialization issues
-                    entities: entities
-                });
-            }
+            // Each file's loan, vault entry and bytes land together, as soon as it is analyzed
+            await db.transaction('rw', db.loans, db.docs, db.blobs, async () => {
+                await db.loans.add(newLoan);
+                await db.docs.add(newDoc);
+                await putBlob(hash, file);
+            });
+            newLoans.push(newLoan);
+            newDocs.push(newDoc);
+        };
 
-            // Save generated loans to DB
-            if (newLoans.length > 0) {
-                await db.loans.bulkAdd(newLoans);
-            }
+        const ingest = new IngestQueue<ExtractedContent, any>(
+            { extract: extractContent, cached: cachedReview, analyze: analyzeContent, commit },
+            updateIngest,
+            getIngestOptions(),
+        );
+        ingestQueue.current = ingest;
+
+        try {
+            let finished = 0;
+            const outcomes = await Promise.all(readyItems.map(item =>
+                ingest.add(item.id, item.file).then(stage => {
+                    setAnalyzingProgress({ current: ++finished, total: readyItems.length });
+                    if (stage === 'failed') {
+                        toast.error(`Analysis failed for ${item.file.name}`);
+                    }
+                    return stage;
+                })
+            ));
 
-            // Save documents to DB (Vault)
             if (newDocs.length > 0) {
-                await db.docs.bulkAdd(newDocs);
                 toast.success(`Successfully analyzed ${newDocs.length} documents.`);
 
                 // If we have a selected loan handler and created at least one loan, select the last one and navigate
@@ -238,6 +341,8 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
                 } else {
                     onUploadComplete(newDocs);
                 }
+            } else if (outcomes.every(stage => stage === 'cancelled')) {
+                toast.info("Analysis cancelled.");
             } else {
                 toast.warning("No documents were successfully analyzed.");
             }
@@ -246,12 +351,13 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
             console.error("Critical Analysis Error:", error);
             toast.error("An unexpected error occurred during analysis.");
         } finally {
+            ingestQueue.current = null;
             setIsAnalyzing(false);
             setAnalyzingProgress(null);
         }
     };
 
-    const readyCount = queue.filter(i => i.status === 'ready').length;
+    const readyCount = queue.filter(isAnalyzable).length;
 
     return (
         <div className="flex-1 overflow-y-auto bg-pitch-black bg-[radial-gradient(circle_at_50%_0%,rgba(0,255,148,0.05),transparent_40%)]">
@@ -332,24 +438,41 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
                                                         {item.status === 'uploading' && (
                                                             <span className="text-xs text-brand-green font-mono">{Math.round(item.progress)}%</span>
                                                         )}
-                                                        {item.status === 'ready' && (
+                                                        {item.status === 'ready' && !item.ingest && (
                                                             <p className="text-gray-500 text-xs font-mono">{(item.file.size / 1024 / 1024).toFixed(1)} MB • Ready</p>
                                                         )}
+                                                        {item.ingest && (
+                                                            <p className={`flex items-center gap-1 text-xs font-mono ${item.ingest.stage === 'failed' ? 'text-red-400' : item.ingest.stage === 'done' ? 'text-brand-green' : 'text-gray-400'}`}>
+                                                                {item.ingest.stage === 'retrying' && <RotateCw size={12} className="animate-spin" />}
+                                                                {INGEST_STAGE_LABELS[item.ingest.stage]}
+                                                                {item.ingest.stage === 'retrying' && ` (attempt ${item.ingest.attempt + 1})`}
+                                                                {item.ingest.stage === 'extracting' && item.ingest.progress !== undefined && ` (${Math.round(item.ingest.progress * 100)}%)`}
+                                                            </p>
+                                                        )}
                                                         {item.status === 'error' && (
                                                             <p className="text-red-400 text-xs font-mono">{item.errorMessage}</p>
                                                         )}
                                                     </div>
 
-                                                    {item.status === 'uploading' && (
+                                                    {(item.status === 'uploading' || isIngestActive(item)) && (
                                                         <div className="w-full bg-surface-hover rounded-full h-1 overflow-hidden">
-                                                            <div className="bg-brand-green h-full shadow-[0_0_10px_rgba(0,255,148,0.5)] relative" style={{ width: `${item.progress}%` }}>
+                                                            <div className="bg-brand-green h-full shadow-[0_0_10px_rgba(0,255,148,0.5)] relative transition-all" style={{ width: `${item.ingest ? ingestProgress(item.ingest) : item.progress}%` }}>
                                                                 <div className="absolute inset-0 bg-white/30 w-full h-full animate-shimmer"></div>
                                                             </div>
                                                         </div>
                                                     )}
+                                                    {item.ingest?.error && item.ingest.stage !== 'done' && (
+                                                        <p className="text-gray-500 text-[10px] font-mono truncate mt-1">{item.ingest.error}</p>
+                                                    )}
                                                 </div>
 
-                                                {item.status === 'ready' ? (
+                                                {isIngestActive(item) ? (
+                                                    <button onClick={() => cancelIngest(item.id)} title="Cancel" className="size-8 flex items-center justify-center text-gray-500 hover:text-red-400 transition-colors">
+                                                        <X size={20} />
+                                                    </button>
+                                                ) : item.ingest?.stage === 'done' ? (
+                                                    <CheckCircle2 size={20} className="text-brand-green" />
+                                                ) : item.status === 'ready' ? (
                                                     <div className="flex items-center gap-3">
                                                         <span className="flex items-center gap-1.5 text-brand-green text-xs font-bold bg-brand-green/10 px-3 py-1.5 rounded-full border border-brand-green/20">
                                                             <CheckCircle2 size={16} />
@@ -388,7 +511,7 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
                                     </div>
                                     <div className="flex justify-between items-center p-3 rounded-lg bg-surface-hover border border-border-dim">
                                         <span className="text-gray-400 text-sm">Est. Time</span>
-                                        <span className="text-white font-mono font-bold">~{readyCount * 15}s</span>
+                                        <span className="text-white font-mono font-bold">~{Math.ceil(readyCount / getIngestOptions().analyzeConcurrency) * 15}s</span>
                                     </div>
                                 </div>
                                 <button
@@ -413,7 +536,11 @@ export const UploadView = ({ setView, onUploadComplete, onSelectLoan }: UploadVi
                                         }
                                     </span>
                                 </button>
-                                <button onClick={() => setQueue([])} className="w-full text-sm text-gray-500 hover:text-white transition-colors">Clear Queue</button>
+                                {isAnalyzing ? (
+                                    <button onClick={handleCancelAll} className="w-full text-sm text-gray-500 hover:text-red-400 transition-colors">Cancel All</button>
+                                ) : (
+                                    <button onClick={() => setQueue([])} className="w-full text-sm text-gray-500 hover:text-white transition-colors">Clear Queue</button>
+                                )}
                             </div>
 
                             <div id="upload-tips" className="p-6 rounded-2xl bg-gradient-to-br from-surface-card to-surface-hover border border-border-dim">
@@ -9,15 +9,15 @@ interface ViolationsLogViewProps {
 }
 
 import { db } from '../db';
-import { useLiveQuery } from 'dexie-react-hooks';
+import { useTableQuery } from '../services/LiveStore';
 
 export const ViolationsLogView = ({ setView }: ViolationsLogViewProps) => {
     const { trigger: fixViolation } = useActionFeedback('Auto-Fix');
-    const loans = useLiveQuery(() => db.loans.toArray()) || [];
+    // Only re-renders when a high/critical risk loan changes
+    const flaggedLoans = useTableQuery(db.loans, loans => loans.filter(l => l.risk === 'High' || l.risk === 'Critical')) || [];
 
     // Derive violations from high/critical risk loans
-    const violations = loans
-        .filter(l => l.risk === 'High' || l.risk === 'Critical')
+    const violations = flaggedLoans
         .map(l => ({
             id: `V-${l.id.split('-').pop()}`,
             severity: l.risk,
@@ -0,0 +1,89 @@
+"""
+Authenticated-session fixture for the verification scripts.
+
+The signup -> login flow against AuthView runs once; the resulting storage
+state (localStorage `currentUser` plus the LMA_DocPulse_DB IndexedDB, which
+holds the users table) is saved to disk and restored into every new context
+before the app boots. Scripts then start directly on the dashboard.
+
+Restoring IndexedDB needs Playwright >= 1.51 (`storage_state(indexed_db=True)`).
+Delete verification/.auth/ to force a fresh signup.
+"""
+import os
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from harness import BASE_URL, open_page, shared_browser
+
+AUTH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".auth")
+
+TEST_USER = {
+    "name": "Fixture Tester",
+    "email": "fixture@example.com",
+    "password": "password123",
+}
+
+
+def sign_up(page, name, email, password):
+    """Creates an account through AuthView, starting from the landing page."""
+    page.goto(BASE_URL)
+    page.get_by_text("Sign In", exact=True).click()
+    page.get_by_role("heading", name="Welcome back").wait_for()
+
+    page.get_by_text("Sign up", exact=True).click()
+    page.get_by_placeholder("John Doe").fill(name)
+    page.get_by_placeholder("name@company.com").fill(email)
+    page.get_by_placeholder("••••••••").fill(password)
+    page.get_by_role("button", name="Create Account").click()
+
+    # AuthView switches back to login mode once the users row is written
+    page.get_by_text("Account created successfully").wait_for()
+
+
+def log_in(page, email, password):
+    """Signs in from AuthView and waits until the app has routed to the dashboard."""
+    page.get_by_placeholder("name@company.com").fill(email)
+    page.get_by_placeholder("••••••••").fill(password)
+    page.get_by_role("button", name="Sign In").click()
+
+    page.wait_for_function("() => localStorage.getItem('currentUser') !== null")
+    page.wait_for_function("() => window.location.hash === '#dashboard'")
+
+
+def auth_state_path():
+    # Storage state is per origin, so the preview server and the dev server
+    # each get their own snapshot
+    origin = urlparse(BASE_URL).netloc.replace(":", "_")
+    return os.path.join(AUTH_DIR, f"{origin}.json")
+
+
+def ensure_auth_state(browser, refresh=False):
+    """
+    Returns the path of a saved authenticated storage state, running the
+    signup flow once to create it if needed.
+    """
+    state_path = auth_state_path()
+    if os.path.exists(state_path) and not refresh:
+        return state_path
+
+    with open_page(browser) as page:
+        sign_up(page, TEST_USER["name"], TEST_USER["email"], TEST_USER["password"])
+        log_in(page, TEST_USER["email"], TEST_USER["password"])
+
+        os.makedirs(AUTH_DIR, exist_ok=True)
+        # Parallel workers may race to create the snapshot; write then rename
+        tmp_path = f"{state_path}.{os.getpid()}.tmp"
+        page.context.storage_state(path=tmp_path, indexed_db=True)
+        os.replace(tmp_path, state_path)
+
+    return state_path
+
+
+@contextmanager
+def authenticated_page(browser=None, view="dashboard", **context_options):
+    """Yields a page already signed in as TEST_USER and opened on the given view."""
+    with shared_browser(browser) as b:
+        state_path = ensure_auth_state(b)
+        with open_page(b, storage_state=state_path, **context_options) as page:
+            page.goto(f"{BASE_URL}/#{view}")
+            yield page
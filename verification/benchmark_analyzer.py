@@ -0,0 +1,160 @@
+"""
+DocumentAnalyzer throughput and accuracy benchmark.
+
+Generates labelled agreements with pdf_corpus.py, loads them into the app
+(the analyzer is exposed through an init-script flag, like the Dexie handle in
+seed_data.py) and, per document, measures:
+
+  extract_ms    extractTextFromPdf (pdf.js text layer)
+  scan_ms       analyzeText, median of --iterations single-pass scans
+  scan_mb_s     scan throughput
+  recall        share of labelled events, covenants, dates and entities found
+  clause_acc    share of found events/covenants with the labelled clause reference
+  first_page_ms analysis worker (AnalysisService): first streamed partial result
+  worker_ms     analysis worker: complete result, checked against analyzeText
+
+    python verification/benchmark_analyzer.py --pages 1,10,100,300
+    python verification/benchmark_analyzer.py --pages 500 --iterations 10 --out verification/analyzer.json
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+import harness
+from harness import open_page, shared_browser
+from pdf_corpus import build_pdf, generate_agreement
+from server import app_server
+
+_EXPOSE_ANALYZER = "window.__DOCPULSE_EXPOSE_ANALYZER__ = true;"
+
+_RUN = """
+async ([data, iterations]) => {
+    const analyzer = window.__docpulseAnalyzer;
+    const bytes = Uint8Array.from(atob(data), c => c.charCodeAt(0));
+    const blob = new Blob([bytes], { type: 'application/pdf' });
+
+    const start = performance.now();
+    const text = await analyzer.extractTextFromPdf(blob);
+    const extractMs = performance.now() - start;
+    const result = analyzer.analyzeText(text);
+
+    let firstPageMs = null;
+    const workerStart = performance.now();
+    const workerResult = await analyzer.analyzeInWorker(blob, {
+        onProgress: () => { firstPageMs ??= performance.now() - workerStart; },
+    });
+    const workerMs = performance.now() - workerStart;
+
+    return {
+        extractMs,
+        benchmark: analyzer.benchmarkAnalyzer(text, iterations),
+        result,
+        firstPageMs,
+        workerMs,
+        workerMatches: JSON.stringify(workerResult) === JSON.stringify(result),
+    };
+}
+"""
+
+
+def score(result, labels):
+    """Recall per section plus clause-reference accuracy against the ground truth."""
+    expected = {
+        "events": {e["type"] for e in labels["eventsOfDefault"]},
+        "covenants": {(c["termName"], c["value"]) for c in labels["financialCovenants"]},
+        "dates": {(d["type"], d["date"]) for d in labels["criticalDates"]},
+        "entities": set(labels["entities"]),
+        "risk_flags": set(labels["riskFlags"]),
+    }
+    found = {
+        "events": {e["type"] for e in result["eventsOfDefault"]},
+        "covenants": {(c["termName"], c["value"]) for c in result["financialCovenants"]},
+        "dates": {(d["type"], d["date"]) for d in result["criticalDates"]},
+        "entities": set(result["entities"]),
+        "risk_flags": set(result["riskFlags"]),
+    }
+    scores = {}
+    for section, truth in expected.items():
+        scores[f"{section}_recall"] = round(len(truth & found[section]) / len(truth), 3) if truth else 1.0
+        scores[f"{section}_false_pos"] = len(found[section] - truth)
+
+    refs = {e["type"]: e["clauseRef"] for e in labels["eventsOfDefault"]}
+    refs.update({c["termName"]: c["clauseRef"] for c in labels["financialCovenants"]})
+    checked = [(item.get("type") or item.get("termName"), item.get("clauseRef"))
+               for item in result["eventsOfDefault"] + result["financialCovenants"]]
+    checked = [(key, ref) for key, ref in checked if key in refs]
+    scores["clause_acc"] = round(sum(refs[key] == ref for key, ref in checked) / len(checked), 3) if checked else 1.0
+    return scores
+
+
+def benchmark(page, page_counts, count=1, seed=42, iterations=5):
+    rows = []
+    for pages in page_counts:
+        for i in range(count):
+            page_lines, labels = generate_agreement(pages, seed * 100_003 + pages * 101 + i)
+            data = base64.b64encode(build_pdf(page_lines)).decode()
+            run = page.evaluate(_RUN, [data, iterations])
+            bench = run["benchmark"]
+            row = {
+                "pages": pages,
+                "doc": i + 1,
+                "chars": bench["chars"],
+                "hits": bench["hits"],
+                "extract_ms": round(run["extractMs"], 1),
+                "scan_ms": round(bench["medianMs"], 2),
+                "scan_mb_s": round(bench["mbPerSecond"], 1),
+                "first_page_ms": round(run["firstPageMs"] or 0, 1),
+                "worker_ms": round(run["workerMs"], 1),
+                "worker_matches": run["workerMatches"],
+                **score(run["result"], labels),
+            }
+            rows.append(row)
+            recall = min(v for k, v in row.items() if k.endswith("_recall"))
+            print(f"  {pages:4}p #{i + 1}  {row['chars']:>9,} chars  extract {row['extract_ms']:8.1f}ms  "
+                  f"scan {row['scan_ms']:7.2f}ms ({row['scan_mb_s']:6.1f} MB/s)  "
+                  f"min recall {recall:.2f}  clause acc {row['clause_acc']:.2f}  "
+                  f"worker first page {row['first_page_ms']:.1f}ms / total {row['worker_ms']:.1f}ms"
+                  + ("" if row["worker_matches"] else "  WORKER MISMATCH"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DocumentAnalyzer on generated agreements.")
+    parser.add_argument("--pages", default="1,10,100,300", help="comma-separated page counts (1-500)")
+    parser.add_argument("--count", type=int, default=1, help="documents per page count")
+    parser.add_argument("--iterations", type=int, default=5, help="scan repetitions per document")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--base-url", help="use an already running app instead of the managed preview server")
+    parser.add_argument("--no-build", action="store_true")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["DOCPULSE_BASE_URL"] = args.base_url
+        server = nullcontext(args.base_url)
+    else:
+        server = app_server(build=not args.no_build)
+
+    with server as base_url:
+        # harness read DOCPULSE_BASE_URL at import time, before the server started
+        harness.BASE_URL = base_url
+        with shared_browser() as browser, open_page(browser) as page:
+            page.add_init_script(_EXPOSE_ANALYZER)
+            page.goto(base_url)
+            page.wait_for_function("() => !!window.__docpulseAnalyzer")
+            start = time.perf_counter()
+            rows = benchmark(page, [int(p) for p in args.pages.split(",")], args.count, args.seed, args.iterations)
+            print(f"Analyzed {len(rows)} documents in {time.perf_counter() - start:.1f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": {"seed": args.seed, "iterations": args.iterations}, "results": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Per-view render benchmark with regression baselines.
+
+For each dataset size the database is seeded once (seed_data.py), then every
+hash route is visited and measured:
+
+  ready_ms      hash change -> ready text visible and the DOM settled
+  long_tasks    number of long tasks (>50ms) observed during the render
+  long_task_ms  total long-task time
+  script_ms     CDP Performance ScriptDuration spent during the render
+  heap_mb       CDP JSHeapUsedSize once the view is ready
+
+Each view is measured --repeat times and the median is kept. Results are
+written as JSON and, with --baseline, compared against a stored baseline;
+any metric outside its tolerance fails the run.
+
+    python verification/benchmark_views.py --scales 1k,10k --out verification/benchmarks/latest.json
+    python verification/benchmark_views.py --baseline verification/benchmarks/baseline.json
+    python verification/benchmark_views.py --baseline verification/benchmarks/baseline.json --update-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import nullcontext
+
+import auth_fixture
+import harness
+import seed_data
+from auth_fixture import ensure_auth_state
+from harness import shared_browser
+from seed_data import SCALES, generate_portfolio, seeded_page
+from server import app_server
+from waits import wait_for_settled
+
+# Hash route -> text that marks the view as rendered
+VIEWS = {
+    "dashboard": "Compliance Trend",
+    "analytics": "Portfolio Analytics",
+    "compliance": "Compliance & Risk",
+    "loan_reviews": "Loan Reviews",
+    "vault": "Document Vault",
+    "activity_log": "Activity Log",
+    "alerts_log": "System Alerts Log",
+    "violations_log": "Compliance Violations",
+    "notifications": "Notifications",
+    "smart_query": "What would you like to",
+}
+
+# Relative tolerance per metric, plus an absolute slack so tiny baselines
+# don't fail on noise
+DEFAULT_TOLERANCES = {
+    "ready_ms": (0.20, 50),
+    "long_task_ms": (0.30, 50),
+    "long_tasks": (0.50, 2),
+    "script_ms": (0.25, 25),
+    "heap_mb": (0.15, 2),
+}
+
+# Long tasks are collected from page start; tutorials are marked as seen so
+# react-joyride overlays don't end up in the measurements
+_INIT_SCRIPT = """
+window.__docpulseLongTasks = [];
+new PerformanceObserver((list) => {
+    for (const entry of list.getEntries()) window.__docpulseLongTasks.push(entry.duration);
+}).observe({ type: 'longtask', buffered: true });
+for (const view of %s) localStorage.setItem('tutorial_seen_v4_' + view, 'true');
+""" % json.dumps(list(VIEWS))
+
+
+def _metrics(cdp):
+    return {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+
+
+def measure_view(page, cdp, view, ready_text, timeout=30000):
+    """Routes to `view` and returns its render metrics."""
+    # Park on another route first so every sample is a real mount
+    parking = "settings" if view != "settings" else "profile"
+    page.evaluate("(v) => { window.location.hash = v; }", parking)
+    wait_for_settled(page)
+
+    page.evaluate("() => { window.__docpulseLongTasks.length = 0; }")
+    before = _metrics(cdp)
+    start = time.perf_counter()
+    page.evaluate("(v) => { window.location.hash = v; }", view)
+    page.get_by_text(ready_text).first.wait_for(state="visible", timeout=timeout)
+    wait_for_settled(page, timeout=timeout)
+    # Drop the quiet window the settle check waits out
+    ready_ms = (time.perf_counter() - start) * 1000 - 250
+    after = _metrics(cdp)
+    long_tasks = page.evaluate("() => window.__docpulseLongTasks.slice()")
+
+    return {
+        "ready_ms": round(max(ready_ms, 0), 1),
+        "long_tasks": len(long_tasks),
+        "long_task_ms": round(sum(long_tasks), 1),
+        "script_ms": round((after["ScriptDuration"] - before["ScriptDuration"]) * 1000, 1),
+        "heap_mb": round(after["JSHeapUsedSize"] / (1024 * 1024), 2),
+    }
+
+
+def benchmark(browser, scales, views=VIEWS, repeat=3, seed=42):
+    results = []
+    state_path = ensure_auth_state(browser)
+    for scale in scales:
+        portfolio = generate_portfolio(scale, seed)
+        with seeded_page(browser, portfolio=portfolio, view="dashboard", storage_state=state_path) as page:
+            page.add_init_script(_INIT_SCRIPT)
+            page.reload()
+            cdp = page.context.new_cdp_session(page)
+            cdp.send("Performance.enable")
+
+            for view, ready_text in views.items():
+                samples = [measure_view(page, cdp, view, ready_text) for _ in range(repeat)]
+                result = {"view": view, "dataset": scale}
+                for metric in samples[0]:
+                    result[metric] = round(statistics.median(s[metric] for s in samples), 2)
+                print(f"  {scale:>5} {view:15} ready {result['ready_ms']:8.1f}ms  "
+                      f"script {result['script_ms']:8.1f}ms  long tasks {result['long_tasks']:3} "
+                      f"({result['long_task_ms']:.0f}ms)  heap {result['heap_mb']:.1f}MB")
+                results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerances=None):
+    """Returns a list of human-readable regressions against the baseline results."""
+    tolerances = {**DEFAULT_TOLERANCES, **baseline.get("tolerances", {}), **(tolerances or {})}
+    expected = {(r["view"], r["dataset"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        base = expected.get((r["view"], r["dataset"]))
+        if base is None:
+            continue
+        for metric, (rel, slack) in tolerances.items():
+            if metric not in base or metric not in r:
+                continue
+            limit = base[metric] * (1 + rel) + slack
+            if r[metric] > limit:
+                regressions.append(
+                    f"{r['dataset']} #{r['view']} {metric}: {r[metric]} > {limit:.1f} "
+                    f"(baseline {base[metric]}, +{rel:.0%} +{slack})"
+                )
+    return regressions
+
+
+def _parse_tolerances(values):
+    tolerances = {}
+    for value in values or []:
+        metric, _, spec = value.partition("=")
+        rel, _, slack = spec.partition(":")
+        tolerances[metric] = (float(rel), float(slack or DEFAULT_TOLERANCES.get(metric, (0, 0))[1]))
+    return tolerances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark view render performance against baselines.")
+    parser.add_argument("--scales", default="1k", help="comma-separated dataset sizes (1k,10k,100k or counts)")
+    parser.add_argument("--views", help="comma-separated subset of views to measure")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with these results")
+    parser.add_argument("--tolerance", action="append", metavar="METRIC=REL[:SLACK]",
+                        help="override a tolerance, e.g. ready_ms=0.1:30")
+    parser.add_argument("--base-url", help="use an already running app instead of the managed preview server")
+    parser.add_argument("--no-build", action="store_true")
+    args = parser.parse_args()
+
+    scales = [s if s in SCALES else int(s) for s in args.scales.split(",")]
+    views = {v: VIEWS[v] for v in args.views.split(",")} if args.views else VIEWS
+
+    if args.base_url:
+        os.environ["DOCPULSE_BASE_URL"] = args.base_url
+        server = nullcontext(args.base_url)
+    else:
+        server = app_server(build=not args.no_build)
+
+    with server as base_url:
+        # The helpers read DOCPULSE_BASE_URL at import time, before the server started
+        for module in (harness, seed_data, auth_fixture):
+            module.BASE_URL = base_url
+        with shared_browser() as browser:
+            results = benchmark(browser, scales, views, repeat=args.repeat, seed=args.seed)
+
+    report = {"meta": {"base_url": base_url, "repeat": args.repeat, "seed": args.seed,
+                       "timestamp": int(time.time())}, "results": results}
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    if args.update_baseline or not os.path.exists(args.baseline):
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, _parse_tolerances(args.tolerance))
+    if regressions:
+        print("\nPerformance regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
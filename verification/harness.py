@@ -0,0 +1,46 @@
+import os
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+
+from waits import instrument_page
+
+# server.py exports the managed preview server URL here; standalone runs
+# fall back to the Vite dev server
+BASE_URL = os.environ.get("DOCPULSE_BASE_URL", "http://localhost:3000")
+
+
+@contextmanager
+def shared_browser(browser=None):
+    """
+    Yields the browser passed in, or launches a headless Chromium for the
+    duration of the block when a script is run standalone.
+    """
+    if browser is not None:
+        yield browser
+        return
+
+    with sync_playwright() as p:
+        own_browser = p.chromium.launch(headless=True)
+        try:
+            yield own_browser
+        finally:
+            own_browser.close()
+
+
+@contextmanager
+def open_page(browser=None, **context_options):
+    """
+    Yields a fresh page in its own browser context.
+
+    When a browser is passed in (the parallel runner shares one per worker)
+    only the context is created and torn down, so every test keeps its own
+    storage and IndexedDB. Run standalone, it launches and closes a headless
+    Chromium itself, which keeps `python verification/verify_x.py` working.
+    Navigation and wait calls on the page are timed by waits.py.
+    """
+    with shared_browser(browser) as b:
+        context = b.new_context(**context_options)
+        try:
+            yield instrument_page(context.new_page())
+        finally:
+            context.close()
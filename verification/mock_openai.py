@@ -0,0 +1,404 @@
+"""
+Local OpenAI-compatible stand-in for offline verification and ingest benchmarks.
+
+Serves POST /v1/chat/completions (plain and stream=true) on a free local port.
+Loan-analysis prompts (getLoanAnalysisPrompt) get schema-valid JSON derived
+deterministically from the filename; every other prompt gets a short chat
+answer. Latency, token throughput and failures are configurable:
+
+  latency_ms / jitter_ms   time to first token
+  tokens_per_sec           generation speed (0 = instant)
+  rate_429                 fraction of requests rejected with 429 + Retry-After
+  rate_500                 fraction of requests failing with a server error
+  rate_timeout             fraction of requests that hang for hang_s, then drop
+
+The app picks the endpoint up from localStorage `openai_base_url`; use
+`use_mock_openai(page, url)` before navigating. Per-request timings are kept
+for throughput and tail-latency reports (GET /__mock/stats), and the config
+can be changed at runtime (POST /__mock/config).
+
+    python verification/mock_openai.py --latency-ms 800 --tokens-per-sec 60 --rate-429 0.1
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from server import free_port
+
+DEFAULT_CONFIG = {
+    "latency_ms": 300,
+    "jitter_ms": 100,
+    "tokens_per_sec": 0.0,
+    "rate_429": 0.0,
+    "rate_500": 0.0,
+    "rate_timeout": 0.0,
+    "retry_after_s": 1,
+    "hang_s": 65,
+    "seed": None,
+}
+
+# Picks the filename out of getLoanAnalysisPrompt
+_FILENAME_RE = re.compile(r'Filename: "([^"]*)"')
+_COVENANTS = [
+    ("Interest Cover Ratio", "4.00:1"),
+    ("Leverage Ratio", "3.50:1"),
+    ("Debt Service Cover Ratio", "1.20:1"),
+    ("Capital Expenditure Limit", "$25.0M"),
+    ("Minimum Liquidity", "$10.0M"),
+]
+_EVENTS = [
+    "Non-payment of principal or interest",
+    "Breach of financial covenants",
+    "Cross default above threshold",
+    "Insolvency proceedings",
+    "Material adverse change",
+    "Change of control",
+]
+_VIABILITY = [
+    "valueProposition", "scalabilityPotential", "efficiencyGains", "potentialImpact",
+    "riskMitigation", "marketOpportunity", "competitiveAdvantage",
+]
+
+
+def loan_analysis(filename):
+    """Schema-valid getLoanAnalysisPrompt response, stable for a given filename."""
+    rng = random.Random(hashlib.sha256(filename.encode()).hexdigest())
+    stem = re.sub(r"\.[A-Za-z0-9]+$", "", filename)
+    words = [w.capitalize() for w in re.split(r"[\W_]+", stem) if w and not w.isdigit()]
+    counterparty = " ".join(words[:3] or ["Mock"]) + " " + rng.choice(["Holdings Ltd", "Group PLC", "Capital LLC", "Industries SA"])
+    risk = rng.choices(["Low", "Medium", "High", "Critical"], weights=[35, 35, 20, 10])[0]
+    covenants = []
+    for term, value in rng.sample(_COVENANTS, rng.randint(1, 4)):
+        deviation = risk in ("High", "Critical") and rng.random() < 0.6
+        covenants.append({
+            "termName": term,
+            "clauseRef": f"Clause {rng.randint(18, 26)}.{rng.randint(1, 6)}",
+            "value": value,
+            "status": "DEVIATION" if deviation else "LMA STANDARD",
+            "description": f"stepping down to {value}" if deviation else "",
+        })
+    deviations = sum(c["status"] == "DEVIATION" for c in covenants)
+    total = rng.randint(40, 160)
+    viability = {key: {"text": f"Mock {key} assessment for {counterparty}.", "score": rng.randint(40, 95)} for key in _VIABILITY}
+    viability["overallScore"] = round(sum(v["score"] for v in viability.values()) / len(_VIABILITY))
+    deadline = f"{rng.choice(['Jan', 'Mar', 'Jun', 'Sep', 'Oct', 'Dec'])} {rng.randint(1, 28)}, {rng.randint(2025, 2027)}"
+
+    return {
+        "counterparty": counterparty,
+        "amount": f"${rng.uniform(5, 500):.1f}M",
+        "type": rng.choice(["Term Loan A", "Term Loan B", "Revolver", "Bridge Facility", "Green Loan"]),
+        "risk": risk,
+        "status": "Approved" if risk == "Low" and deviations == 0 else "In Review",
+        "deadline": deadline,
+        "reviewData": {
+            "summary": f"{counterparty} senior facility agreement (mock analysis of {filename}).",
+            "confidenceScore": rng.randint(70, 99),
+            "standardizationScore": rng.randint(55, 98),
+            "clauseStats": {"total": total, "standard": total - deviations, "deviations": deviations},
+            "borrowerDetails": {
+                "entityName": counterparty,
+                "jurisdiction": rng.choice(["England & Wales", "Luxembourg", "Delaware", "Ireland"]),
+                "registrationNumber": f"{rng.randint(10000000, 99999999)}",
+                "legalAddress": f"{rng.randint(1, 200)} Finance Street, London",
+            },
+            "commercialViability": viability,
+            "financialCovenants": covenants,
+            "eventsOfDefault": rng.sample(_EVENTS, rng.randint(2, 5)),
+            "signatures": rng.choice(["All parties signed", "Pending borrower signature", "Executed in counterparts"]),
+        },
+    }
+
+
+def chat_answer(prompt):
+    query = re.search(r'User Query: "([^"]*)"', prompt)
+    subject = query.group(1) if query else "your question"
+    return (f"Mock analysis for \"{subject}\": the portfolio context was reviewed and no issues "
+            "beyond those listed in the loan records were found. This response comes from the "
+            "local OpenAI stand-in.")
+
+
+def _tokens(text):
+    # Roughly four characters per token, like the real tokenizer on English text
+    return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+
+class MockState:
+    """Config and request log shared by the handler threads."""
+
+    def __init__(self, **config):
+        self.lock = threading.Lock()
+        self.config = {**DEFAULT_CONFIG}
+        self.records = []
+        self.configure(**config)
+
+    def configure(self, **config):
+        unknown = set(config) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown mock option(s): {', '.join(sorted(unknown))}")
+        with self.lock:
+            self.config.update(config)
+            self.rng = random.Random(self.config["seed"])
+
+    def roll(self):
+        """Decides the outcome and first-token latency of one request."""
+        with self.lock:
+            c = self.config
+            draw = self.rng.random()
+            latency = max(0.0, c["latency_ms"] + self.rng.uniform(-c["jitter_ms"], c["jitter_ms"])) / 1000
+        if draw < c["rate_429"]:
+            outcome = "429"
+        elif draw < c["rate_429"] + c["rate_500"]:
+            outcome = "500"
+        elif draw < c["rate_429"] + c["rate_500"] + c["rate_timeout"]:
+            outcome = "timeout"
+        else:
+            outcome = "ok"
+        return outcome, latency
+
+    def record(self, kind, outcome, started, tokens=0):
+        with self.lock:
+            self.records.append({
+                "kind": kind,
+                "outcome": outcome,
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "tokens": tokens,
+                "at": time.time(),
+            })
+
+    def stats(self, reset=False):
+        with self.lock:
+            records = list(self.records)
+            if reset:
+                self.records.clear()
+        ok = sorted(r["ms"] for r in records if r["outcome"] == "ok")
+        outcomes = {}
+        for r in records:
+            outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+        span = (max(r["at"] for r in records) - min(r["at"] for r in records)) if len(records) > 1 else 0
+
+        def pct(p):
+            return ok[min(len(ok) - 1, int(p / 100 * len(ok)))] if ok else None
+
+        return {
+            "requests": len(records),
+            "outcomes": outcomes,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "max_ms": ok[-1] if ok else None,
+            "completions_per_sec": round(len(ok) / span, 2) if span else None,
+            "tokens": sum(r["tokens"] for r in records),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # set per server in MockOpenAIServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        # The SDK sends x-stainless-* headers; allow whatever the preflight asks for
+        self.send_header("Access-Control-Allow-Headers", self.headers.get("Access-Control-Request-Headers", "*"))
+        # Let the browser client read Retry-After on 429s
+        self.send_header("Access-Control-Expose-Headers", "Retry-After")
+
+    def _json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.startswith("/__mock/stats"):
+            self._json(200, self.state.stats(reset="reset=1" in self.path))
+        elif self.path.startswith("/v1/models"):
+            self._json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "owned_by": "mock"}]})
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if self.path.startswith("/__mock/config"):
+            try:
+                self.state.configure(**self._read_body())
+            except ValueError as e:
+                self._json(400, {"error": {"message": str(e)}})
+                return
+            self._json(200, self.state.config)
+        elif self.path.rstrip("/").endswith("/chat/completions"):
+            self._chat_completion(self._read_body())
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def _chat_completion(self, body):
+        started = time.perf_counter()
+        prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []) if isinstance(m.get("content"), str))
+        filename = _FILENAME_RE.search(prompt)
+        kind = "analysis" if filename else "chat"
+        outcome, latency = self.state.roll()
+        time.sleep(latency)
+
+        if outcome == "429":
+            self.state.record(kind, outcome, started)
+            self._json(429, {"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}},
+                       headers={"Retry-After": str(self.state.config["retry_after_s"])})
+            return
+        if outcome == "500":
+            self.state.record(kind, outcome, started)
+            self._json(500, {"error": {"message": "The server had an error (mock)", "type": "server_error"}})
+            return
+        if outcome == "timeout":
+            # Hold the connection past the client's timeout, then drop it without a response
+            time.sleep(self.state.config["hang_s"])
+            self.state.record(kind, outcome, started)
+            self.close_connection = True
+            return
+
+        content = json.dumps(loan_analysis(filename.group(1))) if filename else chat_answer(prompt)
+        tokens = _tokens(content)
+        tps = self.state.config["tokens_per_sec"]
+        model = body.get("model", "gpt-4o")
+        completion_id = f"chatcmpl-mock{int(time.time() * 1000)}"
+
+        try:
+            if body.get("stream"):
+                self._stream(completion_id, model, tokens, tps)
+            else:
+                if tps:
+                    time.sleep(len(tokens) / tps)
+                self._json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(tokens),
+                              "total_tokens": len(prompt) // 4 + len(tokens)},
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            # Client aborted (cancel or timeout)
+            self.state.record(kind, "aborted", started, len(tokens))
+            return
+        self.state.record(kind, "ok", started, len(tokens))
+
+    def _stream(self, completion_id, model, tokens, tps):
+        self.send_response(200)
+        self._cors()
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for token in tokens:
+            if tps:
+                time.sleep(1 / tps)
+            event({"content": token})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer:
+    """Threaded stand-in server; `url` is the OpenAI base URL (ending in /v1)."""
+
+    def __init__(self, port=None, **config):
+        self.state = MockState(**config)
+        handler = type("MockHandler", (_Handler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port or free_port(0)), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def configure(self, **config):
+        self.state.configure(**config)
+
+    def stats(self, reset=False):
+        return self.state.stats(reset=reset)
+
+
+@contextmanager
+def mock_openai(port=None, **config):
+    """Yields a running MockOpenAIServer, shut down on exit."""
+    server = MockOpenAIServer(port, **config).start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def use_mock_openai(page, url, api_key="sk-mock"):
+    """Points the app's OpenAI client at `url`. Call before the first navigation."""
+    page.add_init_script(
+        "localStorage.setItem('openai_api_key', %s); localStorage.setItem('openai_base_url', %s);"
+        % (json.dumps(api_key), json.dumps(url))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local OpenAI-compatible stand-in.")
+    parser.add_argument("--port", type=int, default=8787)
+    for option, default in DEFAULT_CONFIG.items():
+        if option == "seed":
+            parser.add_argument("--seed", type=int)
+        else:
+            parser.add_argument(f"--{option.replace('_', '-')}", type=type(default), default=default)
+    args = vars(parser.parse_args())
+    port = args.pop("port")
+
+    with mock_openai(port, **args) as server:
+        print(f"Mock OpenAI listening at {server.url}. In the app, run:")
+        print(f"  localStorage.setItem('openai_base_url', '{server.url}'); localStorage.setItem('openai_api_key', 'sk-mock')")
+        try:
+            while True:
+                time.sleep(5)
+        except KeyboardInterrupt:
+            print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
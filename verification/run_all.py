@@ -0,0 +1,208 @@
+"""
+Parallel runner for the verification suite.
+
+Finds every verify_*/test_* function in verification/verify_*.py and runs them
+across a process pool. Each worker launches one headless Chromium and every
+test gets its own browser context on it, so storage and IndexedDB stay
+isolated while the browser start-up cost is paid once per worker.
+
+By default the production bundle is built once and served by server.py for
+the whole run; pass --base-url to test against a server you already have up.
+Screenshots taken with snapshots.snapshot are compared against the stored
+baselines and a regression fails the test that took it.
+
+    python verification/run_all.py
+    python verification/run_all.py --workers 4 -k upload --json verification/report.json
+    python verification/run_all.py --base-url http://localhost:3000
+    python verification/run_all.py --update-snapshots
+"""
+import argparse
+import glob
+import importlib.util
+import inspect
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+import snapshots
+import waits
+from server import app_server
+
+VERIFICATION_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(VERIFICATION_DIR)
+TEST_PREFIXES = ("verify_", "test_")
+
+# Per-worker state, populated by _init_worker in each pool process
+_playwright = None
+_browser = None
+
+
+def _load_module(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def discover(pattern=None):
+    """Returns (script path, function name) pairs for every test in the suite."""
+    if VERIFICATION_DIR not in sys.path:
+        sys.path.insert(0, VERIFICATION_DIR)
+
+    tests = []
+    for path in sorted(glob.glob(os.path.join(VERIFICATION_DIR, "verify_*.py"))):
+        module = _load_module(path)
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ != module.__name__ or not name.startswith(TEST_PREFIXES):
+                continue
+            test_id = f"{os.path.basename(path)}::{name}"
+            if pattern and pattern not in test_id:
+                continue
+            tests.append((path, name))
+    return tests
+
+
+def _shutdown_worker():
+    global _playwright, _browser
+    if _browser is not None:
+        _browser.close()
+        _browser = None
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
+
+
+def _init_worker(headless):
+    global _playwright, _browser
+    from playwright.sync_api import sync_playwright
+
+    if VERIFICATION_DIR not in sys.path:
+        sys.path.insert(0, VERIFICATION_DIR)
+    os.chdir(REPO_ROOT)
+
+    _playwright = sync_playwright().start()
+    _browser = _playwright.chromium.launch(headless=headless)
+    # Pool workers leave through os._exit, so plain atexit hooks never fire
+    multiprocessing.util.Finalize(None, _shutdown_worker, exitpriority=10)
+
+
+def _run_test(path, name):
+    test_id = f"{os.path.basename(path)}::{name}"
+    waits.set_current_test(test_id)
+    waits.drain()
+    snapshots.flush()
+    start = time.perf_counter()
+    snapshot_results = []
+    try:
+        fn = getattr(_load_module(path), name)
+        fn(browser=_browser)
+        # Comparisons run in the background; collect them before calling the test done
+        snapshot_results = snapshots.check()
+        status, error = "passed", None
+    except BaseException:
+        status, error = "failed", traceback.format_exc()
+    return {
+        "id": test_id,
+        "status": status,
+        "duration": round(time.perf_counter() - start, 3),
+        "worker": os.getpid(),
+        "error": error,
+        "steps": waits.drain(),
+        "snapshots": snapshots.summarize(snapshot_results),
+    }
+
+
+def run(tests, workers, headless=True):
+    results = []
+    # spawn keeps each worker's Playwright driver independent of the parent
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(headless,)) as pool:
+        futures = [pool.submit(_run_test, path, name) for path, name in tests]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"[{result['status'].upper():6}] {result['id']} ({result['duration']:.2f}s)")
+            results.append(result)
+    return sorted(results, key=lambda r: r["id"])
+
+
+def print_report(results, wall_time):
+    failed = [r for r in results if r["status"] == "failed"]
+    serial_time = sum(r["duration"] for r in results)
+
+    print("\n=== Verification Report ===")
+    for r in sorted(results, key=lambda r: r["duration"], reverse=True):
+        print(f"  {r['duration']:7.2f}s  {r['status']:6}  {r['id']}")
+    for r in failed:
+        print(f"\n--- {r['id']} ---\n{r['error']}")
+
+    waits.print_report([step for r in results for step in r["steps"]], title="Slowest waits")
+
+    snapshot_counts = {}
+    for r in results:
+        for status, count in r["snapshots"].items():
+            snapshot_counts[status] = snapshot_counts.get(status, 0) + count
+    if snapshot_counts:
+        print(f"\nSnapshots: {snapshot_counts}")
+
+    print(f"\n{len(results) - len(failed)} passed, {len(failed)} failed "
+          f"in {wall_time:.2f}s (serial {serial_time:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the verification suite in parallel.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-k", dest="pattern", help="only run tests whose id contains this string")
+    parser.add_argument("--json", dest="json_path", help="write the merged report to this file")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument("--base-url", help="use an already running app instead of the managed preview server")
+    parser.add_argument("--no-build", action="store_true", help="serve the existing dist/ without rebuilding")
+    parser.add_argument("--update-snapshots", action="store_true", help="accept changed screenshots as new baselines")
+    args = parser.parse_args()
+
+    if args.update_snapshots:
+        # Read by snapshots.py in the spawned workers
+        os.environ["DOCPULSE_UPDATE_SNAPSHOTS"] = "1"
+
+    os.chdir(REPO_ROOT)
+    tests = discover(args.pattern)
+    if not tests:
+        print("No verification tests found.")
+        return 1
+
+    workers = max(1, min(args.workers, len(tests)))
+    print(f"Running {len(tests)} tests on {workers} workers...")
+
+    if args.base_url:
+        # Workers are spawned, so they pick the URL up from the environment
+        os.environ["DOCPULSE_BASE_URL"] = args.base_url
+        server = nullcontext(args.base_url)
+    else:
+        server = app_server(build=not args.no_build)
+
+    with server as base_url, tempfile.TemporaryDirectory(prefix="docpulse-snapshots-") as claims_dir:
+        # Lets snapshots.py refuse a name another worker has already captured
+        os.environ["DOCPULSE_SNAPSHOT_CLAIMS_DIR"] = claims_dir
+        print(f"Testing against {base_url}")
+        start = time.perf_counter()
+        results = run(tests, workers, headless=not args.headed)
+        wall_time = time.perf_counter() - start
+    print_report(results, wall_time)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"wall_time": round(wall_time, 3), "results": results}, f, indent=2)
+
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
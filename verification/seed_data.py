@@ -0,0 +1,269 @@
+"""
+Synthetic portfolio generator and seeder for LMA_DocPulse_DB load testing.
+
+Generates Loan, Doc, Alert, Notification and Query records shaped like the
+ones UploadView and SmartQueryView write (see src/types/index.ts and
+src/db.ts), at a configurable scale and reproducible from a seed, and
+bulk-inserts them through the app's own Dexie instance with chunked bulkPut.
+
+    from seed_data import generate_portfolio, seeded_page
+    with seeded_page(browser, scale="10k", seed=7, view="analytics") as page:
+        ...
+
+Export a portfolio as JSON without a browser:
+
+    python verification/seed_data.py --scale 1k --seed 7 --out portfolio.json
+"""
+import argparse
+import json
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+
+from harness import BASE_URL, open_page
+from waits import step
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+DEFAULT_CHUNK_SIZE = 1_000
+# Tables written by the seeder, in insert order
+TABLES = ("loans", "docs", "alerts", "notifications", "queries")
+
+NAME_PREFIXES = ["Alpha", "Vertex", "Apex", "Zeta", "Omega", "Beta", "Gamma", "Delta", "Sigma", "Nova",
+                 "Atlas", "Meridian", "Harbor", "Summit", "Crescent", "Northwind", "Ironbridge", "Bluewater"]
+NAME_ROOTS = ["Holdings", "Global", "Partners", "Tech", "Industries", "Capital", "Logistics", "Energy",
+              "Healthcare", "Infrastructure", "Retail", "Media", "Foods", "Chemicals", "Properties"]
+NAME_SUFFIXES = ["Ltd", "LLC", "Inc", "Corp", "PLC", "Limited", "S.A.", "GmbH"]
+LOAN_TYPES = ["Term Loan A", "Term Loan B", "Revolver", "Syndicated", "Bridge Loan", "Venture Debt",
+              "Syndicated Term Loan", "Capex Facility", "Acquisition Facility"]
+JURISDICTIONS = ["England & Wales", "New York", "Delaware", "Luxembourg", "Ireland", "Netherlands", "Singapore"]
+RISK_WEIGHTS = {"Low": 45, "Medium": 35, "High": 15, "Critical": 5}
+STATUS_WEIGHTS = {"Approved": 40, "In Review": 35, "Pending": 15, "Rejected": 10}
+COVENANTS = [
+    ("Leverage Ratio", "{:.2f}x"),
+    ("Interest Cover Ratio", "{:.2f}:1"),
+    ("Debt Service Coverage", "{:.2f}x"),
+    ("Current Ratio", "{:.2f}"),
+    ("Minimum Net Worth", "${:.1f}M"),
+]
+EVENTS_OF_DEFAULT = [
+    ("Non-payment", "Critical"), ("Breach of obligations", "Medium"), ("Misrepresentation", "High"),
+    ("Insolvency", "Critical"), ("Cross-default", "High"), ("Material Adverse Change", "High"),
+    ("Unlawfulness", "Medium"), ("Cessation of Business", "Critical"),
+]
+RISK_FLAGS = ["LIBOR reference without SOFR fallback", "Unlimited liability clause detected",
+              "Rights waiver clause detected", "Missing governing law clause", "Missing jurisdiction clause"]
+ALERT_TITLES = {
+    "critical": ["LIBOR Clause Missing", "Covenant Breach Detected", "Payment Overdue"],
+    "warning": ["Doc Incomplete", "Deadline Approaching", "Signature Pending"],
+    "info": ["AI Suggestion", "Review Completed", "New Document Linked"],
+}
+QUERY_TEXTS = [
+    "Show me all high risk loans in my portfolio.",
+    "List all loans maturing in Q4 of this year.",
+    "What are the current compliance gaps and violations?",
+    "Show me all loans with a principal amount greater than $1,000,000.",
+    "Which counterparties have cross-default clauses?",
+    "Summarize covenant deviations across the syndicated book.",
+]
+
+
+def _display_date(d):
+    # Matches toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })
+    return f"{d.strftime('%b')} {d.day}, {d.year}"
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _counterparty(rng):
+    return f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_ROOTS)} {rng.choice(NAME_SUFFIXES)}"
+
+
+def _review_data(rng, counterparty, loan_type, risk, deadline):
+    covenants = []
+    for name, fmt in rng.sample(COVENANTS, rng.randint(2, 4)):
+        value = rng.uniform(5, 80) if name == "Minimum Net Worth" else rng.uniform(1.0, 5.5)
+        deviation = rng.random() < {"Low": 0.05, "Medium": 0.2, "High": 0.4, "Critical": 0.6}[risk]
+        covenants.append({
+            "termName": name,
+            "clauseRef": f"Clause {rng.randint(18, 26)}.{rng.randint(1, 9)}",
+            "value": fmt.format(value),
+            "status": "DEVIATION" if deviation else "LMA STANDARD",
+        })
+    events = [{
+        "type": event,
+        "status": rng.choice(["Potential", "Potential", "Active", "Resolved"]),
+        "riskLevel": level,
+        "summary": f"Detected mention of {event.lower()} clause in document",
+        "clauseRef": f"Clause {rng.randint(23, 28)}.{rng.randint(1, 12)}",
+    } for event, level in rng.sample(EVENTS_OF_DEFAULT, rng.randint(1, 4))]
+
+    deviations = sum(1 for c in covenants if c["status"] == "DEVIATION")
+    total = rng.randint(40, 120)
+    return {
+        "summary": f"{loan_type} facility for {counterparty}.",
+        "confidenceScore": rng.randint(60, 98),
+        "standardizationScore": max(20, 95 - deviations * 15 - rng.randint(0, 10)),
+        "clauseStats": {"total": total, "standard": total - deviations, "deviations": deviations},
+        "borrowerDetails": {
+            "entityName": counterparty,
+            "jurisdiction": rng.choice(JURISDICTIONS),
+            "registrationNumber": f"{rng.randint(1_000_000, 9_999_999)}",
+            "legalAddress": f"{rng.randint(1, 200)} {rng.choice(NAME_PREFIXES)} Street",
+        },
+        "financialCovenants": covenants,
+        "eventsOfDefault": events,
+        "riskFlags": rng.sample(RISK_FLAGS, rng.randint(0, 2)),
+        "criticalDates": [{"type": "Maturity Date", "date": deadline}],
+    }
+
+
+def generate_portfolio(scale="1k", seed=42, start=date(2023, 1, 1), days=1_000):
+    """
+    Returns {table: [records]} plus a "summary" of expected aggregates.
+
+    `scale` is a SCALES key or a loan count; other tables are sized relative
+    to the loan count (one doc per loan, ~a fifth as many alerts and so on).
+    """
+    n_loans = SCALES[scale] if isinstance(scale, str) else int(scale)
+    rng = random.Random(seed)
+    now = datetime(start.year, start.month, start.day, tzinfo=timezone.utc) + timedelta(days=days)
+
+    loans, docs = [], []
+    total_exposure = 0.0
+    for i in range(n_loans):
+        booked = start + timedelta(days=rng.randrange(days))
+        deadline = booked + timedelta(days=rng.randint(7, 365 * 5))
+        amount = round(rng.lognormvariate(2.3, 0.9), 2)  # $M, median ~ $10M
+        total_exposure += amount
+        counterparty = _counterparty(rng)
+        risk = _weighted(rng, RISK_WEIGHTS)
+        status = _weighted(rng, STATUS_WEIGHTS)
+        loan_type = rng.choice(LOAN_TYPES)
+
+        loan = {
+            "id": f"LN-{booked.year}-{i + 1:06d}",
+            "counterparty": counterparty,
+            "amount": f"${amount:.2f}M",
+            "type": loan_type,
+            "status": status,
+            "date": _display_date(booked),
+            "risk": risk,
+            "deadline": _display_date(deadline),
+            "reviewData": _review_data(rng, counterparty, loan_type, risk, _display_date(deadline)),
+        }
+        loans.append(loan)
+        docs.append({
+            "name": f"{counterparty.split()[0]}_{loan['type'].replace(' ', '_')}_{i + 1}.pdf",
+            "type": "PDF",
+            "size": f"{rng.uniform(0.2, 25):.1f} MB",
+            "status": "Analyzed" if status == "Approved" else "Review",
+            "date": loan["date"],
+            "entities": [counterparty, "LMA Banking Group", loan["amount"], loan["date"]],
+        })
+
+    alerts = []
+    for _ in range(max(1, n_loans // 5)):
+        loan = rng.choice(loans)
+        kind = rng.choice(list(ALERT_TITLES))
+        alerts.append({
+            "title": rng.choice(ALERT_TITLES[kind]),
+            "time": (now - timedelta(minutes=rng.randrange(60 * 24 * 90))).isoformat(),
+            "subtitle": f"Loan {loan['id']} • {loan['counterparty']}",
+            "type": kind,
+        })
+
+    notifications = []
+    for _ in range(max(1, n_loans // 10)):
+        loan = rng.choice(loans)
+        kind = rng.choice(["info", "alert", "success", "warning"])
+        notifications.append({
+            "title": {"info": "Review Update", "alert": "Risk Alert", "success": "Analysis Complete",
+                      "warning": "Deadline Approaching"}[kind],
+            "message": f"{loan['counterparty']} ({loan['id']}) requires attention.",
+            "type": kind,
+            "timestamp": (now - timedelta(minutes=rng.randrange(60 * 24 * 30))).isoformat(),
+            "read": rng.random() < 0.6,
+        })
+
+    queries = [{
+        "text": rng.choice(QUERY_TEXTS),
+        "timestamp": int((now - timedelta(minutes=rng.randrange(60 * 24 * 60))).timestamp() * 1000),
+        "model": "GPT-5.2",
+        "result": "Synthetic answer generated for load testing.",
+        "bookmarked": rng.random() < 0.1,
+    } for _ in range(max(1, n_loans // 50))]
+
+    return {
+        "loans": loans,
+        "docs": docs,
+        "alerts": alerts,
+        "notifications": notifications,
+        "queries": queries,
+        "summary": {
+            "seed": seed,
+            "loans": n_loans,
+            "total_exposure_m": round(total_exposure, 2),
+            "critical_loans": sum(1 for l in loans if l["risk"] == "Critical"),
+        },
+    }
+
+
+_EXPOSE_DB = "window.__DOCPULSE_EXPOSE_DB__ = true;"
+
+
+def seed_database(page, portfolio, chunk_size=DEFAULT_CHUNK_SIZE, clear=True):
+    """
+    Bulk-inserts a generated portfolio through the app's Dexie instance.
+
+    The page must have been opened with the expose-db init script (see
+    seeded_page). Returns {table: seconds} insert timings.
+    """
+    page.wait_for_function("() => !!window.__docpulseDb")
+    timings = {}
+    for table in TABLES:
+        rows = portfolio.get(table, [])
+        with step(f"seed {table} ({len(rows)} rows)"):
+            start = time.perf_counter()
+            if clear:
+                page.evaluate("(table) => window.__docpulseDb[table].clear()", table)
+            for offset in range(0, len(rows), chunk_size):
+                page.evaluate(
+                    "([table, rows]) => window.__docpulseDb[table].bulkPut(rows)",
+                    [table, rows[offset:offset + chunk_size]],
+                )
+            timings[table] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+@contextmanager
+def seeded_page(browser=None, scale="1k", seed=42, view="dashboard", chunk_size=DEFAULT_CHUNK_SIZE,
+                portfolio=None, **context_options):
+    """Yields a page whose database holds a generated portfolio, opened on `view`."""
+    portfolio = portfolio or generate_portfolio(scale, seed)
+    with open_page(browser, **context_options) as page:
+        page.add_init_script(_EXPOSE_DB)
+        page.goto(f"{BASE_URL}/#{view}")
+        timings = seed_database(page, portfolio, chunk_size=chunk_size)
+        print(f"Seeded {portfolio['summary']['loans']} loans in {sum(timings.values()):.2f}s {timings}")
+        yield page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic LMA DocPulse portfolio.")
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k or a loan count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="JSON file to write")
+    args = parser.parse_args()
+
+    scale = args.scale if args.scale in SCALES else int(args.scale)
+    portfolio = generate_portfolio(scale, args.seed)
+    with open(args.out, "w") as f:
+        json.dump(portfolio, f)
+    print(f"Wrote {portfolio['summary']} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
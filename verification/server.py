@@ -0,0 +1,156 @@
+"""
+Managed preview server for the verification suite.
+
+Builds the Vite app once, serves the production bundle with `vite preview` on
+a free port, polls until it answers and tears it down afterwards. The URL is
+exported as DOCPULSE_BASE_URL so harness.BASE_URL (and every pool worker
+spawned after the server is up) points at it.
+
+Standalone use keeps a server running until Ctrl-C:
+
+    python verification/server.py [--no-build]
+"""
+import argparse
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+VERIFICATION_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(VERIFICATION_DIR)
+DIST_DIR = os.path.join(REPO_ROOT, "dist")
+# vite preview's default; a stable origin lets the saved auth state be reused
+PREFERRED_PORT = 4173
+
+
+def _npm_tool(name):
+    # Resolves npm.cmd / npx.cmd on Windows as well
+    path = shutil.which(name)
+    if path is None:
+        raise RuntimeError(f"'{name}' not found on PATH; Node.js is required to build the app.")
+    return path
+
+
+def free_port(preferred=PREFERRED_PORT):
+    for candidate in (preferred, 0):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            try:
+                s.bind(("127.0.0.1", candidate))
+            except OSError:
+                continue
+            return s.getsockname()[1]
+
+
+def build_app(extra_args=()):
+    """Runs `npm run build` once, producing the production bundle in dist/."""
+    print("Building production bundle...")
+    start = time.perf_counter()
+    cmd = [_npm_tool("npm"), "run", "build"]
+    if extra_args:
+        cmd += ["--", *extra_args]
+    subprocess.run(cmd, cwd=REPO_ROOT, check=True)
+    print(f"Build finished in {time.perf_counter() - start:.1f}s.")
+
+
+def wait_until_ready(url, proc=None, timeout=60.0, interval=0.1):
+    """Polls the URL until it returns 200, failing fast if the server process dies."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"Preview server exited with code {proc.returncode} before becoming ready.")
+        try:
+            with urllib.request.urlopen(url, timeout=interval * 10) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(interval)
+    raise TimeoutError(f"Preview server at {url} was not ready after {timeout:.0f}s.")
+
+
+def _stop(proc, timeout=10.0):
+    if proc.poll() is not None:
+        return
+    # npx forks the actual node process, so signal the whole group
+    if os.name == "nt":
+        proc.terminate()
+    else:
+        os.killpg(proc.pid, signal.SIGTERM)
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if os.name == "nt":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+
+
+@contextmanager
+def app_server(build=True, port=None, ready_timeout=60.0, build_args=()):
+    """
+    Yields the base URL of a preview server serving the production bundle.
+
+    The previous DOCPULSE_BASE_URL is restored on exit so nested or repeated
+    runs don't leak a dead URL into the environment.
+    """
+    if build or not os.path.isdir(DIST_DIR):
+        build_app(build_args)
+
+    port = port or free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    cmd = [_npm_tool("npx"), "vite", "preview", "--host", "127.0.0.1", "--port", str(port), "--strictPort"]
+
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        cmd,
+        cwd=REPO_ROOT,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+        start_new_session=(os.name != "nt"),
+    )
+    previous_url = os.environ.get("DOCPULSE_BASE_URL")
+    try:
+        start = time.perf_counter()
+        try:
+            wait_until_ready(base_url + "/", proc=proc, timeout=ready_timeout)
+        except (RuntimeError, TimeoutError):
+            log.seek(0)
+            print(log.read().decode(errors="replace"))
+            raise
+        print(f"Preview server ready at {base_url} in {time.perf_counter() - start:.2f}s.")
+
+        os.environ["DOCPULSE_BASE_URL"] = base_url
+        yield base_url
+    finally:
+        _stop(proc)
+        log.close()
+        if previous_url is None:
+            os.environ.pop("DOCPULSE_BASE_URL", None)
+        else:
+            os.environ["DOCPULSE_BASE_URL"] = previous_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and serve the production bundle for verification.")
+    parser.add_argument("--no-build", action="store_true", help="serve the existing dist/ without rebuilding")
+    parser.add_argument("--port", type=int, help="port to serve on (default: a free port)")
+    args = parser.parse_args()
+
+    with app_server(build=not args.no_build, port=args.port) as url:
+        print(f"Serving {url} - set DOCPULSE_BASE_URL={url} to point standalone scripts at it. Ctrl-C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Screenshot baseline store with perceptual diffing.
+
+`snapshot(page, name)` replaces `page.screenshot(path=...)` in the scripts.
+The capture itself has to happen on the test thread (Playwright's sync API is
+not thread-safe), but it stays in memory: hashing, PNG decoding, diffing and
+any disk writes run on a background thread while the test carries on.
+
+Baselines are keyed by name, viewport and dataset:
+
+    verification/baselines/<dataset>/<name>@<width>x<height>.png (+ .json with its sha256)
+
+A capture whose sha256 matches the baseline is accepted without decoding or
+writing anything. Otherwise both images are compared perceptually (Pillow is
+only needed for this step): a light blur absorbs anti-aliasing, and the
+capture fails when more than `max_diff_ratio` of pixels differ in luminance
+by more than `pixel_threshold`. Failures leave <key>.actual.png and
+<key>.diff.png under verification/snapshot_diffs/ for review.
+
+Every name may be captured once per run, since two screens sharing a key
+would each fail against the other's baseline. run_all.py shares the names
+claimed so far across its workers through DOCPULSE_SNAPSHOT_CLAIMS_DIR.
+
+Missing baselines are recorded as new. Set DOCPULSE_UPDATE_SNAPSHOTS=1 (or
+run_all.py --update-snapshots) to accept changed captures as the new baseline.
+"""
+import atexit
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+VERIFICATION_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.environ.get("DOCPULSE_SNAPSHOT_DIR", os.path.join(VERIFICATION_DIR, "baselines"))
+DIFF_DIR = os.path.join(VERIFICATION_DIR, "snapshot_diffs")
+DEFAULT_DATASET = os.environ.get("DOCPULSE_SNAPSHOT_DATASET", "default")
+
+PIXEL_THRESHOLD = 24       # 0-255 luminance difference that counts as a changed pixel
+MAX_DIFF_RATIO = 0.002     # share of changed pixels tolerated before a capture fails
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="snapshots")
+_pending = []
+_lock = threading.Lock()
+_claimed = set()
+
+
+class SnapshotMismatch(AssertionError):
+    pass
+
+
+def _update_mode():
+    return os.environ.get("DOCPULSE_UPDATE_SNAPSHOTS", "") not in ("", "0", "false")
+
+
+def _key(name, viewport, dataset):
+    size = f"{viewport['width']}x{viewport['height']}" if viewport else "auto"
+    return os.path.join(dataset, f"{name}@{size}")
+
+
+def _claim(key):
+    """Raises ValueError if the key was already captured in this run."""
+    with _lock:
+        if key in _claimed:
+            raise ValueError(f"Snapshot {key} is taken twice in this run; give each capture its own name")
+        _claimed.add(key)
+    claims_dir = os.environ.get("DOCPULSE_SNAPSHOT_CLAIMS_DIR")
+    if not claims_dir:
+        return
+    path = os.path.join(claims_dir, key.replace(os.sep, "__"))
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise ValueError(f"Snapshot {key} is taken twice in this run; give each capture its own name") from None
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _save_baseline(key, png, digest):
+    base = os.path.join(BASELINE_DIR, key)
+    _write_atomic(base + ".png", png)
+    _write_atomic(base + ".json", json.dumps({"sha256": digest}).encode())
+
+
+def _baseline_digest(key):
+    try:
+        with open(os.path.join(BASELINE_DIR, key + ".json")) as f:
+            return json.load(f)["sha256"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def perceptual_diff(expected_png, actual_png, pixel_threshold=PIXEL_THRESHOLD):
+    """Returns (changed pixel ratio, diff image) or (1.0, None) when the sizes differ."""
+    try:
+        from PIL import Image, ImageChops, ImageFilter
+    except ImportError as e:
+        raise RuntimeError("Pillow is required to diff snapshots: pip install Pillow") from e
+
+    expected = Image.open(io.BytesIO(expected_png)).convert("RGB")
+    actual = Image.open(io.BytesIO(actual_png)).convert("RGB")
+    if expected.size != actual.size:
+        return 1.0, None
+
+    def luminance(image):
+        return image.convert("L").filter(ImageFilter.GaussianBlur(1))
+
+    diff = ImageChops.difference(luminance(expected), luminance(actual))
+    histogram = diff.histogram()
+    changed = sum(histogram[pixel_threshold + 1:])
+    ratio = changed / (expected.size[0] * expected.size[1])
+
+    # Changed pixels in red over a dimmed copy of the capture
+    mask = diff.point(lambda v: 255 if v > pixel_threshold else 0)
+    overlay = Image.blend(actual, Image.new("RGB", actual.size), 0.6)
+    overlay.paste((255, 0, 64), mask=mask)
+    return ratio, overlay
+
+
+def _compare(key, png, pixel_threshold, max_diff_ratio):
+    try:
+        return _compare_to_baseline(key, png, pixel_threshold, max_diff_ratio)
+    except Exception as e:
+        return {"key": key, "status": "error", "reason": repr(e)}
+
+
+def _compare_to_baseline(key, png, pixel_threshold, max_diff_ratio):
+    digest = hashlib.sha256(png).hexdigest()
+    baseline_digest = _baseline_digest(key)
+    if baseline_digest == digest:
+        return {"key": key, "status": "unchanged"}
+    if baseline_digest is None:
+        _save_baseline(key, png, digest)
+        return {"key": key, "status": "new"}
+
+    with open(os.path.join(BASELINE_DIR, key + ".png"), "rb") as f:
+        expected = f.read()
+    ratio, overlay = perceptual_diff(expected, png, pixel_threshold)
+    if _update_mode():
+        _save_baseline(key, png, digest)
+        return {"key": key, "status": "updated", "ratio": round(ratio, 5)}
+    if ratio <= max_diff_ratio:
+        # Baselines are only replaced explicitly, so small drift can't accumulate
+        return {"key": key, "status": "similar", "ratio": round(ratio, 5)}
+
+    base = os.path.join(DIFF_DIR, key)
+    _write_atomic(base + ".actual.png", png)
+    if overlay is not None:
+        buffer = io.BytesIO()
+        overlay.save(buffer, format="PNG")
+        _write_atomic(base + ".diff.png", buffer.getvalue())
+    reason = "size changed" if overlay is None else f"{ratio:.2%} of pixels differ (limit {max_diff_ratio:.2%})"
+    return {"key": key, "status": "changed", "ratio": round(ratio, 5), "reason": reason}
+
+
+def snapshot(page, name, dataset=None, pixel_threshold=PIXEL_THRESHOLD, max_diff_ratio=MAX_DIFF_RATIO,
+             **screenshot_options):
+    """
+    Captures the page and queues the baseline comparison; returns a Future
+    with the result. Extra keyword arguments go to page.screenshot.
+    """
+    key = _key(name, page.viewport_size, dataset or DEFAULT_DATASET)
+    _claim(key)
+    screenshot_options.setdefault("animations", "disabled")
+    screenshot_options.setdefault("caret", "hide")
+    png = page.screenshot(**screenshot_options)
+    future = _executor.submit(_compare, key, png, pixel_threshold, max_diff_ratio)
+    with _lock:
+        _pending.append(future)
+    return future
+
+
+def flush():
+    """Waits for queued comparisons and returns their results."""
+    with _lock:
+        futures = list(_pending)
+        _pending.clear()
+    return [future.result() for future in futures]
+
+
+def check():
+    """Flushes the queue and raises SnapshotMismatch if any capture regressed."""
+    results = flush()
+    failures = [r for r in results if r["status"] in ("changed", "error")]
+    if failures:
+        raise SnapshotMismatch("Snapshot regressions:\n" + "\n".join(
+            f"  {r['key']}: {r['reason']}" for r in failures
+        ))
+    return results
+
+
+def summarize(results):
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return counts
+
+
+@atexit.register
+def _report_standalone():
+    results = flush()
+    if results:
+        print(f"\nSnapshots: {summarize(results)}")
+        for r in results:
+            if r["status"] in ("changed", "error"):
+                print(f"  {r['key']}: {r['reason']}")
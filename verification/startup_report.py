@@ -0,0 +1,348 @@
+"""
+Cold-start network waterfall and bundle-cost report.
+
+Loads the landing page and the dashboard in fresh browser contexts (empty
+HTTP cache, HAR recording on) and reports, per target:
+
+  - a request waterfall: start offset, duration, transferred bytes and the
+    chunk or third-party origin each request belongs to
+  - bundle cost by dependency: each JS chunk's bytes split across the npm
+    packages it contains, using the build's source maps
+  - FCP, DOMContentLoaded, load and time-to-interactive (the first 5s window
+    after FCP with no long task and at most two requests in flight, as
+    Lighthouse defines it)
+
+The bundle is built with hidden source maps (not referenced from the JS) so
+dependencies can be attributed without changing what the browser loads.
+Pass --compare with a previous report to see the build-to-build deltas.
+
+    python verification/startup_report.py --out verification/startup/latest.json
+    python verification/startup_report.py --compare verification/startup/previous.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from urllib.parse import urlparse
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+import auth_fixture
+import harness
+from auth_fixture import ensure_auth_state
+from harness import shared_browser
+from server import DIST_DIR, app_server
+from waits import wait_for_condition
+
+TARGETS = {
+    "landing": {"path": "/", "ready": "text=Document Intelligence", "auth": False},
+    "dashboard": {"path": "/#dashboard", "ready": "text=Compliance Trend", "auth": True},
+}
+QUIET_WINDOW_MS = 5000
+MAX_INFLIGHT = 2
+
+_OBSERVERS = """
+window.__docpulseLongTasks = [];
+new PerformanceObserver((list) => {
+    for (const e of list.getEntries()) window.__docpulseLongTasks.push([e.startTime, e.startTime + e.duration]);
+}).observe({ type: 'longtask', buffered: true });
+"""
+
+# Evaluated once the page has been quiet for the whole window
+_TIMINGS = """
+([quietMs, maxInflight]) => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const fcpEntry = performance.getEntriesByName('first-contentful-paint')[0];
+    const fcp = fcpEntry ? fcpEntry.startTime : nav.domContentLoadedEventEnd;
+    const longTasks = window.__docpulseLongTasks;
+    const requests = performance.getEntriesByType('resource').map(r => [r.startTime, r.responseEnd]);
+    requests.push([nav.startTime, nav.responseEnd]);
+
+    const inflightAt = (t) => requests.filter(([s, e]) => s <= t && e > t).length;
+    // Candidate TTI points: FCP and the end of every long task after it
+    const candidates = [fcp, ...longTasks.map(([, end]) => end).filter(end => end > fcp)].sort((a, b) => a - b);
+    let tti = null;
+    for (const start of candidates) {
+        const end = start + quietMs;
+        const blocked = longTasks.some(([s, e]) => e > start && s < end);
+        if (blocked) continue;
+        // Network is quiet if concurrency never exceeds the limit inside the window
+        const points = [start, ...requests.flat().filter(t => t > start && t < end)];
+        if (points.every(t => inflightAt(t) <= maxInflight)) { tti = start; break; }
+    }
+    return {
+        fcp_ms: fcp,
+        dcl_ms: nav.domContentLoadedEventEnd,
+        load_ms: nav.loadEventEnd,
+        tti_ms: tti,
+        long_tasks: longTasks.length,
+        long_task_ms: longTasks.reduce((sum, [s, e]) => sum + (e - s), 0),
+        now_ms: performance.now(),
+    };
+}
+"""
+
+# True once a whole quiet window has passed since TTI
+_INTERACTIVE = f"""
+(args) => {{
+    const timings = ({_TIMINGS.strip()})(args);
+    return timings.tti_ms !== null && timings.now_ms >= timings.tti_ms + args[0];
+}}
+"""
+
+
+# --- Source-map attribution ------------------------------------------------
+
+_B64 = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def _vlq_segments(line):
+    for segment in line.split(","):
+        if not segment:
+            continue
+        values, shift, value = [], 0, 0
+        for char in segment:
+            digit = _B64[char]
+            value += (digit & 31) << shift
+            if digit & 32:
+                shift += 5
+            else:
+                values.append(-(value >> 1) if value & 1 else value >> 1)
+                shift = value = 0
+        yield values
+
+
+def package_of(source):
+    """npm package a source-map source belongs to, or the app/bundler bucket."""
+    path = source.replace("\\", "/")
+    if "node_modules/" in path:
+        parts = path.rsplit("node_modules/", 1)[1].split("/")
+        return "/".join(parts[:2]) if parts[0].startswith("@") else parts[0]
+    if path.startswith("\0") or "vite/" in path or path.startswith("vite"):
+        return "(vite runtime)"
+    return "(app)"
+
+
+def attribute_chunk(js_path):
+    """Returns {package: generated bytes} for a built chunk, from its .map file."""
+    map_path = js_path + ".map"
+    if not os.path.exists(map_path):
+        return None
+    with open(js_path, encoding="utf-8", errors="replace") as f:
+        lines = f.read().split("\n")
+    with open(map_path) as f:
+        source_map = json.load(f)
+    packages = [package_of(s) for s in source_map["sources"]]
+
+    sizes = {}
+    source = 0
+    for line_no, mapping in enumerate(source_map["mappings"].split(";")):
+        if line_no >= len(lines):
+            break
+        line = lines[line_no]
+        column = 0
+        spans = []
+        for values in _vlq_segments(mapping):
+            column += values[0]
+            if len(values) >= 4:
+                source += values[1]
+                spans.append((column, packages[source]))
+            else:
+                spans.append((column, "(unmapped)"))
+        for i, (start, package) in enumerate(spans):
+            end = spans[i + 1][0] if i + 1 < len(spans) else len(line)
+            # Column offsets are UTF-16 units; close enough to bytes for minified ASCII output
+            sizes[package] = sizes.get(package, 0) + max(0, end - start)
+    return sizes
+
+
+def bundle_attribution(dist_dir=DIST_DIR):
+    """Maps built asset file names to their per-package byte split."""
+    chunks = {}
+    for js_path in glob.glob(os.path.join(dist_dir, "assets", "*.js")):
+        sizes = attribute_chunk(js_path)
+        if sizes:
+            chunks[os.path.basename(js_path)] = sizes
+    return chunks
+
+
+# --- Capture ---------------------------------------------------------------
+
+def _label(url, base_url):
+    parsed = urlparse(url)
+    if parsed.netloc == urlparse(base_url).netloc:
+        return parsed.path.rsplit("/", 1)[-1] or "(document)"
+    return parsed.netloc
+
+
+def _har_entries(har_path, base_url):
+    with open(har_path) as f:
+        entries = json.load(f)["log"]["entries"]
+    if not entries:
+        return []
+    origin = min(datetime.fromisoformat(e["startedDateTime"].replace("Z", "+00:00")) for e in entries)
+    waterfall = []
+    for e in entries:
+        started = datetime.fromisoformat(e["startedDateTime"].replace("Z", "+00:00"))
+        response = e["response"]
+        transferred = response.get("_transferSize", -1)
+        if transferred is None or transferred < 0:
+            transferred = max(0, response.get("bodySize", 0)) + max(0, response.get("headersSize", 0))
+        waterfall.append({
+            "url": e["request"]["url"],
+            "label": _label(e["request"]["url"], base_url),
+            "third_party": urlparse(e["request"]["url"]).netloc != urlparse(base_url).netloc,
+            "type": response.get("content", {}).get("mimeType", "").split(";")[0],
+            "status": response.get("status"),
+            "start_ms": round((started - origin).total_seconds() * 1000, 1),
+            "duration_ms": round(e.get("time", 0), 1),
+            "wait_ms": round(max(0, e.get("timings", {}).get("wait", 0)), 1),
+            "bytes": transferred,
+        })
+    return sorted(waterfall, key=lambda r: r["start_ms"])
+
+
+def _wait_until_interactive(page, quiet_ms, timeout_ms=60000):
+    """Waits until the page has been free of long tasks and network bursts for the quiet window."""
+    try:
+        wait_for_condition(page, f"interactive ({quiet_ms}ms quiet)", _INTERACTIVE,
+                           arg=[quiet_ms, MAX_INFLIGHT], timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        pass  # Report what was measured; tti_ms stays null
+    return page.evaluate(_TIMINGS, [quiet_ms, MAX_INFLIGHT])
+
+
+def capture(browser, base_url, name, target, chunks, quiet_ms=QUIET_WINDOW_MS):
+    context_options = {}
+    if target["auth"]:
+        context_options["storage_state"] = ensure_auth_state(browser)
+    with tempfile.TemporaryDirectory() as tmp:
+        har_path = os.path.join(tmp, f"{name}.har")
+        context = browser.new_context(record_har_path=har_path, record_har_content="omit", **context_options)
+        try:
+            context.add_init_script(_OBSERVERS)
+            if target["auth"]:
+                # Keep the tutorial overlay out of the cold load
+                view = target["path"].lstrip("/#")
+                context.add_init_script(f"localStorage.setItem('tutorial_seen_v4_{view}', 'true');")
+            page = context.new_page()
+            page.goto(base_url + target["path"])
+            page.wait_for_selector(target["ready"], timeout=30000)
+            timings = _wait_until_interactive(page, quiet_ms)
+        finally:
+            # The HAR is written when the context closes
+            context.close()
+        waterfall = _har_entries(har_path, base_url)
+
+    by_dependency = {}
+    for request in waterfall:
+        split = chunks.get(request["label"])
+        if split and request["bytes"]:
+            total = sum(split.values())
+            for package, size in split.items():
+                by_dependency[package] = by_dependency.get(package, 0) + request["bytes"] * size / total
+        elif request["third_party"]:
+            key = f"(third party) {request['label']}"
+            by_dependency[key] = by_dependency.get(key, 0) + request["bytes"]
+
+    return {
+        **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in timings.items() if k != "now_ms"},
+        "requests": len(waterfall),
+        "bytes": sum(r["bytes"] for r in waterfall),
+        "js_bytes": sum(r["bytes"] for r in waterfall if "javascript" in r["type"]),
+        "waterfall": waterfall,
+        "by_dependency": {k: round(v) for k, v in sorted(by_dependency.items(), key=lambda kv: -kv[1])},
+    }
+
+
+# --- Reporting -------------------------------------------------------------
+
+def _kb(n):
+    return f"{n / 1024:8.1f} KB"
+
+
+def print_target(name, result, top=12, width=40):
+    tti = f"{result['tti_ms']:.0f}ms" if result["tti_ms"] is not None else "not reached"
+    print(f"\n=== {name}: TTI {tti}, FCP {result['fcp_ms']:.0f}ms, load {result['load_ms']:.0f}ms, "
+          f"{result['requests']} requests, {result['bytes'] / 1024:.0f} KB "
+          f"({result['js_bytes'] / 1024:.0f} KB JS), {result['long_tasks']} long tasks ===")
+    span = max((r["start_ms"] + r["duration_ms"] for r in result["waterfall"]), default=1) or 1
+    for r in result["waterfall"]:
+        start = int(r["start_ms"] / span * width)
+        length = max(1, int(r["duration_ms"] / span * width))
+        bar = " " * start + "#" * length
+        print(f"  {bar:<{width + 1}} {r['start_ms']:7.0f}ms {r['duration_ms']:6.0f}ms {_kb(r['bytes'])}  {r['label'][:50]}")
+    if result["by_dependency"]:
+        print(f"  --- bytes by dependency (top {top}) ---")
+        for package, size in list(result["by_dependency"].items())[:top]:
+            print(f"  {_kb(size)}  {package}")
+
+
+def print_comparison(current, previous):
+    print("\n=== Change since previous report ===")
+    for name, result in current["targets"].items():
+        before = previous.get("targets", {}).get(name)
+        if not before:
+            continue
+        for metric in ("tti_ms", "fcp_ms", "load_ms", "bytes", "js_bytes", "requests"):
+            a, b = before.get(metric), result.get(metric)
+            if a is None or b is None:
+                continue
+            delta = b - a
+            pct = f" ({delta / a:+.1%})" if a else ""
+            print(f"  {name:10} {metric:9} {a:>12.0f} -> {b:>12.0f}  {delta:+.0f}{pct}")
+        deps = set(before["by_dependency"]) | set(result["by_dependency"])
+        moved = sorted(deps, key=lambda d: -abs(result["by_dependency"].get(d, 0) - before["by_dependency"].get(d, 0)))
+        for dep in moved[:5]:
+            delta = result["by_dependency"].get(dep, 0) - before["by_dependency"].get(dep, 0)
+            if delta:
+                print(f"  {name:10} {dep:30} {delta / 1024:+.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start network cost and time-to-interactive.")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated subset of targets")
+    parser.add_argument("--out", help="write the report JSON here")
+    parser.add_argument("--compare", help="previous report JSON to diff against")
+    parser.add_argument("--quiet-ms", type=int, default=QUIET_WINDOW_MS, help="TTI quiet window")
+    parser.add_argument("--base-url", help="use an already running app (no dependency attribution unless dist/ matches)")
+    parser.add_argument("--no-build", action="store_true", help="serve the existing dist/ without rebuilding")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["DOCPULSE_BASE_URL"] = args.base_url
+        server = nullcontext(args.base_url)
+    else:
+        server = app_server(build=not args.no_build, build_args=("--sourcemap", "hidden"))
+
+    report = {"meta": {"timestamp": int(time.time()), "quiet_ms": args.quiet_ms}, "targets": {}}
+    with server as base_url:
+        # The helpers read DOCPULSE_BASE_URL at import time, before the server started
+        harness.BASE_URL = auth_fixture.BASE_URL = base_url
+        report["meta"]["base_url"] = base_url
+        chunks = bundle_attribution()
+        if not chunks:
+            print("No source maps in dist/; bytes are reported per chunk only.")
+        with shared_browser() as browser:
+            for name in args.targets.split(","):
+                result = capture(browser, base_url, name, TARGETS[name], chunks, args.quiet_ms)
+                report["targets"][name] = result
+                print_target(name, result)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
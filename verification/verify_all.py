@@ -1,15 +1,13 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_all_views_realtime():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_all_views_realtime(browser=None):
+    with open_page(browser) as page:
 
         try:
             # 1. Dashboard
-            page.goto("http://localhost:3000/#dashboard")
+            page.goto(f"{BASE_URL}/#dashboard")
             page.wait_for_selector("text=Compliance Score", timeout=10000)
             print("Dashboard loaded.")
 
@@ -19,10 +17,10 @@ def verify_all_views_realtime():
 
             # Screenshot Dashboard
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/dashboard_final.png")
+            snapshot(page, "dashboard_final")
 
             # 2. Portfolio Analytics
-            page.goto("http://localhost:3000/#analytics")
+            page.goto(f"{BASE_URL}/#analytics")
             page.wait_for_selector("text=Portfolio Analytics", timeout=10000)
 
             # Check for aggregated values (Total Exposure)
@@ -31,10 +29,10 @@ def verify_all_views_realtime():
             # 12.5M + 4.2M + 25.0M + 3.2M + 12.25M + 1.1M = 58.25M
             page.wait_for_selector("text=$58.3M", timeout=5000)
             print("Analytics loaded and calculated correctly.")
-            page.screenshot(path="verification/analytics_final.png")
+            snapshot(page, "analytics_final")
 
             # 3. Compliance
-            page.goto("http://localhost:3000/#compliance")
+            page.goto(f"{BASE_URL}/#compliance")
             page.wait_for_selector("text=Compliance & Risk", timeout=10000)
 
             # Check Score again
@@ -45,29 +43,28 @@ def verify_all_views_realtime():
             # Total = 2
             page.wait_for_selector("text=2", timeout=5000)
             print("Compliance loaded and calculated correctly.")
-            page.screenshot(path="verification/compliance_final.png")
+            snapshot(page, "compliance_final")
 
             # 4. Loan Reviews List
-            page.goto("http://localhost:3000/#loan_reviews")
+            page.goto(f"{BASE_URL}/#loan_reviews")
             page.wait_for_selector("text=Loan Reviews", timeout=10000)
 
             # Check for specific loan
             page.wait_for_selector("text=Omega Holdings", timeout=5000)
             print("Loan List loaded.")
-            page.screenshot(path="verification/loan_list_final.png")
+            snapshot(page, "loan_list_final")
 
             # 5. Loan Review Detail
             page.click("text=Omega Holdings")
             page.wait_for_selector("text=Facility Details", timeout=10000)
             page.wait_for_selector("text=Term Loan A", timeout=5000)
             print("Loan Detail loaded.")
-            page.screenshot(path="verification/loan_detail_final.png")
+            snapshot(page, "loan_detail_final")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_final.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     verify_all_views_realtime()
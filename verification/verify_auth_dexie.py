@@ -1,73 +1,32 @@
-import time
-from playwright.sync_api import sync_playwright
+from harness import open_page
+from auth_fixture import log_in, sign_up
+from snapshots import snapshot
 
-def test_auth_and_dashboard():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-
-        # Wait for the server to be ready
-        print("Waiting for server to be ready...")
-        time.sleep(2)
+def test_auth_and_dashboard(browser=None):
+    # This script exercises the real signup/login flow, so it deliberately
+    # does not start from the saved authenticated state.
+    with open_page(browser) as page:
 
         try:
-            # 1. Navigate to the app (defaults to landing page)
-            print("Navigating to app...")
-            page.goto("http://localhost:3000")
-            page.wait_for_load_state("networkidle")
-
-            # Take screenshot of Landing page
-            page.screenshot(path="verification/landing_page.png")
-            print("Landing page screenshot taken.")
-
-            # Click "Sign In" to go to Auth view
-            print("Clicking Sign In...")
-            page.get_by_text("Sign In", exact=True).click()
-            time.sleep(1)
-
-            # Take screenshot of Auth page
-            page.screenshot(path="verification/auth_page.png")
-            print("Auth page screenshot taken.")
-
-            # 2. Signup
-            print("Switching to signup...")
-            # Click "Sign up" button.
-            page.get_by_text("Sign up", exact=True).click()
-            time.sleep(1)
-
-            print("Filling signup form...")
-            # Fill name, email, password
-            page.get_by_placeholder("John Doe").fill("Test User")
-            page.get_by_placeholder("name@company.com").fill("test@example.com")
-            page.get_by_placeholder("••••••••").fill("password123")
-
-            # Click "Create Account"
-            page.get_by_role("button", name="Create Account").click()
-
-            # Wait for success toast or mode switch
-            time.sleep(2)
+            # 1. Signup (starts on the landing page and goes through AuthView)
+            print("Signing up...")
+            sign_up(page, "Test User", "test@example.com", "password123")
 
             # Take screenshot after signup (should be back to login or showing success)
-            page.screenshot(path="verification/after_signup.png")
+            snapshot(page, "after_signup")
             print("After signup screenshot taken.")
 
-            # 3. Login
+            # 2. Login
+            # App.tsx: onComplete: () => setView('dashboard')
             print("Logging in...")
-            # Should be in login mode now
-            page.get_by_placeholder("name@company.com").fill("test@example.com")
-            page.get_by_placeholder("••••••••").fill("password123")
+            log_in(page, "test@example.com", "password123")
 
-            page.get_by_role("button", name="Sign In").click()
-
-            # Wait for navigation to dashboard
-            # App.tsx: onComplete: () => setView('dashboard')
             # Dashboard has "Compliance Trend" text
             print("Waiting for dashboard...")
             page.wait_for_selector("text=Compliance Trend", timeout=10000)
 
             # Take screenshot of Dashboard
-            page.screenshot(path="verification/dashboard.png")
+            snapshot(page, "dashboard")
             print("Dashboard screenshot taken.")
 
             # Verify data presence (Dexie loaded)
@@ -80,8 +39,7 @@ def test_auth_and_dashboard():
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     test_auth_and_dashboard()
@@ -1,12 +1,12 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_auth_update():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def verify_auth_update(browser=None):
+    with open_page(browser) as page:
 
         # 1. Start at Landing Page
-        page.goto("http://localhost:3000/#auth")
+        page.goto(f"{BASE_URL}/#auth")
 
         # 2. Check for Google button
         expect(page.get_by_text("Google")).to_be_visible()
@@ -18,10 +18,8 @@ def verify_auth_update():
         # 4. Check for absence of Microsoft button (since we replaced it)
         expect(page.get_by_text("Microsoft")).not_to_be_visible()
 
-        page.screenshot(path="verification/auth_google_update.png")
+        snapshot(page, "auth_google_update")
         print("Auth - Google update verified.")
 
-        browser.close()
-
 if __name__ == "__main__":
     verify_auth_update()
@@ -1,12 +1,12 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_auth_view():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def verify_auth_view(browser=None):
+    with open_page(browser) as page:
 
         # 1. Start at Landing Page
-        page.goto("http://localhost:3000/#landing")
+        page.goto(f"{BASE_URL}/#landing")
 
         # 2. Navigate to Auth (Sign In)
         page.get_by_text("Sign In").click()
@@ -14,17 +14,15 @@ def verify_auth_view():
         # Verify Auth Page Load
         expect(page.get_by_text("Welcome back")).to_be_visible()
         expect(page.get_by_text("Secure access to your portfolio intelligence")).to_be_visible()
-        page.screenshot(path="verification/auth_login.png")
+        snapshot(page, "auth_login")
         print("Auth - Login verified.")
 
         # 3. Toggle to Signup
         page.get_by_text("Sign up").click()
         expect(page.get_by_role("heading", name="Create account")).to_be_visible()
         expect(page.get_by_text("Join the future of syndicated loan management")).to_be_visible()
-        page.screenshot(path="verification/auth_signup.png")
+        snapshot(page, "auth_signup")
         print("Auth - Signup verified.")
 
-        browser.close()
-
 if __name__ == "__main__":
     verify_auth_view()
@@ -1,47 +1,23 @@
-import time
-from playwright.sync_api import sync_playwright
+from auth_fixture import authenticated_page
+from waits import wait_for_view, wait_for_visible
 
-def test_bg_color():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def test_bg_color(browser=None):
+    with authenticated_page(browser) as page:
 
         try:
-            # 1. Signup/Login
-            page.goto("http://localhost:3000")
-            page.wait_for_load_state("networkidle")
-
-            # Check if we are already logged in or need to sign in
-            if page.get_by_text("Sign In", exact=True).is_visible():
-                page.get_by_text("Sign In", exact=True).click()
-                time.sleep(1)
-                page.get_by_text("Sign up", exact=True).click()
-                time.sleep(1)
-
-                timestamp = int(time.time())
-                page.get_by_placeholder("John Doe").fill(f"Tester {timestamp}")
-                page.get_by_placeholder("name@company.com").fill(f"test{timestamp}@example.com")
-                page.get_by_placeholder("••••••••").fill("password123")
-                page.get_by_role("button", name="Create Account").click()
-                time.sleep(2)
-
-                # Login
-                page.get_by_placeholder("name@company.com").fill(f"test{timestamp}@example.com")
-                page.get_by_placeholder("••••••••").fill("password123")
-                page.get_by_role("button", name="Sign In").click()
-                time.sleep(3)
-
-            # 2. Navigate to Edit Profile
+            # 1. Navigate to Edit Profile
             # Go to Profile first
             page.get_by_title("View Profile").click()
-            time.sleep(2)
+            wait_for_view(page, "profile")
+            wait_for_visible(page.get_by_role("button", name="Edit Profile"), "profile loaded")
 
             # Click Edit Profile
             page.get_by_role("button", name="Edit Profile").click()
-            time.sleep(2)
+            wait_for_view(page, "edit_profile")
+            # The form is filled from a users live query once it resolves
+            page.wait_for_function("() => document.querySelector(\"input[name='name']\")?.value !== ''")
 
-            # 3. Check Background Color of Input
+            # 2. Check Background Color of Input
             # Select the Full Name input
             input_locator = page.locator("input[name='name']")
 
@@ -61,8 +37,7 @@ def test_bg_color():
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_bg_color.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     test_bg_color()
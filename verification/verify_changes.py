@@ -1,19 +1,18 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from waits import wait_for_app_mounted
+from snapshots import snapshot
 
-def verify_document_vault():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_document_vault(browser=None):
+    with open_page(browser) as page:
 
         try:
             # Go to the app
-            page.goto("http://localhost:3000")
+            page.goto(BASE_URL)
 
-            # Navigate to vault via hash (wait a bit for app to hydrate)
-            page.wait_for_timeout(2000)
-            page.goto("http://localhost:3000/#vault")
+            # Navigate to vault via hash (once the app has mounted)
+            wait_for_app_mounted(page)
+            page.goto(f"{BASE_URL}/#vault")
 
             # Wait for content
             try:
@@ -33,18 +32,17 @@ def verify_document_vault():
 
             # Take screenshot of Vault
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/vault_empty.png")
+            snapshot(page, "vault_empty")
 
             # Go to upload
-            page.goto("http://localhost:3000/#upload")
+            page.goto(f"{BASE_URL}/#upload")
             page.wait_for_selector("text=Upload Loan Agreements", timeout=10000)
-            page.screenshot(path="verification/upload_page.png")
+            snapshot(page, "upload_page")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     verify_document_vault()
@@ -1,19 +1,18 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from waits import wait_for_app_mounted
+from snapshots import snapshot
 
-def verify_dashboard_data():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_dashboard_data(browser=None):
+    with open_page(browser) as page:
 
         try:
             # Go to the app
-            page.goto("http://localhost:3000")
-            page.wait_for_timeout(1000)
+            page.goto(BASE_URL)
+            wait_for_app_mounted(page)
 
             # Navigate to Dashboard (default)
-            page.goto("http://localhost:3000/#dashboard")
+            page.goto(f"{BASE_URL}/#dashboard")
             page.wait_for_selector("text=Compliance Trend", timeout=10000)
 
             # Check for Stat Cards - Values should match initial mock data
@@ -47,13 +46,12 @@ def verify_dashboard_data():
 
             # Take screenshot
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/dashboard_realtime.png")
+            snapshot(page, "dashboard_realtime")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_dashboard.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     verify_dashboard_data()
@@ -1,12 +1,12 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_edit_profile():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def verify_edit_profile(browser=None):
+    with open_page(browser) as page:
 
         # 1. Start at Profile Page
-        page.goto("http://localhost:3000/#profile")
+        page.goto(f"{BASE_URL}/#profile")
 
         # 2. Click Edit Profile
         # We need to wait for the page to render the button
@@ -25,10 +25,8 @@ def verify_edit_profile():
 
         expect(page.get_by_text("Python")).to_be_visible()
 
-        page.screenshot(path="verification/edit_profile.png")
+        snapshot(page, "edit_profile")
         print("Edit Profile verified.")
 
-        browser.close()
-
 if __name__ == "__main__":
     verify_edit_profile()
@@ -0,0 +1,67 @@
+import statistics
+
+from seed_data import generate_portfolio, seeded_page
+from waits import wait_for_view, wait_for_visible
+
+LOANS = 100_000
+# One frame at 60Hz
+MAX_LOOKUP_MS = 16
+
+_EXPOSE_SEARCH = "window.__DOCPULSE_EXPOSE_SEARCH__ = true;"
+
+_TIME_LOOKUPS = """
+async (queries) => {
+    const { quickSearch } = window.__docpulseQuickSearch;
+    const timings = [];
+    for (const query of queries) {
+        const start = performance.now();
+        await quickSearch(query);
+        timings.push(performance.now() - start);
+    }
+    return timings;
+}
+"""
+
+
+def verify_global_search(browser=None):
+    """
+    Seeds 100k loans and their documents, waits for the search index to catch
+    up and times lookups for ids, counterparties, loan types and document
+    names. The median has to fit in a frame, and Ctrl+K search must find a
+    loan by the digits of its id. A rare counterparty next to a common word
+    ("term") must still find its loan, however many term loans sort first.
+    """
+    portfolio = generate_portfolio(LOANS)
+    loan = portfolio["loans"][LOANS // 2]
+    rare = portfolio["loans"][LOANS // 3]
+    rare["counterparty"] = "Zephyrine Holdings"
+    rare["type"] = "Term Loan B"
+    records = len(portfolio["loans"]) + len(portfolio["docs"])
+
+    with seeded_page(browser, portfolio=portfolio, view="dashboard") as page:
+        page.add_init_script(_EXPOSE_SEARCH)
+        page.reload()
+        wait_for_view(page, "dashboard")
+        page.wait_for_function("(n) => window.__docpulseDb.quickSearch.count().then(c => c === n)",
+                               arg=records, polling=1000, timeout=600000)
+
+        number = loan["id"].rsplit("-", 1)[1].lstrip("0")
+        queries = [number, loan["counterparty"].split()[0], "term loan", "rev", portfolio["docs"][0]["name"][:6], "zzz"] * 5
+        page.evaluate(_TIME_LOOKUPS, queries[:6])  # Warm up
+        timings = page.evaluate(_TIME_LOOKUPS, queries)
+        median = statistics.median(timings)
+        print(f"Quick search over {records} records: median {median:.1f}ms, max {max(timings):.1f}ms")
+        assert median < MAX_LOOKUP_MS, timings
+
+        found = page.evaluate("async (q) => (await window.__docpulseQuickSearch.quickSearch(q)).loans.map(l => l.id)",
+                              "term zephyrine")
+        assert rare["id"] in found, found
+
+        page.keyboard.press("Control+k")
+        page.fill("input[placeholder^='Search loans']", number)
+        wait_for_visible(page.get_by_text(loan["id"]).first, "loan found by id digits", timeout=5000)
+        print("Success: global search answers from the index within a frame.")
+
+
+if __name__ == "__main__":
+    verify_global_search()
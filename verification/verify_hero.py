@@ -1,17 +1,17 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def run():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto("http://localhost:3000")
+def verify_hero(browser=None):
+    with open_page(browser) as page:
+        page.goto(BASE_URL)
 
         # Wait for hero content to be visible
         expect(page.locator("text=Document Intelligence")).to_be_visible()
         expect(page.locator("text=Reimagined")).to_be_visible()
 
         # Take a screenshot of the hero section
-        page.screenshot(path="verification/hero.png", clip={"x": 0, "y": 0, "width": 1280, "height": 800})
+        snapshot(page, "hero", clip={"x": 0, "y": 0, "width": 1280, "height": 800})
 
         # Scroll to Advanced Feature section
         # We scroll down to find the text we inserted
@@ -21,8 +21,7 @@ def run():
 
         # Take a screenshot of the scanning feature
         # We can take a screenshot of the specific element or the viewport
-        page.screenshot(path="verification/advanced_feature.png")
+        snapshot(page, "advanced_feature")
 
-        browser.close()
-
-run()
+if __name__ == "__main__":
+    verify_hero()
@@ -0,0 +1,44 @@
+from seed_data import generate_portfolio, seeded_page
+from waits import wait_for_view, wait_for_visible
+
+# Counts full reads (getAll without a key) per object store
+_COUNT_FULL_READS = """
+window.__fullReads = {};
+const getAll = IDBObjectStore.prototype.getAll;
+IDBObjectStore.prototype.getAll = function (query, count) {
+    if (query === undefined || query === null) {
+        window.__fullReads[this.name] = (window.__fullReads[this.name] || 0) + 1;
+    }
+    return getAll.call(this, query, count);
+};
+"""
+
+
+def verify_live_store(browser=None):
+    """
+    Opens the Dashboard (which, with the Sidebar, reads the users, loans,
+    alerts and chartData tables) and renames one loan's counterparty. The
+    change must show up without re-reading the loans table: only the changed
+    row is fetched and patched into the shared snapshot.
+    """
+    portfolio = generate_portfolio("1k")
+    loan = portfolio["loans"][0]
+
+    with seeded_page(browser, portfolio=portfolio, view="dashboard") as page:
+        page.add_init_script(_COUNT_FULL_READS)
+        page.reload()
+        wait_for_view(page, "dashboard")
+        wait_for_visible(page.get_by_text(loan["id"]).first, "seeded loan", timeout=15000)
+
+        page.evaluate("() => { window.__fullReads = {}; }")
+        page.evaluate("(id) => window.__docpulseDb.loans.update(id, { counterparty: 'Renamed Holdings Ltd' })", loan["id"])
+        wait_for_visible(page.get_by_text("Renamed Holdings Ltd").first, "renamed counterparty", timeout=5000)
+
+        reads = page.evaluate("() => window.__fullReads")
+        print(f"Full table reads after one update: {reads}")
+        assert reads.get("loans", 0) == 0, reads
+        print("Success: one updated loan is patched into the shared snapshot.")
+
+
+if __name__ == "__main__":
+    verify_live_store()
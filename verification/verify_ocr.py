@@ -0,0 +1,88 @@
+import base64
+
+from harness import BASE_URL, open_page
+from pdf_corpus import LEADING, MARGIN_X, PAGE_HEIGHT, PAGE_WIDTH, TOP_Y, build_scanned_pdf, generate_agreement
+
+PAGES = 4
+# Pixels per PDF unit of the fake scans (about 150 DPI)
+SCAN_SCALE = 2
+
+_EXPOSE_ANALYZER = "window.__DOCPULSE_EXPOSE_ANALYZER__ = true;"
+
+# Draws each page's lines where build_pdf would place them and returns JPEGs
+_SCAN_PAGES = """
+([pages, layout]) => pages.map(lines => {
+    const { width, height, scale, marginX, topY, leading } = layout;
+    const canvas = document.createElement('canvas');
+    canvas.width = width * scale;
+    canvas.height = height * scale;
+    const context = canvas.getContext('2d');
+    context.fillStyle = 'white';
+    context.fillRect(0, 0, canvas.width, canvas.height);
+    context.fillStyle = 'black';
+    context.font = `${10 * scale}px Helvetica, Arial, sans-serif`;
+    lines.forEach((line, i) => context.fillText(line, marginX * scale, (height - topY + i * leading) * scale));
+    return canvas.toDataURL('image/jpeg', 0.9).split(',')[1];
+})
+"""
+
+_ANALYZE = """
+async (data) => {
+    const analyzer = window.__docpulseAnalyzer;
+    const bytes = Uint8Array.from(atob(data), c => c.charCodeAt(0));
+    const blob = new Blob([bytes], { type: 'application/pdf' });
+
+    const ocrUpdates = [];
+    let start = performance.now();
+    const result = await analyzer.analyzeInWorker(blob, {
+        onProgress: progress => { if (progress.ocr) ocrUpdates.push(progress.ocr.done); },
+    });
+    const firstMs = performance.now() - start;
+
+    // Same pages again: every page resolves from the OCR cache
+    start = performance.now();
+    const { pages } = await analyzer.extractWithOcr(blob);
+    const cachedMs = performance.now() - start;
+    return { result, ocrUpdates, firstMs, cachedMs, sources: pages.map(page => page.source) };
+}
+"""
+
+
+def verify_ocr(browser=None):
+    """
+    Renders a generated agreement to images and wraps them in a PDF without a
+    text layer. Analysis must OCR every page (reporting progress), find the
+    agreement's events of default and, on a second pass, read every page from
+    the per-page OCR cache.
+    """
+    page_lines, labels = generate_agreement(PAGES, seed=11)
+
+    with open_page(browser) as page:
+        page.add_init_script(_EXPOSE_ANALYZER)
+        page.goto(BASE_URL)
+        page.wait_for_function("() => !!window.__docpulseAnalyzer?.extractWithOcr")
+
+        layout = {"width": PAGE_WIDTH, "height": PAGE_HEIGHT, "scale": SCAN_SCALE,
+                  "marginX": MARGIN_X, "topY": TOP_Y, "leading": LEADING}
+        jpegs = page.evaluate(_SCAN_PAGES, [page_lines, layout])
+        scan = build_scanned_pdf([(base64.b64decode(jpeg), PAGE_WIDTH * SCAN_SCALE, PAGE_HEIGHT * SCAN_SCALE)
+                                  for jpeg in jpegs])
+
+        run = page.evaluate(_ANALYZE, base64.b64encode(scan).decode())
+        result = run["result"]
+        print(f"OCR of {PAGES} scanned pages: {run['firstMs']:.0f}ms, cached {run['cachedMs']:.0f}ms")
+
+        assert "Unable to extract text from document" not in result["riskFlags"], result["riskFlags"]
+        assert run["sources"] == ["ocr"] * PAGES, run["sources"]
+        assert run["ocrUpdates"] and run["ocrUpdates"][-1] == PAGES, run["ocrUpdates"]
+
+        expected = {event["type"] for event in labels["eventsOfDefault"]}
+        found = {event["type"] for event in result["eventsOfDefault"]}
+        print(f"Events of default found: {len(found & expected)}/{len(expected)}")
+        assert not expected or found & expected, (expected, found)
+        assert run["cachedMs"] < run["firstMs"] / 2, run
+        print("Success: scanned pages are OCRed and cached per page.")
+
+
+if __name__ == "__main__":
+    verify_ocr()
@@ -1,69 +1,35 @@
-import time
-from playwright.sync_api import sync_playwright
+from auth_fixture import TEST_USER, authenticated_page
+from waits import wait_for_record, wait_for_settled, wait_for_view, wait_for_visible
+from snapshots import snapshot
 
-def test_profile_update():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-
-        print("Waiting for server to be ready...")
-        time.sleep(2)
+def test_profile_update(browser=None):
+    with authenticated_page(browser) as page:
 
         try:
-            # 1. Signup/Login
-            print("Navigating to app...")
-            page.goto("http://localhost:3000")
-            page.wait_for_load_state("networkidle")
-
-            print("Clicking Sign In...")
-            page.get_by_text("Sign In", exact=True).click()
-            time.sleep(1)
-
-            print("Switching to signup...")
-            page.get_by_text("Sign up", exact=True).click()
-            time.sleep(1)
-
-            print("Creating test user for profile...")
-            # Use unique email to avoid conflict if DB persists
-            timestamp = int(time.time())
-            page.get_by_placeholder("John Doe").fill(f"Profile Tester {timestamp}")
-            page.get_by_placeholder("name@company.com").fill(f"profile{timestamp}@example.com")
-            page.get_by_placeholder("••••••••").fill("password123")
-
-            page.get_by_role("button", name="Create Account").click()
-            time.sleep(2)
-
-            print("Logging in...")
-            page.get_by_placeholder("name@company.com").fill(f"profile{timestamp}@example.com")
-            page.get_by_placeholder("••••••••").fill("password123")
-
-            page.get_by_role("button", name="Sign In").click()
-
-            print("Waiting for dashboard...")
-            time.sleep(3) # Wait for animation
-
-            # 2. Navigate to Profile
+            # 1. Navigate to Profile
             print("Navigating to Profile...")
             # Ideally via sidebar or header, but let's assume sidebar
             # Sidebar might be collapsed or open.
             # Profile link in sidebar footer
             page.get_by_title("View Profile").click()
-            time.sleep(2)
+            wait_for_view(page, "profile")
+            wait_for_visible(page.get_by_role("button", name="Edit Profile"), "profile loaded")
 
-            page.screenshot(path="verification/profile_initial.png")
+            snapshot(page, "profile_initial")
             print("Initial profile screenshot taken.")
 
             # Verify initial name
-            if page.get_by_text(f"Profile Tester {timestamp}").is_visible():
+            if page.get_by_text(TEST_USER["name"]).is_visible():
                 print("Initial profile name verified.")
             else:
                 print("Initial profile name NOT found.")
 
-            # 3. Edit Profile
+            # 2. Edit Profile
             print("Clicking Edit Profile...")
             page.get_by_role("button", name="Edit Profile").click()
-            time.sleep(2)
+            wait_for_view(page, "edit_profile")
+            # The form is filled from a users live query once it resolves
+            page.wait_for_function("() => document.querySelector(\"input[name='name']\")?.value !== ''")
 
             # Change Title and Bio
             print("Updating profile...")
@@ -74,11 +40,13 @@ def test_profile_update():
             print("Saving changes...")
             page.get_by_role("button", name="Save Changes").click()
 
-            # Wait for save (mock delay 800ms + timeout 1000ms)
-            time.sleep(3)
+            # Wait for the users row to commit, then for the redirect back to Profile
+            wait_for_record(page, "users", "title", "Chief Innovation Officer")
+            wait_for_view(page, "profile")
+            wait_for_settled(page)
 
-            # 4. Verify Updates
-            page.screenshot(path="verification/profile_updated.png")
+            # 3. Verify Updates
+            snapshot(page, "profile_updated")
             print("Updated profile screenshot taken.")
 
             if page.get_by_text("Chief Innovation Officer").is_visible():
@@ -94,8 +62,7 @@ def test_profile_update():
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_profile.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     test_profile_update()
@@ -1,12 +1,12 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_profile_to_edit_navigation():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def verify_profile_to_edit_navigation(browser=None):
+    with open_page(browser) as page:
 
         # 1. Start at Profile Page
-        page.goto("http://localhost:3000/#profile")
+        page.goto(f"{BASE_URL}/#profile")
 
         # 2. Click Edit Profile
         # We wait for the button to ensure page is loaded
@@ -18,10 +18,8 @@ def verify_profile_to_edit_navigation():
         expect(page.get_by_role("heading", name="Edit Profile")).to_be_visible()
         expect(page.get_by_text("Update your personal details")).to_be_visible()
 
-        page.screenshot(path="verification/profile_to_edit_flow.png")
+        snapshot(page, "profile_to_edit_flow")
         print("Navigation from Profile to Edit Profile verified.")
 
-        browser.close()
-
 if __name__ == "__main__":
     verify_profile_to_edit_navigation()
@@ -1,12 +1,12 @@
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_sidebar_signout():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def verify_sidebar_signout(browser=None):
+    with open_page(browser) as page:
 
         # 1. Start at Dashboard (Sidebar visible)
-        page.goto("http://localhost:3000/#dashboard")
+        page.goto(f"{BASE_URL}/#dashboard")
 
         # 2. Check for Sidebar user profile and Sign Out button
         # The sign out button has title="Sign Out"
@@ -20,10 +20,8 @@ def verify_sidebar_signout():
         expect(page.get_by_text("Welcome back")).to_be_visible()
         expect(page.get_by_text("Secure access to your portfolio intelligence")).to_be_visible()
 
-        page.screenshot(path="verification/sidebar_signout.png")
+        snapshot(page, "sidebar_signout")
         print("Sidebar sign-out verified.")
 
-        browser.close()
-
 if __name__ == "__main__":
     verify_sidebar_signout()
@@ -0,0 +1,99 @@
+from harness import BASE_URL, open_page
+from mock_openai import mock_openai, use_mock_openai
+from waits import DB_NAME, wait_for_record, wait_for_view, wait_for_visible
+
+# Generation is slowed down so the whole answer takes several seconds while
+# the first token still arrives after ~200ms
+TOKENS_PER_SEC = 12
+MAX_FIRST_TOKEN_MS = 1000
+
+_QUERIES = """
+async (dbName) => {
+    const db = await new Promise((resolve, reject) => {
+        const req = indexedDB.open(dbName);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+    try {
+        const store = db.transaction('queries', 'readonly').objectStore('queries');
+        return await new Promise((resolve, reject) => {
+            const req = store.getAll();
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+    } finally {
+        db.close();
+    }
+}
+"""
+
+
+def verify_smart_query_streaming(browser=None):
+    """
+    Asks a question against a slow-generating mock endpoint: the answer must
+    start rendering well before generation ends, land in the queries table
+    once complete, and a second question must be stoppable mid-stream with
+    the partial answer kept.
+    """
+    with mock_openai(latency_ms=200, jitter_ms=0, tokens_per_sec=TOKENS_PER_SEC) as ai, open_page(browser) as page:
+        use_mock_openai(page, ai.url)
+        page.goto(f"{BASE_URL}/#smart_query")
+        wait_for_view(page, "smart_query")
+
+        page.fill("textarea", "Which loans are high risk?")
+        page.click("#analyze-btn")
+        wait_for_visible(page.locator("#query-result"), "first streamed token", timeout=5000)
+        assert page.is_visible("#stop-btn"), "answer finished before it could stream"
+
+        wait_for_record(page, "queries", "status", "done", timeout=30000)
+        done = page.evaluate(_QUERIES, DB_NAME)[0]
+        print(f"First token after {done['firstTokenMs']}ms, answer {len(done['result'])} chars")
+        assert done["firstTokenMs"] < MAX_FIRST_TOKEN_MS, done
+        assert "Which loans are high risk?" in done["result"], done
+        assert page.inner_text("#query-result").strip() == done["result"].strip()
+
+        page.fill("textarea", "List all loans maturing in Q4.")
+        page.click("#analyze-btn")
+        wait_for_visible(page.locator("#query-result"), "second answer streaming", timeout=5000)
+        page.wait_for_function("() => document.getElementById('stop-btn')?.textContent.includes('Stop')")
+        page.click("#stop-btn")
+        wait_for_record(page, "queries", "status", "cancelled", timeout=5000)
+        page.wait_for_selector("#analyze-btn")
+
+        stopped = next(q for q in page.evaluate(_QUERIES, DB_NAME) if q["status"] == "cancelled")
+        assert stopped["result"].endswith("[Stopped]"), stopped
+        assert len(stopped["result"]) < len(done["result"]), stopped
+        print("Success: answers stream, persist and can be stopped.")
+
+        stats = ai.stats()
+        print(f"Mock OpenAI: {stats['requests']} requests {stats['outcomes']}")
+
+
+def verify_smart_query_cache(browser=None):
+    """
+    Asks the same question twice: the repeat must be answered from the
+    response cache without reaching the endpoint.
+    """
+    question = "Which loans are high risk?"
+    with mock_openai(latency_ms=300, jitter_ms=0) as ai, open_page(browser) as page:
+        use_mock_openai(page, ai.url)
+        page.add_init_script("window.__DOCPULSE_EXPOSE_CACHE__ = true;")
+        page.goto(f"{BASE_URL}/#smart_query")
+        wait_for_view(page, "smart_query")
+
+        for asked in (1, 2):
+            page.fill("textarea", question)
+            page.click("#analyze-btn")
+            wait_for_record(page, "queries", "status", "done", minimum=asked, timeout=15000)
+
+        assert page.is_visible("#result-cached"), "repeat question was not served from the cache"
+        assert ai.stats()["requests"] == 1, ai.stats()
+        stats = page.evaluate("() => window.__docpulseResponseCache.getResponseCacheStats()")
+        print(f"Response cache: {stats}")
+        assert stats["hits"] == 1 and stats["misses"] == 1, stats
+        print("Success: repeated question answered from the cache.")
+
+
+if __name__ == "__main__":
+    verify_smart_query_streaming()
+    verify_smart_query_cache()
@@ -1,19 +1,18 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from waits import wait_for_app_mounted
+from snapshots import snapshot
 
-def verify_upload_status():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_upload_status(browser=None):
+    with open_page(browser) as page:
 
         try:
             # Go to the app
-            page.goto("http://localhost:3000")
-            page.wait_for_timeout(1000)
+            page.goto(BASE_URL)
+            wait_for_app_mounted(page)
 
             # Go to upload
-            page.goto("http://localhost:3000/#upload")
+            page.goto(f"{BASE_URL}/#upload")
             page.wait_for_selector("text=Upload Loan Agreements", timeout=10000)
 
             # Upload "draft" file to trigger "Review" status
@@ -50,7 +49,7 @@ def verify_upload_status():
 
             # Screenshot Detail View with Review status
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/detail_review_status.png")
+            snapshot(page, "detail_review_status")
 
             # Click Approve
             page.click("text=Mark as Analyzed")
@@ -64,13 +63,12 @@ def verify_upload_status():
                 print("Button removed after approval.")
 
             # Screenshot Detail View with Analyzed status
-            page.screenshot(path="verification/detail_analyzed_status.png")
+            snapshot(page, "detail_analyzed_status")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_status.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     verify_upload_status()
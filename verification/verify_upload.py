@@ -1,19 +1,18 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from waits import wait_for_app_mounted
+from snapshots import snapshot
 
-def verify_document_upload_and_view():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_document_upload_and_view(browser=None):
+    with open_page(browser) as page:
 
         try:
             # Go to the app
-            page.goto("http://localhost:3000")
-            page.wait_for_timeout(1000)
+            page.goto(BASE_URL)
+            wait_for_app_mounted(page)
 
             # Go to upload
-            page.goto("http://localhost:3000/#upload")
+            page.goto(f"{BASE_URL}/#upload")
             page.wait_for_selector("text=Upload Loan Agreements", timeout=10000)
 
             # Upload dummy file directly to input
@@ -51,14 +50,13 @@ def verify_document_upload_and_view():
 
             # Screenshot Detail View
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/detail_view.png")
+            snapshot(page, "detail_view")
             print("Verification successful.")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_upload.png")
-        finally:
-            browser.close()
+            raise
 
 if __name__ == "__main__":
     verify_document_upload_and_view()
@@ -1,15 +1,13 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_upload_creates_loan():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+def verify_upload_creates_loan(browser=None):
+    with open_page(browser) as page:
 
         try:
             print("Navigating to Dashboard...")
-            page.goto("http://localhost:3000/#dashboard")
+            page.goto(f"{BASE_URL}/#dashboard")
             page.wait_for_selector("text=Active Loans", timeout=10000)
 
             # Check for initial value '6' (assuming mock data is loaded)
@@ -23,7 +21,7 @@ def verify_upload_creates_loan():
                 print("Warning: Initial count 6 not found, might be different or loading slow.")
 
             print("Navigating to Upload...")
-            page.goto("http://localhost:3000/#upload")
+            page.goto(f"{BASE_URL}/#upload")
             page.wait_for_selector("text=Upload Loan Agreements", timeout=10000)
 
             print("Uploading file...")
@@ -43,7 +41,7 @@ def verify_upload_creates_loan():
             print("Redirected to Vault.")
 
             print("Navigating back to Dashboard...")
-            page.goto("http://localhost:3000/#dashboard")
+            page.goto(f"{BASE_URL}/#dashboard")
             page.wait_for_selector("text=Active Loans", timeout=10000)
 
             # Verify count increased to 7
@@ -56,14 +54,12 @@ def verify_upload_creates_loan():
                 raise
 
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/dashboard_after_upload.png")
+            snapshot(page, "dashboard_after_upload")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_upload_flow.png")
             raise
-        finally:
-            browser.close()
 
 if __name__ == "__main__":
     verify_upload_creates_loan()
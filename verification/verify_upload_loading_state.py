@@ -1,19 +1,17 @@
 import os
-from playwright.sync_api import sync_playwright
+from harness import BASE_URL, open_page
+from snapshots import snapshot
 
-def verify_upload_loading_state():
+def verify_upload_loading_state(browser=None):
     """
     Verifies that clicking 'Analyze Documents' without a valid key (simulated or actual)
     triggers the loading state or error handling UI.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+    with open_page(browser) as page:
 
         try:
             print("Navigating to Upload View...")
-            page.goto("http://localhost:3000/#upload")
+            page.goto(f"{BASE_URL}/#upload")
 
             # 1. Setup: Upload a file to make the button active
             if not os.path.exists("dummy_loading.pdf"):
@@ -54,14 +52,12 @@ def verify_upload_loading_state():
                      print("Warning: Neither error toast nor loading text found immediately.")
 
             os.makedirs("verification", exist_ok=True)
-            page.screenshot(path="verification/upload_feedback.png")
+            snapshot(page, "upload_feedback")
 
         except Exception as e:
             print(f"Error: {e}")
             page.screenshot(path="verification/error_upload_loading.png")
             raise
-        finally:
-            browser.close()
 
 if __name__ == "__main__":
     verify_upload_loading_state()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+from harness import BASE_URL, open_page
+from mock_openai import mock_openai, use_mock_openai
+from pdf_corpus import build_pdf, generate_agreement
+from waits import wait_for_table_count, wait_for_view
+
+FILE_COUNT = 5
+
+def verify_upload_with_mock_ai(browser=None):
+    """
+    Runs the real analyze path end to end against the local OpenAI stand-in,
+    with a 429 thrown in to exercise the client's retry handling, then uploads
+    the same files again: those must resolve from the analysis cache without
+    another request.
+    """
+    with mock_openai(latency_ms=200, jitter_ms=50, rate_429=0.2, seed=7) as ai, open_page(browser) as page:
+        use_mock_openai(page, ai.url)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(FILE_COUNT):
+                path = os.path.join(tmp, f"northwind_facility_{i + 1}.pdf")
+                with open(path, "wb") as f:
+                    f.write(build_pdf(generate_agreement(5, seed=i)[0]))
+                paths.append(path)
+
+            page.goto(f"{BASE_URL}/#upload")
+            page.set_input_files("input[type='file']", paths)
+            page.wait_for_selector("text=Ready", timeout=15000)
+
+            print("Analyzing with mock OpenAI...")
+            page.click("button:has-text('Analyze Documents')")
+            wait_for_table_count(page, "loans", FILE_COUNT, timeout=60000)
+            wait_for_table_count(page, "docs", FILE_COUNT, timeout=10000)
+
+            stats = ai.stats()
+            print(f"Mock OpenAI: {stats['requests']} requests {stats['outcomes']}, "
+                  f"p50 {stats['p50_ms']}ms p95 {stats['p95_ms']}ms")
+            assert stats["outcomes"].get("ok", 0) >= FILE_COUNT, stats
+            print("Success: every upload was analyzed through the mock endpoint.")
+
+            print("Re-uploading the same files...")
+            wait_for_view(page, "loan_review")
+            page.goto(f"{BASE_URL}/#upload")
+            page.set_input_files("input[type='file']", paths)
+            page.wait_for_selector("text=Ready", timeout=15000)
+            page.click("button:has-text('Analyze Documents')")
+            wait_for_table_count(page, "loans", 2 * FILE_COUNT, timeout=20000)
+
+        repeat = ai.stats()
+        assert repeat["requests"] == stats["requests"], f"duplicates reached the endpoint: {repeat}"
+        print("Success: duplicate uploads resolved from the analysis cache.")
+
+if __name__ == "__main__":
+    verify_upload_with_mock_ai()
@@ -1,59 +1,55 @@
-
-from playwright.sync_api import sync_playwright
-
-def run(playwright):
-    browser = playwright.chromium.launch(headless=True)
-    context = browser.new_context()
-    page = context.new_page()
-
-    # Wait for server to start
-    page.goto("http://localhost:3000")
-
-    # Check Dashboard
-    page.wait_for_selector('text=Dashboard')
-    page.screenshot(path="verification/dashboard.png")
-
-    # Navigate to Filters (assuming wire up works)
-    page.goto("http://localhost:3000/#filter")
-    page.wait_for_selector('text=Advanced Filters')
-    page.screenshot(path="verification/filter.png")
-
-    # Navigate to Document Detail
-    page.goto("http://localhost:3000/#document_detail")
-    page.wait_for_selector('text=Document Info')
-    page.screenshot(path="verification/document_detail.png")
-
-    # Navigate to Edit Profile
-    page.goto("http://localhost:3000/#edit_profile")
-    page.wait_for_selector('text=Edit Profile')
-    page.screenshot(path="verification/edit_profile.png")
-
-    # Navigate to Alerts Log
-    page.goto("http://localhost:3000/#alerts_log")
-    page.wait_for_selector('text=System Alerts Log')
-    page.screenshot(path="verification/alerts_log.png")
-
-    # Navigate to Activity Log
-    page.goto("http://localhost:3000/#activity_log")
-    page.wait_for_selector('text=Activity Log')
-    page.screenshot(path="verification/activity_log.png")
-
-    # Navigate to Violations Log
-    page.goto("http://localhost:3000/#violations_log")
-    page.wait_for_selector('text=Compliance Violations')
-    page.screenshot(path="verification/violations_log.png")
-
-    # Navigate to Public Profile
-    page.goto("http://localhost:3000/#public_profile")
-    page.wait_for_selector('text=Connect')
-    page.screenshot(path="verification/public_profile.png")
-
-    # Navigate to Analytics Result
-    page.goto("http://localhost:3000/#analytics_result")
-    page.wait_for_selector('text=Query Analysis')
-    page.screenshot(path="verification/analytics_result.png")
-
-    browser.close()
-
-with sync_playwright() as playwright:
-    run(playwright)
+from harness import BASE_URL, open_page
+from snapshots import snapshot
+
+def verify_views(browser=None):
+    with open_page(browser) as page:
+
+        # Wait for server to start
+        page.goto(BASE_URL)
+
+        # Check Dashboard
+        page.wait_for_selector('text=Dashboard')
+        snapshot(page, "views_dashboard")
+
+        # Navigate to Filters (assuming wire up works)
+        page.goto(f"{BASE_URL}/#filter")
+        page.wait_for_selector('text=Advanced Filters')
+        snapshot(page, "views_filter")
+
+        # Navigate to Document Detail
+        page.goto(f"{BASE_URL}/#document_detail")
+        page.wait_for_selector('text=Document Info')
+        snapshot(page, "views_document_detail")
+
+        # Navigate to Edit Profile
+        page.goto(f"{BASE_URL}/#edit_profile")
+        page.wait_for_selector('text=Edit Profile')
+        snapshot(page, "views_edit_profile")
+
+        # Navigate to Alerts Log
+        page.goto(f"{BASE_URL}/#alerts_log")
+        page.wait_for_selector('text=System Alerts Log')
+        snapshot(page, "views_alerts_log")
+
+        # Navigate to Activity Log
+        page.goto(f"{BASE_URL}/#activity_log")
+        page.wait_for_selector('text=Activity Log')
+        snapshot(page, "views_activity_log")
+
+        # Navigate to Violations Log
+        page.goto(f"{BASE_URL}/#violations_log")
+        page.wait_for_selector('text=Compliance Violations')
+        snapshot(page, "views_violations_log")
+
+        # Navigate to Public Profile
+        page.goto(f"{BASE_URL}/#public_profile")
+        page.wait_for_selector('text=Connect')
+        snapshot(page, "views_public_profile")
+
+        # Navigate to Analytics Result
+        page.goto(f"{BASE_URL}/#analytics_result")
+        page.wait_for_selector('text=Query Analysis')
+        snapshot(page, "views_analytics_result")
+
+if __name__ == "__main__":
+    verify_views()
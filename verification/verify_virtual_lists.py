@@ -0,0 +1,60 @@
+import time
+
+from seed_data import generate_portfolio, seeded_page
+from waits import wait_for_view, wait_for_visible
+
+LOANS = 50_000
+# Rows mounted at once: the viewport plus overscan, never the whole table
+MAX_MOUNTED_ROWS = 100
+MAX_JUMP_MS = 1500
+
+_MOUNTED_ROWS = "(selector) => document.querySelector(selector).firstElementChild.firstElementChild.childElementCount"
+
+
+def verify_virtual_lists(browser=None):
+    """
+    Opens Loan Reviews over a 50k-loan portfolio: only a window of rows may be
+    mounted, and jumping to the end of the list must render its last rows
+    (read by offset off the index) without loading the table. A loan whose
+    amount doesn't parse must still be listed and counted when sorting by
+    amount, which reads the amountMinor index.
+    """
+    portfolio = generate_portfolio(LOANS)
+    ids = sorted(loan["id"] for loan in portfolio["loans"])
+    undisclosed = portfolio["loans"][LOANS // 2]
+    undisclosed["amount"] = "Undisclosed"
+
+    with seeded_page(browser, portfolio=portfolio, view="dashboard") as page:
+        page.evaluate("() => { window.location.hash = 'loan_reviews'; }")
+        wait_for_view(page, "loan_reviews")
+        wait_for_visible(page.locator("#loan-list").get_by_text(ids[0]), "first page of loans", timeout=15000)
+        page.get_by_text(f"{LOANS:,} loans").wait_for(timeout=15000)
+
+        mounted = page.evaluate(_MOUNTED_ROWS, "#loan-list")
+        print(f"{mounted} rows mounted for {LOANS} loans")
+        assert mounted <= MAX_MOUNTED_ROWS, mounted
+
+        start = time.perf_counter()
+        page.evaluate("() => { const list = document.getElementById('loan-list'); list.scrollTop = list.scrollHeight; }")
+        wait_for_visible(page.locator("#loan-list").get_by_text(ids[-1]), "last loan", timeout=10000)
+        jump_ms = (time.perf_counter() - start) * 1000
+        print(f"Jumped to the end of the list in {jump_ms:.0f}ms")
+        assert jump_ms < MAX_JUMP_MS, jump_ms
+        assert page.evaluate(_MOUNTED_ROWS, "#loan-list") <= MAX_MOUNTED_ROWS
+
+        # Counts as 0, so it sorts first rather than dropping out of the index
+        page.locator("#loan-list").evaluate("list => { list.scrollTop = 0; }")
+        page.get_by_role("button", name="Amount").click()
+        wait_for_visible(page.locator("#loan-list").get_by_text(undisclosed["id"]), "loan without a parseable amount")
+        page.get_by_text(f"{LOANS:,} loans").wait_for(timeout=15000)
+
+        page.evaluate("() => { window.location.hash = 'vault'; }")
+        wait_for_view(page, "vault")
+        wait_for_visible(page.locator("#document-list").get_by_text(portfolio["docs"][-1]["name"]),
+                         "newest document", timeout=15000)
+        assert page.evaluate(_MOUNTED_ROWS, "#document-list") <= MAX_MOUNTED_ROWS
+        print("Success: list views render a window of rows at 50k loans, including unparseable amounts.")
+
+
+if __name__ == "__main__":
+    verify_virtual_lists()
@@ -0,0 +1,218 @@
+"""
+Condition-based waits and a wait-budget profiler for the verification scripts.
+
+Instead of fixed sleeps, scripts wait for the thing they actually depend on:
+a Dexie write committing to LMA_DocPulse_DB, the DOM going quiet once live
+queries and GSAP/framer animations have settled, a hash route being active.
+
+Every wait (and every Playwright page call routed through harness.open_page)
+is timed as a step. run_all.py collects the steps per test and ranks the
+slowest ones; standalone scripts print their own ranking on exit.
+"""
+import atexit
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+DB_NAME = "LMA_DocPulse_DB"
+POLL_MS = 50
+
+# Page methods timed by instrument_page
+PROFILED_METHODS = (
+    "goto", "reload", "click", "fill", "set_input_files",
+    "wait_for_selector", "wait_for_function", "wait_for_load_state",
+    "wait_for_timeout", "screenshot",
+)
+
+_records = []
+_current_test = None
+_depth = 0
+
+
+def set_current_test(test_id):
+    """Labels subsequent steps; the runner calls this before each test."""
+    global _current_test
+    _current_test = test_id
+
+
+def _test_label():
+    return _current_test or os.path.basename(sys.argv[0])
+
+
+@contextmanager
+def step(name):
+    """
+    Times the enclosed block and records it as a named step. Only the
+    outermost step is recorded, so a wait helper that calls instrumented
+    page methods is counted once.
+    """
+    global _depth
+    _depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            _records.append({
+                "test": _test_label(),
+                "step": name,
+                "duration": round(time.perf_counter() - start, 4),
+            })
+
+
+def drain():
+    """Returns and clears the steps recorded so far."""
+    records = list(_records)
+    _records.clear()
+    return records
+
+
+def rank(records, top=15):
+    return sorted(records, key=lambda r: r["duration"], reverse=True)[:top]
+
+
+def print_report(records, top=15, title="Slowest steps"):
+    if not records:
+        return
+    total = sum(r["duration"] for r in records)
+    print(f"\n=== {title} ({total:.2f}s recorded across {len(records)} steps) ===")
+    for r in rank(records, top):
+        share = (r["duration"] / total * 100) if total else 0
+        print(f"  {r['duration']:7.3f}s {share:5.1f}%  {r['test']}  {r['step']}")
+
+
+def _describe(name, args):
+    if name == "wait_for_timeout":
+        return f"{name}({args[0]}ms)" if args else name
+    if args and isinstance(args[0], str):
+        return f"{name}({args[0][:60]})"
+    return name
+
+
+def instrument_page(page):
+    """Wraps the page's navigation and wait methods so each call is timed as a step."""
+    for name in PROFILED_METHODS:
+        original = getattr(page, name)
+
+        def timed(*args, _name=name, _original=original, **kwargs):
+            with step(_describe(_name, args)):
+                return _original(*args, **kwargs)
+
+        setattr(page, name, timed)
+    return page
+
+
+@atexit.register
+def _report_standalone():
+    # Under run_all.py the runner drains the records per test
+    if _current_test is None:
+        print_report(drain())
+
+
+# --- Condition waits -------------------------------------------------------
+
+_IDB_QUERY = """
+async ([dbName, table, field, value]) => {
+    const db = await new Promise((resolve, reject) => {
+        const req = indexedDB.open(dbName);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+    try {
+        if (!db.objectStoreNames.contains(table)) return null;
+        const store = db.transaction(table, 'readonly').objectStore(table);
+        const rows = await new Promise((resolve, reject) => {
+            const req = store.getAll();
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+        if (field === null) return rows.length;
+        return rows.filter(row => row[field] === value).length;
+    } finally {
+        db.close();
+    }
+}
+"""
+
+_DOM_QUIET = """
+(quietMs) => {
+    if (!window.__docpulseLastMutation) {
+        window.__docpulseLastMutation = performance.now();
+        new MutationObserver(() => { window.__docpulseLastMutation = performance.now(); })
+            .observe(document.body, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return performance.now() - window.__docpulseLastMutation >= quietMs;
+}
+"""
+
+
+def _poll(page, expression, arg, timeout):
+    # wait_for_function does not await promise-returning predicates, so
+    # IndexedDB checks are polled from Python through page.evaluate
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        if page.evaluate(expression, arg):
+            return
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Condition not met within {timeout}ms: {arg}")
+        time.sleep(POLL_MS / 1000)
+
+
+def wait_for_table_count(page, table, minimum, timeout=10000):
+    """Waits until a Dexie table holds at least `minimum` rows (i.e. the write committed)."""
+    with step(f"idb {table} >= {minimum} rows"):
+        _poll(page, f"async (args) => ((await ({_IDB_QUERY})(args)) ?? 0) >= {int(minimum)}",
+              [DB_NAME, table, None, None], timeout)
+
+
+def wait_for_record(page, table, field, value, minimum=1, timeout=10000):
+    """Waits until `minimum` rows with `field == value` have been committed to a Dexie table."""
+    label = f"idb {table}.{field} == {value!r}" + (f" x{minimum}" if minimum > 1 else "")
+    with step(label):
+        _poll(page, f"async (args) => ((await ({_IDB_QUERY})(args)) ?? 0) >= {int(minimum)}",
+              [DB_NAME, table, field, value], timeout)
+
+
+def wait_for_settled(page, quiet_ms=250, timeout=10000):
+    """
+    Waits until the DOM has stopped mutating for `quiet_ms`, which covers
+    useLiveQuery re-renders as well as GSAP and framer-motion animations
+    (both drive inline styles, so they count as attribute mutations).
+    """
+    with step(f"dom settled ({quiet_ms}ms quiet)"):
+        page.wait_for_function(_DOM_QUIET, arg=quiet_ms, polling=POLL_MS, timeout=timeout)
+
+
+def wait_for_app_mounted(page, timeout=10000):
+    """Waits until React has rendered into #root."""
+    with step("app mounted"):
+        page.wait_for_function(
+            "() => (document.getElementById('root')?.childElementCount ?? 0) > 0",
+            polling=POLL_MS,
+            timeout=timeout,
+        )
+
+
+def wait_for_view(page, view, timeout=10000):
+    """Waits until App has routed to the given hash view."""
+    with step(f"view #{view}"):
+        page.wait_for_function(
+            "(view) => window.location.hash === '#' + view",
+            arg=view,
+            polling=POLL_MS,
+            timeout=timeout,
+        )
+
+
+def wait_for_visible(locator, label=None, timeout=10000):
+    """Waits for a locator to become visible, timed as its own step."""
+    with step(label or f"visible {locator}"):
+        locator.wait_for(state="visible", timeout=timeout)
+
+
+def wait_for_condition(page, label, predicate, arg=None, timeout=10000):
+    """Waits until a synchronous page predicate returns true, timed as its own step."""
+    with step(label):
+        page.wait_for_function(predicate, arg=arg, polling=POLL_MS, timeout=timeout)